@@ -0,0 +1 @@
+# Benchmarks for the extraction code; run with `python -m benchmarks`
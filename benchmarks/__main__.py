@@ -0,0 +1,194 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from wiktextract.compression import COMPRESSION_SUFFIXES
+
+from .extraction import (
+    BASELINE_PATH,
+    compare_results,
+    create_sample_db,
+    editions,
+    load_baseline,
+    run_benchmarks,
+    update_baseline,
+)
+from .micro import (
+    MICRO_FUNCTIONS,
+    capture_corpora,
+    compare_micro_results,
+    run_micro_benchmarks,
+)
+from .output import benchmark_output
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description="Wiktextract benchmarks"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sample_parser = subparsers.add_parser(
+        "sample",
+        help="Create the sample database of the pinned pages from a full "
+        "database",
+    )
+    sample_parser.add_argument(
+        "--edition", type=str, required=True, choices=editions()
+    )
+    sample_parser.add_argument(
+        "--db-path",
+        type=Path,
+        required=True,
+        help="Database file created by wiktwords with the whole dump file",
+    )
+
+    run_parser = subparsers.add_parser(
+        "run", help="Run the extraction benchmarks and compare to baseline"
+    )
+    run_parser.add_argument(
+        "--edition",
+        type=str,
+        action="append",
+        choices=editions(),
+        help="Edition to benchmark (can be repeated; default all editions "
+        "with a sample database)",
+    )
+    run_parser.add_argument(
+        "--num-processes",
+        type=int,
+        default=None,
+        help="Number of worker processes in the phase 2 benchmark",
+    )
+
+    capture_parser = subparsers.add_parser(
+        "capture",
+        help="Record the calls of the micro-benchmarked functions while "
+        "extracting the pinned pages of the sample database",
+    )
+    capture_parser.add_argument(
+        "--edition", type=str, default="en", choices=editions()
+    )
+    capture_parser.add_argument(
+        "--limit",
+        type=int,
+        default=5000,
+        help="Maximum number of calls saved per function (default 5000)",
+    )
+
+    micro_parser = subparsers.add_parser(
+        "micro",
+        help="Run the micro-benchmarks on the recorded calls and compare to "
+        "baseline",
+    )
+    micro_parser.add_argument(
+        "--edition", type=str, default="en", choices=editions()
+    )
+    micro_parser.add_argument(
+        "--function",
+        type=str,
+        action="append",
+        choices=list(MICRO_FUNCTIONS),
+        help="Function to benchmark (can be repeated; default all)",
+    )
+    micro_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Number of passes over the recorded calls; the fastest pass "
+        "is reported (default 5)",
+    )
+    output_parser = subparsers.add_parser(
+        "output",
+        help="Compare writing compressed output directly to compressing "
+        "the output afterwards",
+    )
+    output_parser.add_argument(
+        "--input",
+        type=Path,
+        required=True,
+        help="JSONL output file of a wiktwords run",
+    )
+    output_parser.add_argument(
+        "--compression",
+        type=str,
+        action="append",
+        choices=list(COMPRESSION_SUFFIXES.values()),
+        help="Compression format (can be repeated; default gzip, bzip2 and xz)",
+    )
+    output_parser.add_argument(
+        "--threads",
+        type=int,
+        default=4,
+        help="Number of compression threads (default 4)",
+    )
+
+    for subparser in (run_parser, micro_parser):
+        subparser.add_argument(
+            "--baseline",
+            type=Path,
+            default=BASELINE_PATH,
+            help="Baseline results file",
+        )
+        subparser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.1,
+            help="Fraction by which a metric may be worse than the baseline "
+            "before it is reported as a regression (default 0.1)",
+        )
+        subparser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Save the results to the baseline file",
+        )
+        subparser.add_argument(
+            "--out", type=Path, help="Write the results to this JSON file"
+        )
+    args = parser.parse_args()
+
+    if args.command == "sample":
+        create_sample_db(args.edition, args.db_path)
+        return
+    if args.command == "capture":
+        capture_corpora(args.edition, args.limit)
+        return
+    if args.command == "output":
+        results = benchmark_output(
+            args.input,
+            args.compression or ["gzip", "bzip2", "xz"],
+            args.threads,
+        )
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+        return
+
+    if args.command == "micro":
+        results = run_micro_benchmarks(
+            args.edition, args.function or list(MICRO_FUNCTIONS), args.repeat
+        )
+        key = "micro"
+        compare = compare_micro_results
+    else:
+        results = run_benchmarks(args.edition or editions(), args.num_processes)
+        key = "editions"
+        compare = compare_results
+    if args.out is not None:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    json.dump(results, sys.stdout, indent=2, sort_keys=True)
+    print()
+    if args.update_baseline:
+        update_baseline(results, args.baseline, key)
+        return
+    baseline = load_baseline(args.baseline)
+    regressions = compare(results, baseline, args.threshold)
+    for msg in regressions:
+        print(f"REGRESSION: {msg}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+# End-to-end extraction benchmarks.  Each edition has a pinned list of page
+# titles in benchmarks/pages/<edition>.txt; `create_sample_db()` copies
+# those pages and their subpages, together with all pages of the support
+# namespaces (templates, modules, etc.: saved but not extracted), from a
+# full database created by wiktwords into a small local database, so the
+# benchmarks can be run offline.  Each benchmark runs
+# in a fresh process so that its peak memory usage is measured separately.
+
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from importlib.metadata import PackageNotFoundError, version
+from itertools import chain
+from multiprocessing import get_context
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from wikitextprocessor import Page, Wtp
+
+from wiktextract.config import WiktionaryConfig
+from wiktextract.page import parse_page
+from wiktextract.template_override import template_override_fns
+from wiktextract.thesaurus import (
+    close_thesaurus_db,
+    extract_thesaurus_data,
+    thesaurus_linkage_number,
+)
+from wiktextract.wiktionary import reprocess_wiktionary
+from wiktextract.wxr_context import WiktextractContext
+from wiktextract.wxr_logging import logger
+
+BENCHMARKS_DIR = Path(__file__).parent
+PAGES_DIR = BENCHMARKS_DIR / "pages"
+DATA_DIR = BENCHMARKS_DIR / "data"
+BASELINE_PATH = BENCHMARKS_DIR / "baseline.json"
+
+# Metrics compared against the baseline; True if larger values are better
+COMPARED_METRICS = {
+    "phase2.pages_per_second": True,
+    "phase2.peak_rss_mb": False,
+    "single_page.pages_per_second": True,
+    "single_page.peak_rss_mb": False,
+}
+# Extraction stages (run report spans) are only compared if they take at
+# least this fraction of the page processing time; shorter ones are noise.
+MIN_STAGE_SHARE = 0.05
+
+
+def editions() -> list[str]:
+    return sorted(p.stem for p in PAGES_DIR.glob("*.txt"))
+
+
+def pinned_titles(edition: str) -> list[str]:
+    with open(PAGES_DIR / f"{edition}.txt", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def sample_db_path(edition: str) -> Path:
+    return DATA_DIR / f"{edition}.db"
+
+
+def create_context(edition: str, db_path: Path) -> WiktextractContext:
+    # Same settings as `wiktwords --all --all-languages`
+    conf = WiktionaryConfig(
+        dump_file_lang_code=edition, capture_language_codes=None
+    )
+    wtp = Wtp(
+        db_path=db_path,
+        lang_code=edition,
+        template_override_funcs=template_override_fns
+        if edition == "en"
+        else {},
+        extension_tags=conf.allowed_html_tags,
+        parser_function_aliases=conf.parser_function_aliases,
+        quiet=True,
+    )
+    return WiktextractContext(wtp, conf)
+
+
+def close_context(wxr: WiktextractContext) -> None:
+    wxr.wtp.close_db_conn()
+    if wxr.config.extract_thesaurus_pages:
+        close_thesaurus_db(wxr.thesaurus_db_path, wxr.thesaurus_db_conn)  # type: ignore[arg-type]
+
+
+def create_sample_db(edition: str, source_db_path: Path) -> Path:
+    """Copies the pinned pages of ``edition`` and their subpages, such as
+    "dog/translations", and all pages of the namespaces that are saved but
+    not extracted from a full database into the sample database."""
+    dest_path = sample_db_path(edition)
+    dest_path.parent.mkdir(exist_ok=True)
+    dest_path.unlink(missing_ok=True)
+    conf = WiktionaryConfig(dump_file_lang_code=edition)
+    src = Wtp(db_path=source_db_path, lang_code=edition, quiet=True)
+    dest = Wtp(db_path=dest_path, lang_code=edition, quiet=True)
+    main_ns_id = src.NAMESPACE_DATA["Main"]["id"]
+    support_ns_ids = sorted(
+        {
+            src.NAMESPACE_DATA[name]["id"]
+            for name in conf.save_ns_names
+            if name in src.NAMESPACE_DATA
+        }
+        - {
+            src.NAMESPACE_DATA[name]["id"]
+            for name in conf.extract_ns_names
+            if name in src.NAMESPACE_DATA
+        }
+    )
+
+    def pinned_pages() -> Iterator[Page]:
+        for title in pinned_titles(edition):
+            page = src.get_page(title, main_ns_id)
+            if page is None:
+                logger.warning(f"Pinned page {title!r} not found in {edition}")
+                continue
+            yield page
+            # "/" sorts right before "0"
+            for (subpage_title,) in src.db_conn.execute(
+                "SELECT title FROM pages WHERE namespace_id = ? "
+                "AND title >= ? AND title < ? ORDER BY title",
+                (main_ns_id, title + "/", title + "0"),
+            ).fetchall():
+                subpage = src.get_page(subpage_title, main_ns_id)
+                if subpage is not None:
+                    yield subpage
+
+    num_pages = 0
+    for page in chain(src.get_all_pages(support_ns_ids), pinned_pages()):
+        dest.add_page(
+            page.title,
+            page.namespace_id,
+            body=page.body,
+            redirect_to=page.redirect_to,
+            need_pre_expand=page.need_pre_expand,
+            model=page.model,
+        )
+        num_pages += 1
+    dest.db_conn.commit()
+    dest.close_db_conn()
+    src.close_db_conn()
+    logger.info(f"Copied {num_pages} pages to {dest_path}")
+    return dest_path
+
+
+def peak_rss_mb(who: int) -> float:
+    rss = resource.getrusage(who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    if sys.platform == "darwin":
+        rss //= 1024
+    return rss / 1024
+
+
+def prepare_thesaurus(wxr: WiktextractContext, num_processes: int | None):
+    # Extracted once and kept next to the sample database, so that it is not
+    # included in the timings
+    if (
+        wxr.config.extract_thesaurus_pages
+        and thesaurus_linkage_number(wxr.thesaurus_db_conn) == 0  # type: ignore[arg-type]
+    ):
+        extract_thesaurus_data(wxr, num_processes)
+
+
+def benchmark_phase2(
+    edition: str, db_path: Path, num_processes: int | None
+) -> dict[str, Any]:
+    """Runs the second phase with `reprocess_wiktionary()` on all pages of
+    the sample database."""
+    wxr = create_context(edition, db_path)
+    prepare_thesaurus(wxr, num_processes)
+    with tempfile.TemporaryDirectory(prefix="wiktextract-bench") as tmp_dir:
+        out_path = Path(tmp_dir) / "out.jsonl"
+        report_path = Path(tmp_dir) / "report.json"
+        start = time.perf_counter()
+        with open(out_path, "w", encoding="utf-8") as out_f:
+            reprocess_wiktionary(
+                wxr,
+                num_processes,
+                out_f,
+                run_report_path=report_path,
+                run_report_spans=True,
+            )
+        seconds = time.perf_counter() - start
+        with open(report_path, encoding="utf-8") as f:
+            report = json.load(f)
+        with open(out_path, "rb") as f:
+            entries = sum(1 for _ in f)
+        output_bytes = out_path.stat().st_size
+    close_context(wxr)
+    pages = report["num_pages"]
+    total_page_time = report["page_wall_time"]["sum"]
+    return {
+        "pages": pages,
+        "seconds": seconds,
+        "pages_per_second": pages / seconds,
+        "peak_rss_mb": max(
+            peak_rss_mb(resource.RUSAGE_SELF),
+            peak_rss_mb(resource.RUSAGE_CHILDREN),
+        ),
+        "entries": entries,
+        "output_bytes": output_bytes,
+        # Exclusive time per page and share of the page processing time
+        "stages": {
+            name: {
+                "seconds_per_page": span["exclusive"] / pages,
+                "share": span["exclusive"] / total_page_time
+                if total_page_time
+                else 0.0,
+            }
+            for name, span in report["spans"].items()
+        },
+    }
+
+
+def benchmark_single_page(edition: str, db_path: Path) -> dict[str, Any]:
+    """Parses the pinned pages one by one in this process with
+    `parse_page()`, like `wiktwords --page` does."""
+    wxr = create_context(edition, db_path)
+    prepare_thesaurus(wxr, None)
+    pages = []
+    for title in pinned_titles(edition):
+        body = wxr.wtp.get_page_body(title, None)
+        if body is not None:
+            pages.append((title, body))
+    # The first page initializes Lua; don't include that in the timing
+    parse_page(wxr, *pages[0])
+    entries = 0
+    output_bytes = 0
+    start = time.perf_counter()
+    for title, body in pages:
+        for data in parse_page(wxr, title, body):
+            entries += 1
+            output_bytes += (
+                len(json.dumps(data, ensure_ascii=False).encode("utf-8")) + 1
+            )
+    seconds = time.perf_counter() - start
+    close_context(wxr)
+    return {
+        "pages": len(pages),
+        "seconds": seconds,
+        "pages_per_second": len(pages) / seconds,
+        "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF),
+        "entries": entries,
+        "output_bytes": output_bytes,
+    }
+
+
+def isolated_target(conn: Connection, fn: Callable, args: tuple) -> None:
+    conn.send(fn(*args))
+    conn.close()
+
+
+def run_isolated(fn: Callable, *args: Any) -> dict[str, Any]:
+    """Runs ``fn(*args)`` in a new process and returns its result."""
+    ctx = get_context("spawn")
+    recv_conn, send_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=isolated_target, args=(send_conn, fn, args))
+    process.start()
+    send_conn.close()
+    try:
+        result = recv_conn.recv()
+    except EOFError:
+        raise RuntimeError(f"benchmark {fn.__name__}{args} failed")
+    finally:
+        process.join()
+    return result
+
+
+def run_info() -> dict[str, Any]:
+    try:
+        wiktextract_version = version("wiktextract")
+    except PackageNotFoundError:
+        wiktextract_version = None
+    return {
+        "wiktextract_version": wiktextract_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.time(),
+    }
+
+
+def run_benchmarks(
+    selected_editions: list[str], num_processes: int | None
+) -> dict[str, Any]:
+    results = run_info()
+    results["num_processes"] = num_processes
+    results["editions"] = {}
+    for edition in selected_editions:
+        db_path = sample_db_path(edition)
+        if not db_path.exists():
+            logger.warning(
+                f"No sample database for {edition}, create it with "
+                f"`python -m benchmarks sample --edition {edition} "
+                "--db-path <full database>`"
+            )
+            continue
+        logger.info(f"Benchmarking {edition}")
+        results["editions"][edition] = {
+            "phase2": run_isolated(
+                benchmark_phase2, edition, db_path, num_processes
+            ),
+            "single_page": run_isolated(
+                benchmark_single_page, edition, db_path
+            ),
+        }
+    return results
+
+
+def get_metric(data: dict[str, Any], path: str) -> float | None:
+    for key in path.split("."):
+        if not isinstance(data, dict) or key not in data:
+            return None
+        data = data[key]
+    return data  # type: ignore[return-value]
+
+
+def compare_metrics(
+    name: str,
+    data: dict[str, Any],
+    base: dict[str, Any],
+    metrics: dict[str, bool],
+    threshold: float,
+) -> list[str]:
+    """Returns a message for each of ``metrics`` that is worse in ``data``
+    than in ``base`` by more than the ``threshold`` fraction.  The values of
+    ``metrics`` are True if larger values are better."""
+    regressions = []
+    for path, higher_is_better in metrics.items():
+        value = get_metric(data, path)
+        base_value = get_metric(base, path)
+        if value is None or not base_value:
+            continue
+        change = (value - base_value) / base_value
+        if higher_is_better:
+            change = -change
+        if change > threshold:
+            regressions.append(
+                f"{name} {path}: {value:.4g} "
+                f"(baseline {base_value:.4g}, {change:+.1%} worse)"
+            )
+    return regressions
+
+
+def compare_results(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    regressions = []
+    for edition, data in results["editions"].items():
+        base = baseline.get("editions", {}).get(edition)
+        if base is None:
+            continue
+        metrics = dict(COMPARED_METRICS)
+        for name, stage in data["phase2"]["stages"].items():
+            if stage["share"] >= MIN_STAGE_SHARE:
+                metrics[f"phase2.stages.{name}.seconds_per_page"] = False
+        regressions.extend(
+            compare_metrics(edition, data, base, metrics, threshold)
+        )
+        for mode in ("phase2", "single_page"):
+            value = get_metric(data, f"{mode}.output_bytes")
+            base_value = get_metric(base, f"{mode}.output_bytes")
+            if value != base_value:
+                logger.info(
+                    f"{edition} {mode} output size changed: {base_value} -> "
+                    f"{value} bytes"
+                )
+    return regressions
+
+
+def load_baseline(baseline_path: Path) -> dict[str, Any]:
+    if not baseline_path.exists():
+        return {}
+    with open(baseline_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def update_baseline(
+    results: dict[str, Any], baseline_path: Path, key: str = "editions"
+) -> None:
+    """Replaces the baseline results of the editions in ``results[key]``,
+    keeping the results of other editions and benchmarks."""
+    baseline = load_baseline(baseline_path)
+    for name, value in results.items():
+        if name != key:
+            baseline[name] = value
+    for edition, data in results[key].items():
+        baseline.setdefault(key, {}).setdefault(edition, {}).update(data)
+    with open(baseline_path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,320 @@
+# Micro-benchmarks of individual extraction functions.  The inputs are
+# captured from real extraction runs: `capture_corpora()` extracts the pinned
+# pages of the sample database with the benchmarked functions wrapped so
+# that the arguments of their calls are recorded, and `benchmark_function()`
+# replays the recorded calls.  This measures changes to one engine (tag
+# decoding, inflection tables, cleaning) without a full extraction run.
+
+import functools
+import importlib
+import pickle
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from statistics import mean
+from typing import Any, Callable
+
+from wiktextract.page import parse_page
+from wiktextract.wxr_context import WiktextractContext
+from wiktextract.wxr_logging import logger
+
+from .extraction import (
+    DATA_DIR,
+    close_context,
+    compare_metrics,
+    create_context,
+    pinned_titles,
+    prepare_thesaurus,
+    run_info,
+    run_isolated,
+    sample_db_path,
+)
+
+# Benchmarked functions: name -> (module, attribute)
+MICRO_FUNCTIONS = {
+    "clean_value": ("wiktextract.clean", "clean_value"),
+    "decode_tags": (
+        "wiktextract.extractor.en.form_descriptions",
+        "decode_tags",
+    ),
+    "classify_desc": (
+        "wiktextract.extractor.en.form_descriptions",
+        "classify_desc",
+    ),
+    "parse_word_head": (
+        "wiktextract.extractor.en.form_descriptions",
+        "parse_word_head",
+    ),
+    "expand_header": ("wiktextract.extractor.en.inflection", "expand_header"),
+    "parse_simple_table": (
+        "wiktextract.extractor.en.inflection",
+        "parse_simple_table",
+    ),
+    "split_at_comma_semi": ("wiktextract.datautils", "split_at_comma_semi"),
+    "clean_node": ("wiktextract.page", "clean_node"),
+}
+
+# Caches emptied before each pass over a corpus, so that every pass does the
+# same work.  Cached functions are benchmarked without their cache.
+CACHED_FUNCTIONS = (
+    ("wiktextract.extractor.en.form_descriptions", "decode_tags"),
+    ("wiktextract.extractor.en.form_descriptions", "classify_desc"),
+    ("wiktextract.extractor.en.inflection", "extract_cell_content"),
+    ("wiktextract.extractor.en.inflection", "parse_title"),
+)
+
+# Metrics compared against the baseline; True if larger values are better
+COMPARED_MICRO_METRICS = {
+    "ops_per_second": True,
+    "alloc_bytes_per_op": False,
+}
+
+
+class WxrArg:
+    """Stands for the `WiktextractContext` argument in recorded calls."""
+
+
+def resolve(name: str) -> Any:
+    module_name, attr = MICRO_FUNCTIONS[name]
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def corpus_path(edition: str, name: str) -> Path:
+    return DATA_DIR / "micro" / edition / f"{name}.pickle"
+
+
+class CallRecorder:
+    """Records a random sample of at most ``limit`` outermost calls of a
+    function.  The arguments are pickled when the function is called, as
+    some functions modify them.  Callback arguments can't be pickled and
+    are replaced by None."""
+
+    __slots__ = ("name", "wxr", "limit", "rng", "seen", "depth", "calls")
+
+    def __init__(self, name: str, wxr: WiktextractContext, limit: int):
+        self.name = name
+        self.wxr = wxr
+        self.limit = limit
+        self.rng = random.Random(name)
+        self.seen = 0
+        self.depth = 0
+        # Call sequence number, page title and pickled arguments
+        self.calls: list[tuple[int, str, bytes]] = []
+
+    def record(self, args: tuple, kwargs: dict[str, Any]) -> None:
+        def replace(value: Any) -> Any:
+            if isinstance(value, WiktextractContext):
+                return WxrArg
+            if callable(value):
+                return None
+            return value
+
+        args = tuple(replace(v) for v in args)
+        kwargs = {k: replace(v) for k, v in kwargs.items()}
+        try:
+            data = pickle.dumps((args, kwargs))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            logger.warning(f"Can't record arguments of {self.name}()")
+            return
+        call = (self.seen, self.wxr.wtp.title or "", data)
+        self.seen += 1
+        # Reservoir sampling
+        if len(self.calls) < self.limit:
+            self.calls.append(call)
+        else:
+            i = self.rng.randrange(self.seen)
+            if i < self.limit:
+                self.calls[i] = call
+
+    def wrap(self, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if self.depth == 0:
+                self.record(args, kwargs)
+            self.depth += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.depth -= 1
+
+        return wrapper
+
+
+def patch_function(name: str, wrapper_fn: Callable[[Callable], Callable]):
+    """Replaces the function in every module that has imported it and
+    returns a list of (module, attribute, original) to undo the change."""
+    original = resolve(name)
+    wrapper = wrapper_fn(original)
+    patched = []
+    for module_name, module in list(sys.modules.items()):
+        if not module_name.startswith("wiktextract"):
+            continue
+        for attr, value in list(vars(module).items()):
+            if value is original:
+                setattr(module, attr, wrapper)
+                patched.append((module, attr, original))
+    return patched
+
+
+def capture_corpora(edition: str, limit: int) -> dict[str, int]:
+    """Extracts the pinned pages of ``edition`` and saves the recorded
+    calls of each benchmarked function.  Returns the number of calls
+    saved for each function."""
+    # Import all extractor modules before patching them
+    for module_name, _ in MICRO_FUNCTIONS.values():
+        importlib.import_module(module_name)
+    importlib.import_module(f"wiktextract.extractor.{edition}.page")
+    wxr = create_context(edition, sample_db_path(edition))
+    prepare_thesaurus(wxr, None)
+    recorders = [CallRecorder(name, wxr, limit) for name in MICRO_FUNCTIONS]
+    patched = []
+    for recorder in recorders:
+        patched.extend(patch_function(recorder.name, recorder.wrap))
+    try:
+        for title in pinned_titles(edition):
+            body = wxr.wtp.get_page_body(title, None)
+            if body is not None:
+                parse_page(wxr, title, body)
+    finally:
+        for module, attr, original in patched:
+            setattr(module, attr, original)
+        close_context(wxr)
+    counts = {}
+    for recorder in recorders:
+        path = corpus_path(edition, recorder.name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Replay the calls in their original order
+        calls = [(title, data) for _, title, data in sorted(recorder.calls)]
+        with open(path, "wb") as f:
+            pickle.dump(calls, f)
+        counts[recorder.name] = len(calls)
+        logger.info(
+            f"Saved {len(calls)} of {recorder.seen} calls of "
+            f"{recorder.name}() to {path}"
+        )
+    return counts
+
+
+def clear_caches() -> None:
+    for module_name, attr in CACHED_FUNCTIONS:
+        getattr(importlib.import_module(module_name), attr).cache_clear()
+
+
+def load_calls(
+    wxr: WiktextractContext, calls: list[tuple[str, bytes]]
+) -> list[tuple[str, tuple, dict[str, Any]]]:
+    def replace(value: Any) -> Any:
+        return wxr if value is WxrArg else value
+
+    ops = []
+    for title, data in calls:
+        args, kwargs = pickle.loads(data)
+        ops.append(
+            (
+                title,
+                tuple(replace(v) for v in args),
+                {k: replace(v) for k, v in kwargs.items()},
+            )
+        )
+    return ops
+
+
+def run_calls(
+    wxr: WiktextractContext,
+    fn: Callable,
+    ops: list[tuple[str, tuple, dict[str, Any]]],
+) -> None:
+    title = None
+    for page_title, args, kwargs in ops:
+        if page_title != title:
+            title = page_title
+            wxr.wtp.start_page(title)
+        fn(*args, **kwargs)
+
+
+def benchmark_function(edition: str, name: str, repeat: int) -> dict[str, Any]:
+    """Replays the recorded calls of the function ``repeat`` times and
+    reports the fastest pass, then once more with `tracemalloc` to measure
+    the memory allocated by each call."""
+    with open(corpus_path(edition, name), "rb") as f:
+        calls = pickle.load(f)
+    wxr = create_context(edition, sample_db_path(edition))
+    fn = resolve(name)
+    fn = getattr(fn, "__wrapped__", fn)
+    times = []
+    for _ in range(repeat):
+        # The arguments are loaded again for every pass because some calls
+        # modify them
+        ops = load_calls(wxr, calls)
+        clear_caches()
+        start = time.perf_counter()
+        run_calls(wxr, fn, ops)
+        times.append(time.perf_counter() - start)
+
+    ops = load_calls(wxr, calls)
+    clear_caches()
+    allocated = []
+    title = None
+    tracemalloc.start()
+    for page_title, args, kwargs in ops:
+        if page_title != title:
+            title = page_title
+            wxr.wtp.start_page(title)
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn(*args, **kwargs)
+        allocated.append(tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    close_context(wxr)
+
+    seconds = min(times)
+    return {
+        "calls": len(ops),
+        "seconds": seconds,
+        "ops_per_second": len(ops) / seconds if seconds else 0.0,
+        # Peak memory allocated during a call, over the memory in use
+        # before it
+        "alloc_bytes_per_op": mean(allocated) if allocated else 0.0,
+        "max_alloc_bytes": max(allocated, default=0),
+    }
+
+
+def run_micro_benchmarks(
+    edition: str, names: list[str], repeat: int
+) -> dict[str, Any]:
+    results = run_info()
+    results["micro"] = {edition: {}}
+    for name in names:
+        if not corpus_path(edition, name).exists():
+            logger.warning(
+                f"No recorded calls of {name}() for {edition}, create them "
+                f"with `python -m benchmarks capture --edition {edition}`"
+            )
+            continue
+        logger.info(f"Benchmarking {name}()")
+        results["micro"][edition][name] = run_isolated(
+            benchmark_function, edition, name, repeat
+        )
+    return results
+
+
+def compare_micro_results(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    regressions = []
+    for edition, functions in results["micro"].items():
+        base_functions = baseline.get("micro", {}).get(edition, {})
+        for name, data in functions.items():
+            if name in base_functions:
+                regressions.extend(
+                    compare_metrics(
+                        f"{edition} {name}()",
+                        data,
+                        base_functions[name],
+                        COMPARED_MICRO_METRICS,
+                        threshold,
+                    )
+                )
+    return regressions
@@ -0,0 +1,81 @@
+# Benchmark of writing compressed output.  An existing JSONL output file is
+# written line by line, as `reprocess_wiktionary()` does, both directly
+# compressed with `open_output()` and uncompressed followed by compressing
+# the whole file afterwards, which is what had to be done before.  The
+# results contain the wall and CPU time of the writing process and the
+# number of bytes written to disk.
+
+import os
+import resource
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from wiktextract.compression import (
+    COMPRESSION_SUFFIXES,
+    BlockCompressedWriter,
+    block_compressor,
+    open_output,
+)
+
+
+def cpu_time() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def write_lines(path: Path, lines: list[str], out_f_args: tuple) -> None:
+    with open_output(path, *out_f_args) as out_f:
+        for line in lines:
+            out_f.write(line)
+
+
+def benchmark_output(
+    input_path: Path, compressions: list[str], num_threads: int
+) -> dict[str, Any]:
+    with open(input_path, encoding="utf-8") as f:
+        lines = f.readlines()
+    results: dict[str, Any] = {
+        "input_bytes": os.path.getsize(input_path),
+        "lines": len(lines),
+        "threads": num_threads,
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for compression in compressions:
+            suffix = next(
+                s for s, c in COMPRESSION_SUFFIXES.items() if c == compression
+            )
+            out_path = Path(tmp_dir) / f"out.jsonl{suffix}"
+            start, start_cpu = time.perf_counter(), cpu_time()
+            write_lines(out_path, lines, (compression, False, num_threads))
+            direct = {
+                "wall_seconds": time.perf_counter() - start,
+                "cpu_seconds": cpu_time() - start_cpu,
+                "bytes_written": os.path.getsize(out_path),
+            }
+            out_path.unlink()
+
+            # Uncompressed output compressed afterwards in one thread
+            plain_path = Path(tmp_dir) / "out.jsonl"
+            start, start_cpu = time.perf_counter(), cpu_time()
+            write_lines(plain_path, lines, (None,))
+            writer = BlockCompressedWriter(
+                open(out_path, "wb"), block_compressor(compression), 1
+            )
+            with open(plain_path, "rb") as src, writer:
+                shutil.copyfileobj(src, writer)
+            afterwards = {
+                "wall_seconds": time.perf_counter() - start,
+                "cpu_seconds": cpu_time() - start_cpu,
+                "bytes_written": os.path.getsize(plain_path)
+                + os.path.getsize(out_path),
+            }
+            plain_path.unlink()
+            out_path.unlink()
+            results[compression] = {
+                "direct": direct,
+                "compress_afterwards": afterwards,
+            }
+    return results
@@ -0,0 +1,224 @@
+# Progress journal of the second (extraction) phase, used to resume an
+# interrupted run.  Pages are processed and written out in a fixed order, so
+# the progress is the number of pages written.  At every checkpoint the
+# output file and the journal are flushed to disk and their sizes are saved
+# in the checkpoint state file; when resuming, anything written after the
+# last checkpoint is truncated away and the already written pages are
+# skipped.  The journal records the errors from before the first page and
+# the errors and the emitted (word, lang_code, pos) keys of each page, so
+# that they can be restored.
+# Checkpoints are only saved when --checkpoint-interval is given.
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+from wikitextprocessor import Page
+
+from .wxr_context import WiktextractContext
+from .wxr_logging import logger
+
+# Error lists of `WiktionaryConfig` that are restored from the journal
+ERROR_LISTS = ("errors", "warnings", "debugs", "notes", "wiki_notices")
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointError(Exception):
+    pass
+
+
+class Checkpoint:
+    """Checkpoint state and journal files of the output file ``out_path``,
+    saved every ``interval`` pages."""
+
+    __slots__ = (
+        "state_path",
+        "journal_path",
+        "interval",
+        "edition",
+        "pages_done",
+        "last_title",
+        "output_size",
+        "journal_size",
+        "journal_f",
+        "error_sizes",
+        "since_save",
+    )
+
+    def __init__(self, out_path: str | Path, interval: int = 10_000) -> None:
+        assert interval > 0
+        self.state_path = Path(f"{out_path}.checkpoint")
+        self.journal_path = Path(f"{out_path}.journal")
+        self.interval = interval
+        self.edition = ""
+        self.pages_done = 0
+        self.last_title: str | None = None
+        self.output_size = 0
+        self.journal_size = 0
+        self.journal_f: TextIO | None = None
+        # Lengths of the error lists after the previous page
+        self.error_sizes: dict[str, int] = {}
+        self.since_save = 0
+
+    def load(self, edition: str) -> None:
+        """Reads the state saved by an interrupted run."""
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            raise CheckpointError(
+                f"No checkpoint {self.state_path} to resume from"
+            )
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise CheckpointError(f"Unsupported checkpoint {self.state_path}")
+        if state["edition"] != edition:
+            raise CheckpointError(
+                f"Checkpoint {self.state_path} is for the "
+                f"{state['edition']} edition, not {edition}"
+            )
+        self.pages_done = state["pages_done"]
+        self.last_title = state["last_title"]
+        self.output_size = state["output_size"]
+        self.journal_size = state["journal_size"]
+
+    def truncate_output(self, path: str | Path) -> None:
+        """Removes output written after the last checkpoint."""
+        if not os.path.exists(path) or os.path.getsize(path) < self.output_size:
+            raise CheckpointError(
+                f"Output file {path} is shorter than in checkpoint "
+                f"{self.state_path}"
+            )
+        os.truncate(path, self.output_size)
+
+    def start(
+        self, wxr: WiktextractContext, resume: bool
+    ) -> set[tuple[str, str, str]]:
+        """Opens the journal.  When resuming, restores the errors of
+        already processed pages to ``wxr.config`` and returns their emitted
+        keys."""
+        self.edition = wxr.config.dump_file_lang_code
+        emitted: set[tuple[str, str, str]] = set()
+        if resume:
+            os.truncate(self.journal_path, self.journal_size)
+            # The errors from before the first page are restored from the
+            # journal, not taken from this run
+            for name in ERROR_LISTS:
+                getattr(wxr.config, name).clear()
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    record = json.loads(line)
+                    for name in ERROR_LISTS:
+                        getattr(wxr.config, name).extend(record.get(name, ()))
+                    emitted.update(
+                        tuple(key)  # type: ignore[misc]
+                        for key in record.get("emitted", ())
+                    )
+            logger.info(
+                f"Resuming from checkpoint after {self.pages_done} pages"
+            )
+        else:
+            self.pages_done = 0
+            self.last_title = None
+            self.output_size = 0
+            self.journal_size = 0
+        self.journal_f = open(
+            self.journal_path, "a" if resume else "w", encoding="utf-8"
+        )
+        if not resume:
+            # The first record has the errors from before the first page,
+            # e.g. those of the thesaurus extraction, which is skipped when
+            # resuming with a thesaurus database that is already filled
+            self.error_sizes = dict.fromkeys(ERROR_LISTS, 0)
+            self.write_errors(wxr, {})
+            self.journal_f.flush()
+            os.fsync(self.journal_f.fileno())
+            self.journal_size = os.fstat(self.journal_f.fileno()).st_size
+        self.error_sizes = {
+            name: len(getattr(wxr.config, name)) for name in ERROR_LISTS
+        }
+        self.since_save = 0
+        self.save_state()
+        return emitted
+
+    def pages(self, pages: Iterable[Page]) -> Iterator[Page]:
+        """Skips the pages written before the checkpoint."""
+        skip = self.pages_done
+        for i, page in enumerate(pages):
+            if i < skip:
+                if i == skip - 1 and page.title != self.last_title:
+                    raise CheckpointError(
+                        f"Page {page.title!r} differs from {self.last_title!r}"
+                        " in the checkpoint, the database has changed"
+                    )
+                continue
+            yield page
+
+    def page_done(
+        self,
+        wxr: WiktextractContext,
+        title: str,
+        emitted: list[tuple[str, str, str]],
+    ) -> None:
+        """Records the errors and the emitted keys of a page after its data
+        has been written out."""
+        self.write_errors(wxr, {"emitted": emitted} if emitted else {})
+        self.pages_done += 1
+        self.last_title = title
+        self.since_save += 1
+
+    def write_errors(
+        self, wxr: WiktextractContext, record: dict[str, Any]
+    ) -> None:
+        """Writes ``record`` with the errors added since the previous record
+        to the journal, unless both are empty."""
+        assert self.journal_f is not None
+        for name in ERROR_LISTS:
+            errors = getattr(wxr.config, name)
+            if len(errors) > self.error_sizes[name]:
+                record[name] = errors[self.error_sizes[name] :]
+                self.error_sizes[name] = len(errors)
+        if record:
+            self.journal_f.write(json.dumps(record, ensure_ascii=False))
+            self.journal_f.write("\n")
+
+    def save_if_due(self, out_f: TextIO) -> None:
+        if self.since_save >= self.interval:
+            self.save(out_f)
+
+    def save(self, out_f: TextIO) -> None:
+        """Flushes the output and the journal to disk and saves the state."""
+        assert self.journal_f is not None
+        for f in (out_f, self.journal_f):
+            f.flush()
+            os.fsync(f.fileno())
+        self.output_size = os.fstat(out_f.fileno()).st_size
+        self.journal_size = os.fstat(self.journal_f.fileno()).st_size
+        self.save_state()
+        self.since_save = 0
+
+    def save_state(self) -> None:
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": CHECKPOINT_VERSION,
+                    "edition": self.edition,
+                    "pages_done": self.pages_done,
+                    "last_title": self.last_title,
+                    "output_size": self.output_size,
+                    "journal_size": self.journal_size,
+                },
+                f,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def finish(self) -> None:
+        """Removes the checkpoint files after a complete run."""
+        if self.journal_f is not None:
+            self.journal_f.close()
+            self.journal_f = None
+        self.state_path.unlink(missing_ok=True)
+        self.journal_path.unlink(missing_ok=True)
@@ -0,0 +1,172 @@
+# Compressed output and input files.  The output is cut into blocks that are
+# compressed independently in a thread pool (the compression functions
+# release the GIL) while the extraction goes on, and the compressed blocks
+# are written out in order.  All supported formats allow concatenating
+# compressed streams, so the result is a normal compressed file.  Flushing
+# the output compresses the buffered data as a block of its own, so that
+# the file can be truncated to its size after a flush (see `Checkpoint`)
+# and appended to.
+
+import bz2
+import gzip
+import io
+import lzma
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, TextIO
+
+COMPRESSION_SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bzip2",
+    ".xz": "xz",
+    ".zst": "zstd",
+}
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def compression_format(path: str | Path) -> str | None:
+    """Returns the compression format of ``path`` from its suffix."""
+    return COMPRESSION_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def import_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "The zstandard package is needed for .zst files: "
+            "pip install zstandard"
+        )
+    return zstandard
+
+
+def zstd_compress(data: bytes, level: int = 3) -> bytes:
+    # `ZstdCompressor` objects can't be shared between threads
+    return import_zstandard().ZstdCompressor(level=level).compress(data)
+
+
+def block_compressor(compression: str) -> Callable[[bytes], bytes]:
+    if compression == "gzip":
+        return partial(gzip.compress, compresslevel=6, mtime=0)
+    if compression == "bzip2":
+        return partial(bz2.compress, compresslevel=9)
+    if compression == "xz":
+        return partial(lzma.compress, preset=6)
+    if compression == "zstd":
+        import_zstandard()
+        return zstd_compress
+    raise ValueError(f"Unknown compression format {compression!r}")
+
+
+class BlockCompressedWriter(io.BufferedIOBase):
+    """Binary file object that compresses blocks of ``block_size`` bytes
+    with ``compress`` in ``num_threads`` threads and writes them to
+    ``raw``."""
+
+    def __init__(
+        self,
+        raw: BinaryIO,
+        compress: Callable[[bytes], bytes],
+        num_threads: int = 4,
+        block_size: int = BLOCK_SIZE,
+    ) -> None:
+        assert num_threads > 0 and block_size > 0
+        self.raw = raw
+        self.compress = compress
+        self.block_size = block_size
+        self.buffer = bytearray()
+        self.executor = ThreadPoolExecutor(
+            num_threads, thread_name_prefix="compress"
+        )
+        self.pending: deque[Future[bytes]] = deque()
+        # Blocks waiting to be written; also limits the memory used when
+        # the compression can't keep up
+        self.max_pending = 2 * num_threads
+
+    def writable(self) -> bool:
+        return True
+
+    def fileno(self) -> int:
+        return self.raw.fileno()
+
+    def write(self, data: Any) -> int:
+        if self.closed:
+            raise ValueError("write to closed file")
+        self.buffer += data
+        if len(self.buffer) >= self.block_size:
+            self.submit_block()
+        return len(data)
+
+    def submit_block(self) -> None:
+        if self.buffer:
+            self.pending.append(
+                self.executor.submit(self.compress, bytes(self.buffer))
+            )
+            self.buffer.clear()
+        while len(self.pending) > self.max_pending:
+            self.raw.write(self.pending.popleft().result())
+
+    def flush(self) -> None:
+        if self.closed or self.raw.closed:
+            return
+        self.submit_block()
+        while self.pending:
+            self.raw.write(self.pending.popleft().result())
+        self.raw.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.executor.shutdown()
+            self.raw.close()
+            super().close()
+
+
+def open_output(
+    path: str | Path,
+    compression: str | None = None,
+    append: bool = False,
+    num_threads: int = 4,
+    block_size: int = BLOCK_SIZE,
+) -> TextIO:
+    """Opens the text output file ``path``, compressed in ``compression``
+    format if given."""
+    if compression is None:
+        return open(
+            path,
+            "a" if append else "w",
+            buffering=1024 * 1024,
+            encoding="utf-8",
+        )
+    writer = BlockCompressedWriter(
+        open(path, "ab" if append else "wb"),
+        block_compressor(compression),
+        num_threads,
+        block_size,
+    )
+    return io.TextIOWrapper(writer, encoding="utf-8")
+
+
+def open_input(path: str | Path) -> TextIO:
+    """Opens the text file ``path``, decompressing it if its suffix is
+    that of a compression format."""
+    compression = compression_format(path)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "bzip2":
+        return bz2.open(path, "rt", encoding="utf-8")
+    if compression == "xz":
+        return lzma.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        reader = (
+            import_zstandard()
+            .ZstdDecompressor()
+            .stream_reader(open(path, "rb"), read_across_frames=True)
+        )
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, encoding="utf-8")
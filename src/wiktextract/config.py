@@ -18,6 +18,8 @@ from wikitextprocessor.core import (
     HTMLTagData,
 )
 
+from .run_report import PageStatsData
+
 SoundFileRedirects = dict[str, str]
 
 POSSubtitleData = TypedDict(
@@ -141,18 +143,6 @@ class WiktionaryConfig:
         self.load_edition_settings()
 
     def merge_return(self, ret: CollatedErrorReturnData):
-        # XXX This was never properly implemented; even the only
-        # count (self.section_counts) that is updated during running
-        # gets discarded when doing batches instead of individual
-        # pages. Search: STATISTICS_IMPLEMENTATION
-        # if "num_pages" in ret:
-        #     self.num_pages += ret["num_pages"]
-        #     for k, v in ret["language_counts"].items():
-        #         self.language_counts[k] += v
-        #     for k, v in ret["pos_counts"].items():
-        #         self.pos_counts[k] += v
-        #     for k, v in ret["section_counts"].items():
-        #         self.section_counts[k] += v
         if "errors" in ret and len(self.errors) < 100_000:
             self.errors.extend(ret.get("errors", []))
         if "warnings" in ret and len(self.warnings) < 100_000:
@@ -164,6 +154,17 @@ class WiktionaryConfig:
         if "debugs" in ret and len(self.debugs) < 3_000_000:
             self.debugs.extend(ret.get("debugs", []))
 
+    def merge_statistics(self, stats: PageStatsData) -> None:
+        """Adds the counts of one page processed in a worker process."""
+        self.num_pages += 1
+        for lang in {lang for lang, _, _ in stats["sections"]}:
+            self.language_counts[lang] += 1
+        for _, pos, _ in stats["sections"]:
+            if pos is not None:
+                self.pos_counts[pos] += 1
+        for k, v in stats["section_counts"].items():
+            self.section_counts[k] += v
+
     def load_edition_settings(self) -> None:
         file_path = self.data_folder / "config.json"
         if file_path.exists():
@@ -1,9 +1,11 @@
 # Utilities for manipulating word data structures
 #
 # Copyright (c) 2018-2022 Tatu Ylonen.  See file LICENSE and https://ylonen.org
+import copy
+import functools
 import re
 from collections import defaultdict
-from typing import Any, Iterable, Optional
+from typing import Any, Iterable, Optional, TypeVar
 
 # Keys in ``data`` that can only have string values (a list of them)
 STR_KEYS = frozenset({"tags", "glosses"})
@@ -21,6 +23,8 @@ DICT_KEYS = frozenset(
     }
 )
 
+T = TypeVar("T")
+
 
 def data_append(data: Any, key: str, value: Any) -> None:
     """Appends ``value`` under ``key`` in the dictionary ``data``.  The key
@@ -57,6 +61,62 @@ def data_extend(data: Any, key: str, values: Iterable) -> None:
         data_append(data, key, x)
 
 
+class CommaSemiSplitter:
+    """Splits text at ``separators`` (regexp pieces) outside parentheses and
+    brackets, keeping the strings in ``skipped`` unsplit.  The pattern is
+    compiled once; use `comma_semi_splitter()` to get a cached splitter."""
+
+    __slots__ = ("split_re", "skipped")
+
+    def __init__(self, separators: tuple[str, ...], skipped: tuple[str, ...]):
+        splitters = [re.escape(s) for s in skipped]
+        splitters.append(r"[][()]")
+        splitters.extend(sorted(separators, key=lambda x: -len(x)))
+        self.split_re = re.compile("|".join(splitters))
+        self.skipped = frozenset(skipped)
+
+    def split(self, text: str) -> list[str]:
+        lst = []
+        bracket_cnt = 0
+        ofs = 0
+        parts = []
+        skipped = self.skipped
+        for m in self.split_re.finditer(text):
+            start = m.start()
+            end = m.end()
+            if ofs < start:
+                parts.append(text[ofs:start])
+            if start == 0 and end == len(text):
+                return [text]  # Don't split if it is the only content
+            ofs = end
+            token = m.group()
+            if token in skipped:
+                parts.append(token)
+            elif token in "([":
+                bracket_cnt += 1
+                parts.append(token)
+            elif token in ")]":
+                bracket_cnt -= 1
+                parts.append(token)
+            elif bracket_cnt > 0:
+                parts.append(token)
+            elif parts:
+                lst.append("".join(parts).strip())
+                parts = []
+        if ofs < len(text):
+            parts.append(text[ofs:])
+        if parts:
+            lst.append("".join(parts).strip())
+        return lst
+
+
+@functools.lru_cache(maxsize=1024)
+def comma_semi_splitter(
+    separators: tuple[str, ...], skipped: tuple[str, ...] = ()
+) -> CommaSemiSplitter:
+    return CommaSemiSplitter(separators, skipped)
+
+
 def split_at_comma_semi(
     text: str,
     separators: Iterable[str] = (",", ";", "，", "،"),
@@ -75,46 +135,9 @@ def split_at_comma_semi(
     assert isinstance(text, str)
     assert isinstance(separators, (list, tuple))
     assert isinstance(extra, (list, tuple))
-    lst = []
-    paren_cnt = 0
-    bracket_cnt = 0
-    ofs = 0
-    parts = []
-    if extra:
-        separators = tuple(separators) + tuple(extra)
-    splitters: list[str] = []
-    if skipped:
-        splitters.extend(re.escape(s) for s in skipped)
-    splitters.append(r"[][()]")
-    splitters.extend(sorted(separators, key=lambda x: -len(x)))
-    split_re = "|".join(splitters)
-    for m in re.finditer(split_re, text):
-        if ofs < m.start():
-            parts.append(text[ofs : m.start()])
-        if m.start() == 0 and m.end() == len(text):
-            return [text]  # Don't split if it is the only content
-        ofs = m.end()
-        if skipped and m.group(0) in skipped:
-            parts.append(m.group(0))
-            continue
-        token = m.group(0)
-        if token in "([":
-            bracket_cnt += 1
-            parts.append(token)
-        elif token in ")]":
-            bracket_cnt -= 1
-            parts.append(token)
-        elif paren_cnt > 0 or bracket_cnt > 0:
-            parts.append(token)
-        else:
-            if parts:
-                lst.append("".join(parts).strip())
-                parts = []
-    if ofs < len(text):
-        parts.append(text[ofs:])
-    if parts:
-        lst.append("".join(parts).strip())
-    return lst
+    return comma_semi_splitter(
+        tuple(separators) + tuple(extra), tuple(skipped) if skipped else ()
+    ).split(text)
 
 
 def split_slashes(wxr, text):
@@ -212,6 +235,21 @@ def freeze(x):
     return x
 
 
+def copy_data(x: T) -> T:
+    """Returns a deep copy of word data.  Dicts and lists are copied and
+    strings and numbers shared, which is much faster than `copy.deepcopy()`;
+    other values are copied with `copy.deepcopy()`.  Unlike it, this does not
+    keep lists or dicts that occur twice in ``x`` shared in the copy."""
+    t = type(x)
+    if t is str or t is int or t is bool or t is float or x is None:
+        return x
+    if t is dict:
+        return {k: copy_data(v) for k, v in x.items()}  # type: ignore
+    if t is list:
+        return [copy_data(v) for v in x]  # type: ignore
+    return copy.deepcopy(x)
+
+
 def ns_title_prefix_tuple(
     wxr, namespace: str, lower: bool = False
 ) -> tuple[str, ...]:
@@ -0,0 +1,151 @@
+# Reading pages directly from the dump file, used when the pages of the
+# extracted namespaces are not stored in the database (`--stream-pages`).
+# The first phase then only stores the templates, modules and other support
+# pages, and the second phase reads the pages to extract from the dump file
+# again.  This needs much less disk space for the database.
+#
+# The extractors, `#ifexist` and Lua's `mw.title.exists` still check
+# whether pages of the extracted namespaces exist, and some extractors read
+# other pages, e.g. translation subpages such as "water/translations".
+# Before extracting, `store_page_stubs()` therefore stores every page of
+# these namespaces in the database: subpages (pages with "/" in the title)
+# and redirects with their contents and other pages with an empty body,
+# which `pages_from_dump()` replaces with the body in the dump file.  Lua
+# code reading the contents of such a page gets an empty page.  It also
+# counts the pages for the progress estimates.
+
+import bz2
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+from wikitextprocessor import Page
+
+from .wxr_context import WiktextractContext
+from .wxr_logging import logger
+
+
+@contextmanager
+def open_dump(dump_path: str) -> Iterator[BinaryIO]:
+    """Opens the dump file, decompressed with lbzip2 in parallel if it is
+    installed."""
+    if not dump_path.endswith(".bz2"):
+        with open(dump_path, "rb") as f:
+            yield f
+    elif (lbzip2 := shutil.which("lbzip2")) is not None:
+        with subprocess.Popen(
+            [lbzip2, "-d", "-c", dump_path], stdout=subprocess.PIPE
+        ) as p:
+            try:
+                yield p.stdout  # type: ignore[misc]
+            finally:
+                p.kill()
+    else:
+        with bz2.open(dump_path, "rb") as f:
+            yield f  # type: ignore[misc]
+
+
+def iter_dump_pages(
+    dump_path: str, namespace_ids: set[int] | list[int]
+) -> Iterator[Page]:
+    """Yields the wikitext pages of ``namespace_ids`` in the dump file, in
+    the order of the dump."""
+    with open_dump(dump_path) as f:
+        root = None
+        ns = ""
+        for event, element in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                # <mediawiki xmlns="http://www.mediawiki.org/xml/export-*/">
+                root = element
+                ns = element.tag[: element.tag.find("}") + 1]
+                continue
+            if event != "end" or element.tag != f"{ns}page":
+                continue
+            namespace_id = int(element.findtext(f"{ns}ns", "0"))
+            model = element.findtext(f"{ns}revision/{ns}model", "wikitext")
+            if namespace_id in namespace_ids and model == "wikitext":
+                title = element.findtext(f"{ns}title", "")
+                redirect = element.find(f"{ns}redirect")
+                if redirect is not None:
+                    yield Page(
+                        title=title,
+                        namespace_id=namespace_id,
+                        redirect_to=redirect.get("title", ""),
+                        model=model,
+                    )
+                else:
+                    yield Page(
+                        title=title,
+                        namespace_id=namespace_id,
+                        body=element.findtext(f"{ns}revision/{ns}text", ""),
+                        model=model,
+                    )
+            # Free the parsed pages
+            root.clear()
+
+
+# Editions whose extractors read the bodies of other pages of the extracted
+# namespaces that aren't subpages, such as the pages that translation "see"
+# templates point to.  All page bodies are stored for them.
+BODY_LOOKUP_EDITIONS = frozenset({"ku", "ms", "vi", "zh"})
+
+
+def store_page_stubs(
+    wxr: WiktextractContext, dump_path: str, namespace_ids: list[int]
+) -> int:
+    """Stores the pages of ``namespace_ids`` in the database, see the
+    module comment, and returns their number.  Pages already in the
+    database, e.g. override pages, are kept."""
+    logger.info("Storing page titles and counting the pages to extract")
+    store_bodies = wxr.wtp.lang_code in BODY_LOOKUP_EDITIONS
+    if store_bodies:
+        logger.warning(
+            f"The {wxr.wtp.lang_code} extractor reads other pages, so all "
+            "pages are stored in the database with --stream-pages"
+        )
+    saved_pages = set(
+        wxr.wtp.db_conn.execute(
+            "SELECT title, namespace_id FROM pages WHERE namespace_id IN "
+            f"({', '.join('?' * len(namespace_ids))})",
+            namespace_ids,
+        )
+    )
+    num_pages = 0
+    num_bodies = 0
+    for page in iter_dump_pages(dump_path, namespace_ids):
+        num_pages += 1
+        if (page.title, page.namespace_id) in saved_pages:
+            continue
+        body = page.body
+        if not (store_bodies or "/" in page.title or body is None):
+            body = ""
+        elif body is not None:
+            num_bodies += 1
+        wxr.wtp.add_page(
+            page.title,
+            page.namespace_id,
+            body=body,
+            redirect_to=page.redirect_to,
+            model=page.model,
+        )
+    wxr.wtp.db_conn.commit()
+    logger.info(f"Stored {num_pages} pages, {num_bodies} with their bodies")
+    return num_pages
+
+
+def pages_from_dump(
+    wxr: WiktextractContext, dump_path: str, namespace_ids: list[int]
+) -> Iterator[Page]:
+    """Yields the pages of ``namespace_ids`` from the dump file.  Pages
+    stored in the database with their contents, i.e. subpages and override
+    pages, are read from there."""
+    for page in iter_dump_pages(dump_path, namespace_ids):
+        saved_page = wxr.wtp.get_page(page.title, page.namespace_id)
+        if saved_page is not None and (
+            saved_page.body or saved_page.redirect_to is not None
+        ):
+            yield saved_page
+        else:
+            yield page
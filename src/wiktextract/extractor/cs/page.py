@@ -109,7 +109,8 @@ def parse_page(
     # page layout
     # https://cs.wiktionary.org/wiki/Wikislovník:Formát_hesla
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text)
     page_data = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         lang_name = clean_node(wxr, None, level2_node.largs) or "unknown"
@@ -121,7 +122,7 @@ def parse_page(
             and lang_code not in wxr.config.capture_language_codes
         ):
             continue
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
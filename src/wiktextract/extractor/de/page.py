@@ -36,7 +36,7 @@ def parse_section(
     # See overrides/de.json for details.
     elif level_node.kind == NodeKind.LEVEL4:
         section_name = clean_node(wxr, None, level_node.largs)
-        wxr.wtp.start_subsection(section_name)
+        wxr.start_subsection(section_name)
         if section_name in ("Bedeutungen", "Grammatische Merkmale"):
             extract_glosses(
                 wxr,
@@ -220,7 +220,7 @@ def process_pos_section(
             if raw_tag != "":
                 page_data[-1].raw_tags.append(raw_tag)
 
-    wxr.wtp.start_subsection(clean_node(wxr, page_data[-1], level_node.largs))
+    wxr.start_subsection(clean_node(wxr, page_data[-1], level_node.largs))
 
     for level_4_node in level_node.find_child(NodeKind.LEVEL4):
         parse_section(wxr, page_data, base_data, level_4_node)
@@ -247,7 +247,8 @@ def parse_page(
 
     wxr.config.word = page_title
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
 
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
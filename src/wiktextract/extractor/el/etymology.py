@@ -29,7 +29,7 @@ def process_etym(
     etym_sublevels = list(node.find_child(LEVEL_KIND_FLAGS))
     ret_etym_sublevels: POSReturns = []
 
-    wxr.wtp.start_subsection(title)
+    wxr.start_subsection(title)
 
     section_num = num
 
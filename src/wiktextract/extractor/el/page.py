@@ -56,7 +56,8 @@ def parse_page(
     if page_title.startswith("Πύλη:"):
         return []
 
-    page_root = wxr.wtp.parse(page_text)
+    with wxr.span("parse"):
+        page_root = wxr.wtp.parse(page_text)
 
     # print_tree(page_root)  # WikiNode tree pretty printer
     word_data: list[WordEntry] = []
@@ -109,7 +110,7 @@ def parse_page(
             lang_code = previous_empty_language_code
             sublevels = [level]
 
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
 
         base_data = WordEntry(
             word=page_title,
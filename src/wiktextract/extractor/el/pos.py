@@ -69,7 +69,7 @@ def process_pos(
         if pos_tag not in data.tags:
             data.tags.append(pos_tag)
 
-    wxr.wtp.start_subsection(title)
+    wxr.start_subsection(title)
 
     # Sound data associated with this POS might be coming from a shared
     # section, in which case we've tried to tag the sound data with its
@@ -81,7 +81,7 @@ def process_pron(
 
     pos_returns: POSReturns = []
 
-    wxr.wtp.start_subsection(title)
+    wxr.start_subsection(title)
 
     section_num = num
 
@@ -0,0 +1,127 @@
+# Tokenizer for English descriptions in classify_desc().
+#
+# This gives the same tokens as NLTK's TweetTokenizer (with its default
+# settings) for the descriptions classify_desc() tokenizes: printable ASCII
+# text with some typographic punctuation.  The token classes are the same and
+# in the same order, as emoticons such as "8)" or "):" and naked domain names
+# such as "fl.oz" affect how many tokens are found in English words.  Left
+# out are the emoji sequences and flags, which can't occur in these
+# descriptions.  It uses one regexp compiled with the `re` module, so `nltk`
+# isn't needed for tokenizing.
+
+import html.entities
+import re
+
+# Emoticons, from TweetTokenizer
+EMOTICONS = r"""
+    [<>]?
+    [:;=8]                      # eyes
+    [\-o*']?                    # optional nose
+    [)\](\[dDpP/:}{@|\\]        # mouth
+    |
+    [)\](\[dDpP/:}{@|\\]        # mouth
+    [\-o*']?                    # optional nose
+    [:;=8]                      # eyes
+    [<>]?
+    |
+    </?3                        # heart
+"""
+
+# TweetTokenizer uses the `regex` module, whose word characters differ from
+# those of `re` for some characters that are compatibility forms of ASCII:
+# superscript, subscript and circled digits are not word characters, while
+# circled letters and some connector punctuation are
+NOT_WORD_CHARS = (
+    "\u00b2\u00b3\u00b9\u2070\u2074-\u2079\u2080-\u2089\u2460-\u249b\u24ea"
+    "\u3251-\u325f\u32b1-\u32bf\U0001f100-\U0001f10a"
+)
+EXTRA_WORD_CHARS = (
+    "\u24b6-\u24e9\ufe33\ufe34\ufe4d-\ufe4f\uff3f\U0001f130-\U0001f149"
+)
+WORD = rf"(?:[^\W{NOT_WORD_CHARS}]|[{EXTRA_WORD_CHARS}])"
+LETTER = rf"(?:[^\W\d_{NOT_WORD_CHARS}]|[{EXTRA_WORD_CHARS}])"
+
+DESC_TOKEN_RE = re.compile(
+    rf"""
+    # URLs
+    (?:https?:(?:/{{1,3}}|[a-z0-9%])|[a-z0-9.\-]{{1,255}}[.][a-z]{{2,13}}/)
+    (?:
+      [^\s()<>{{}}\[\]]+
+      |
+      \([^\s()]{{0,255}}?\([^\s()]{{1,255}}\)[^\s()]{{0,255}}?\)
+      |
+      \([^\s]{{1,255}}?\)
+    )+
+    (?:
+      \([^\s()]{{0,255}}?\([^\s()]{{1,255}}\)[^\s()]{{0,255}}?\)
+      |
+      \([^\s]{{1,255}}?\)
+      |
+      [^\s`!()\[\]{{}};:'".,<>?«»“”‘’]
+    )
+    |
+    # Naked domain names
+    (?<!@)[a-z0-9]+(?:[.\-][a-z0-9]+){{0,126}}[.][a-z]{{2,13}}(?!{WORD})/?(?!@)
+    |
+    # Phone numbers
+    (?:\+?[01][ *\-.)]*)?(?:\(?\d{{3}}[ *\-.)]*)?\d{{3}}[ *\-.)]*\d{{4}}
+    |
+    {EMOTICONS}
+    |
+    <[^>\s]+>                   # HTML tags
+    |
+    -+>|<-+                     # arrows
+    |
+    @{WORD}+                    # user names
+    |
+    \#+{WORD}+(?:{WORD}|['\-])*{WORD}+  # hashtags
+    |
+    # email
+    (?:{WORD}|[.+-]){{1,64}}@(?:{WORD}|-){{1,63}}\.(?:(?:{WORD}|-)\.?){{1,251}}(?:{WORD}|-)
+    |
+    {LETTER}(?:{LETTER}|['\-_])+{LETTER}  # words with apostrophes or dashes
+    |
+    [+\-]?\d+[,/.:-]\d+[+\-]?   # numbers, including fractions, decimals
+    |
+    {WORD}+                     # words without apostrophes or dashes
+    |
+    \.(?:\s*\.)+                # ellipsis dots
+    |
+    \S                          # everything else that isn't whitespace
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+# HTML entities, which are replaced like in TweetTokenizer
+ENTITY_RE = re.compile(r"&(#?(x?))([^&;\s]+);")
+
+# Runs of four or more of the same character that is not a letter or a
+# digit are shortened to three
+REPEATED_RE = re.compile(r"([\W_])\1{3,}")
+
+
+def replace_entity(m: re.Match) -> str:
+    body = m.group(3)
+    number: int | None
+    if m.group(1):
+        try:
+            number = int(body, 16 if m.group(2) else 10)
+            if 0x80 <= number <= 0x9F:
+                return bytes((number,)).decode("cp1252")
+        except (ValueError, UnicodeDecodeError):
+            number = None
+    else:
+        number = html.entities.name2codepoint.get(body)
+    if number is not None:
+        try:
+            return chr(number)
+        except (ValueError, OverflowError):
+            pass
+    return ""
+
+
+def tokenize_desc(text: str) -> list[str]:
+    """Splits an English description into words and punctuation."""
+    if "&" in text:
+        text = ENTITY_RE.sub(replace_entity, text)
+    return DESC_TOKEN_RE.findall(REPEATED_RE.sub(r"\1\1\1", text))
@@ -9,18 +9,21 @@ import re
 import unicodedata
 from typing import (
     Any,
+    Iterable,
     Literal,
+    NamedTuple,
     Optional,
     Sequence,
     Union,
 )
 
 import Levenshtein
-from nltk import TweetTokenizer  # type:ignore[import-untyped]
 from wikitextprocessor.parser import WikiNode
 
 from ...datautils import data_append, data_extend, split_at_comma_semi
 from ...page import extract_links_from_node
+from ...result_cache import persistent_cache
+from ...run_report import span
 from ...tags import (
     alt_of_tags,
     form_of_tags,
@@ -39,6 +42,7 @@ from ...tags import (
 )
 from ...topics import topic_generalize_map, valid_topics
 from ...wxr_context import WiktextractContext
+from .desc_tokenizer import tokenize_desc
 from .english_words import (
     english_words,
     not_english_words,
@@ -57,9 +61,6 @@ from .type_utils import (
     WordData,
 )
 
-# Tokenizer for classify_desc()
-tokenizer = TweetTokenizer()
-
 # These are ignored as the value of a related form in form head.
 IGNORED_RELATED: set[str] = set(
     [
@@ -349,8 +350,26 @@ ok_suspicious_forms: set[str] = set(
 )
 
 
+# Modules whose data decode_tags() and classify_desc() use, for the
+# version of their results in the persistent result cache
+TAG_DATA_MODULES = (
+    "wiktextract.datautils",
+    "wiktextract.tags",
+    "wiktextract.topics",
+    __name__,
+)
+DESC_DATA_MODULES = TAG_DATA_MODULES + tuple(
+    f"{__package__}.{name}"
+    for name in (
+        "desc_tokenizer",
+        "english_words",
+        "form_descriptions_known_firsts",
+        "taxondata",
+    )
+)
+
 # Replacements to be done in classify_desc before tokenizing.  This is a
-# workaround for shortcomings in TweetTokenizer.
+# workaround for shortcomings in the tokenizer.
 tokenizer_fixup_map = {
     r"a.m.": "AM",
     r"p.m.": "PM",
@@ -841,6 +860,38 @@ add_to_valid_tree_mapping(
     valid_sequences, topic_generalize_map, valid_topics, True
 )
 
+
+class TagAutomaton:
+    """The valid_sequences tree compiled for decode_tags1().  Words are
+    coded as integers, and the nodes of the tree are numbered states whose
+    transitions, end flags and path step tags and topics are in lists
+    indexed by the state.  State 0 is the root."""
+
+    __slots__ = ("word_ids", "transitions", "ends", "tags", "topics")
+
+    def __init__(self, root: ValidNode) -> None:
+        self.word_ids: dict[str, int] = {}
+        self.transitions: list[dict[int, int]] = []
+        self.ends: list[bool] = []
+        self.tags: list[tuple[str, ...]] = []
+        self.topics: list[tuple[str, ...]] = []
+        self.add_state(root)
+
+    def add_state(self, node: ValidNode) -> int:
+        state = len(self.ends)
+        transitions: dict[int, int] = {}
+        self.transitions.append(transitions)
+        self.ends.append(node.end)
+        self.tags.append(tuple(node.tags))
+        self.topics.append(tuple(node.topics))
+        for word, child in node.children.items():
+            word_id = self.word_ids.setdefault(word, len(self.word_ids))
+            transitions[word_id] = self.add_state(child)
+        return state
+
+
+tag_automaton = TagAutomaton(valid_sequences)
+
 # Regex used to divide a decode candidate into parts that shouldn't
 # have their slashes turned into spaces
 slashes_re = re.compile(
@@ -858,6 +909,70 @@ word_pattern = (
 word_re_global = re.compile(word_pattern)
 
 
+def is_word_char(c: str) -> bool:
+    # The same characters as `\w` in regexps
+    return c.isalnum() or c == "_"
+
+
+class HeadWordTokenizer:
+    """Finds the "words" of word heads and descriptions like
+    `word_re_global`, except that the link words ``link_words`` (links with
+    spaces, commas or other non-alphanumeric characters) are single words
+    where they start and end at a word boundary (`\b`).  At each position
+    the longest link word is tried before `word_pattern`.  The link words
+    are found with `str.find()`, so no regexp is compiled for each head."""
+
+    __slots__ = ("link_words",)
+
+    def __init__(self, link_words: Iterable[str]) -> None:
+        # Link word and whether its first and last characters are word
+        # characters
+        self.link_words = [
+            (w, is_word_char(w[0]), is_word_char(w[-1]))
+            for w in set(link_words)
+            if w != ""
+        ]
+
+    def link_spans(self, text: str) -> list[tuple[int, int]]:
+        """Returns the start and end positions of the longest link word at
+        each position where one matches, sorted."""
+        ends: dict[int, int] = {}
+        for w, first_is_word, last_is_word in self.link_words:
+            start = text.find(w)
+            while start >= 0:
+                end = start + len(w)
+                if (
+                    end > ends.get(start, -1)
+                    and (start > 0 and is_word_char(text[start - 1]))
+                    != first_is_word
+                    and (end < len(text) and is_word_char(text[end]))
+                    != last_is_word
+                ):
+                    ends[start] = end
+                start = text.find(w, start + 1)
+        return sorted(ends.items())
+
+    def words(self, text: str) -> list[str]:
+        spans = self.link_spans(text) if self.link_words else []
+        if not spans:
+            return [m.group() for m in word_re_global.finditer(text)]
+        words = []
+        pos = 0
+        i = 0
+        while True:
+            while i < len(spans) and spans[i][0] < pos:
+                i += 1
+            m = word_re_global.search(text, pos)
+            if i < len(spans) and (m is None or spans[i][0] <= m.start()):
+                start, pos = spans[i]
+                words.append(text[start:pos])
+            elif m is not None:
+                words.append(m.group())
+                pos = m.end()
+            else:
+                return words
+
+
 def distw(titleparts: Sequence[str], word: str) -> float:
     """Computes how distinct ``word`` is from the most similar word in
     ``titleparts``.  Returns 1 if words completely distinct, 0 if
@@ -894,8 +1009,13 @@ def map_with(
     return ret
 
 
-TagList = list[str]
-PosPathStep = tuple[int, TagList, TagList]
+# A step of a tag path: the position where the unknown words or the
+# sequence before the step start, and the tags and topics of the sequence
+PosPathStep = tuple[int, tuple[str, ...], tuple[str, ...]]
+# Weight of a path (its length, plus 100 if it has unknown words), the
+# steps of the path from the last to the first one, and whether it has
+# unknown words.  Paths are compared by weight and then by their steps.
+PosPath = tuple[int, tuple[PosPathStep, ...], bool]
 
 
 def check_unknown(
@@ -905,7 +1025,7 @@ def check_unknown(
     wordlst: Sequence[str],
     allow_any: bool,
     no_unknown_starts: bool,
-) -> list[PosPathStep]:
+) -> tuple[PosPathStep, ...]:
     """Check if the current section from_i->to_i is actually unknown
     or if it needs some special handling. We already presupposed that
     this is UNKNOWN; this is just called to see what *kind* of UNKNOWN."""
@@ -916,18 +1036,18 @@ def check_unknown(
     # print("check_unknown to_i={} from_i={} i={}"
     #       .format(to_i, from_i, i))
     if from_i >= to_i:
-        return []
+        return ()
     words = wordlst[from_i:to_i]
     tag = " ".join(words)
     assert tag
     # print(f"{tag=}")
     if re.match(ignored_unknown_starts_re, tag):
         # Tags with this start are to be ignored
-        return [(from_i, ["UNKNOWN"], [])]
+        return ((from_i, ("UNKNOWN",), ()),)
     if tag in ignored_unknown_tags:
-        return []  # One of the tags listed as to be ignored
+        return ()  # One of the tags listed as to be ignored
     if tag in ("and", "or"):
-        return []
+        return ()
     if (
         not allow_any
         and not words[0].startswith("~")
@@ -939,61 +1059,40 @@ def check_unknown(
     ):
         # print("ERR allow_any={} words={}"
         #       .format(allow_any, words))
-        return [
-            (from_i, ["UNKNOWN"], ["error-unknown-tag"])
-        ]  # Add ``tag`` here to include
+        return (
+            (from_i, ("UNKNOWN",), ("error-unknown-tag",)),
+        )  # Add ``tag`` here to include
     else:
-        return [(from_i, ["UNKNOWN"], [tag])]
+        return ((from_i, ("UNKNOWN",), (tag,)),)
 
 
-def add_new1(
-    node: ValidNode,
-    i: int,
-    start_i: int,
-    last_i: int,
-    new_paths: list[list[PosPathStep]],
-    new_nodes: list[tuple[ValidNode, int, int]],
-    pos_paths: list[list[list[PosPathStep]]],
-    wordlst: list[str],
-    allow_any: bool,
-    no_unknown_starts: bool,
-    max_last_i: int,
-) -> int:
-    assert isinstance(new_paths, list)
-    # print("add_new: start_i={} last_i={}".format(start_i, last_i))
-    # print("$ {} last_i={} start_i={}"
-    # .format(w, last_i, start_i))
-    max_last_i = max(max_last_i, last_i)  # if last_i has grown
-    if (node, start_i, last_i) not in new_nodes:
-        new_nodes.append((node, start_i, last_i))
-    if node.end:
-        # We can see a terminal point in the search tree.
-        u = check_unknown(
-            last_i, start_i, i, wordlst, allow_any, no_unknown_starts
-        )
-        # Create new paths candidates based on different past possible
-        # paths; pos_path[last_i] contains possible paths, so add this
-        # new one at the beginning(?)
-        # The list comprehension inside the parens generates an iterable
-        # of lists, so this is .extend( [(last_i...)], [(last_i...)], ... )
-        # XXX: this is becoming impossible to annotate, nodes might
-        # need to become classed objects and not just dicts, or at least
-        # a TypedDict with a "children" node
-        new_paths.extend(
-            [(last_i, node.tags, node.topics)] + u + x
-            for x in pos_paths[last_i]
-        )
-        max_last_i = i + 1
-    return max_last_i
+def extend_path(steps: tuple[PosPathStep, ...], path: PosPath) -> PosPath:
+    """Returns ``path`` continued with ``steps``, the last step first."""
+    weight, old_steps, unknown = path
+    if not unknown and any(step[1] == ("UNKNOWN",) for step in steps):
+        unknown = True
+        weight += 100
+    return (weight + len(steps), steps + old_steps, unknown)
 
 
-@functools.lru_cache(maxsize=65536)
+class DecodedTags(NamedTuple):
+    """The alternative tag sets and the topics decoded by `decode_tags()`.
+    The results are shared through its cache, so they are immutable."""
+
+    tagsets: tuple[tuple[str, ...], ...]
+    topics: tuple[str, ...]
+
+
+@functools.lru_cache(maxsize=262144)
+@persistent_cache("decode_tags", TAG_DATA_MODULES)
 def decode_tags(
     src: str,
     allow_any=False,
     no_unknown_starts=False,
-) -> tuple[list[tuple[str, ...]], list[str]]:
-    tagsets, topics = decode_tags1(src, allow_any, no_unknown_starts)
+) -> DecodedTags:
+    # Only calls that miss the cache are timed
+    with span("decode_tags"):
+        tagsets, topics = decode_tags1(src, allow_any, no_unknown_starts)
     # print(f"decode_tags: {src=}, {tagsets=}")
 
     # Insert retry-code here that modifies the text source
@@ -1047,9 +1146,9 @@ def decode_tags(
             new_errors += sum(1 for s in new_topics if s.startswith("error"))
 
             if new_errors <= old_errors:
-                return new_tagsets, new_topics
+                return DecodedTags(tuple(new_tagsets), tuple(new_topics))
 
-    return tagsets, topics
+    return DecodedTags(tuple(tagsets), tuple(topics))
 
 
 def decode_tags1(
@@ -1063,18 +1162,14 @@ def decode_tags1(
 
     # print("decode_tags: src={!r}".format(src))
 
-    pos_paths: list[list[list[PosPathStep]]] = [[[]]]
+    transitions = tag_automaton.transitions
+    ends = tag_automaton.ends
+    root_transitions = transitions[0]
+    word_ids = tag_automaton.word_ids
+    # Best paths up to each word position
+    pos_paths: list[list[PosPath]] = [[(0, (), False)]]
     wordlst: list[str] = []
-    max_last_i = 0  # pre-initialized here so that it can be used as a ref
-
-    add_new = functools.partial(
-        add_new1,  # pre-set parameters and references for function
-        pos_paths=pos_paths,
-        wordlst=wordlst,
-        allow_any=allow_any,
-        no_unknown_starts=no_unknown_starts,
-        max_last_i=max_last_i,
-    )
+
     # First split the tags at commas and semicolons.  Their significance is that
     # a multi-word sequence cannot continue across them.
     parts = split_at_comma_semi(src, extra=[";", ":"])
@@ -1085,89 +1180,89 @@ def decode_tags1(
         if not lst1:
             continue
         wordlst.extend(lst1)
-        cur_nodes: list[tuple[ValidNode, int, int]] = []  # Currently seen
+        # Currently seen states, with the positions where their sequence
+        # and the unknown words before it start
+        cur_nodes: list[tuple[int, int, int]] = []
         for w in lst1:
             i = len(pos_paths) - 1
-            new_nodes: list[tuple[ValidNode, int, int]] = []
-            # replacement nodes for next loop
-            new_paths: list[list[PosPathStep]] = []
+            word_id = word_ids.get(w, -1)
+            # State of a new sequence starting with this word
+            root_state = root_transitions.get(word_id)
             # print("ITER i={} w={} max_last_i={} wordlst={}"
             #       .format(i, w, max_last_i, wordlst))
-            node: ValidNode
-            start_i: int
-            last_i: int
-            for node, start_i, last_i in cur_nodes:
-                # ValidNodes are part of a search tree that checks if a
+            candidates: list[tuple[int, int, int]] = []
+            for state, start_i, last_i in cur_nodes:
+                # States are part of a search tree that checks if a
                 # phrase is found in xlat_tags_map and other text->tags dicts.
-                if w in node.children:
+                next_state = transitions[state].get(word_id)
+                if next_state is not None:
                     # the phrase continues down the tree
-                    # print("INC", w)
-                    max_last_i = add_new(
-                        node.children[w],
-                        i,
-                        start_i,
-                        last_i,
-                        new_paths,
-                        new_nodes,
-                    )
-                if node.end:
+                    candidates.append((next_state, start_i, last_i))
+                if ends[state]:
                     # we've hit an end point, the tags and topics have already
                     # been gathered at some point, don't do anything with the
                     # old stuff
-                    if w in valid_sequences.children:
+                    if root_state is not None:
                         # This starts a *new* possible section
-                        max_last_i = add_new(
-                            valid_sequences.children[w],  # root->
-                            i,
-                            i,
-                            i,
-                            new_paths,
-                            new_nodes,
-                        )
-                if w not in node.children and not node.end:
-                    # print("w not in node and $: i={} last_i={} wordlst={}"
-                    #       .format(i, last_i, wordlst))
+                        candidates.append((root_state, i, i))
+                elif (
+                    next_state is None
+                    and root_state is not None
                     # If i == last_i == 0, for example (beginning)
-                    if (
+                    and (
                         i == last_i
                         or no_unknown_starts
                         or wordlst[last_i] not in allowed_unknown_starts
-                    ):
-                        # print("NEW", w)
-                        if w in valid_sequences.children:
-                            # Start new sequences here
-                            max_last_i = add_new(
-                                valid_sequences.children[w],
-                                i,
-                                i,
-                                last_i,
-                                new_paths,
-                                new_nodes,
-                            )
-            if not new_nodes:
-                # This is run at the start when i == max_last_i == 0,
-                # which is what populates the first node in new_nodes.
-                # Some initial words cause the rest to be interpreted as unknown
-                # print("not new nodes: i={} last_i={} wordlst={}"
-                #       .format(i, max_last_i, wordlst))
-                if (
+                    )
+                ):
+                    # Start new sequences here
+                    candidates.append((root_state, i, last_i))
+            if (
+                not candidates
+                and root_state is not None
+                and (
                     i == max_last_i
                     or no_unknown_starts
                     or wordlst[max_last_i] not in allowed_unknown_starts
-                ):
-                    # print("RECOVER w={} i={} max_last_i={} wordlst={}"
-                    #       .format(w, i, max_last_i, wordlst))
-                    if w in valid_sequences.children:
-                        max_last_i = add_new(
-                            # new sequence from root
-                            valid_sequences.children[w],
-                            i,
+                )
+            ):
+                # This is run at the start when i == max_last_i == 0,
+                # which is what populates the first node in new_nodes.
+                # Some initial words cause the rest to be interpreted as unknown
+                # new sequence from root
+                candidates.append((root_state, i, max_last_i))
+            new_paths: list[PosPath] = []
+            for state, start_i, last_i in candidates:
+                if ends[state]:
+                    # We can see a terminal point in the search tree.
+                    # Create new paths candidates based on different past
+                    # possible paths ending where the unknown words before
+                    # the sequence start
+                    step = (
+                        last_i,
+                        tag_automaton.tags[state],
+                        tag_automaton.topics[state],
+                    )
+                    if last_i < start_i:
+                        steps = (step,) + check_unknown(
+                            last_i,
+                            start_i,
                             i,
-                            max_last_i,
-                            new_paths,
-                            new_nodes,
+                            wordlst,
+                            allow_any,
+                            no_unknown_starts,
                         )
-            cur_nodes = new_nodes  # Completely replace nodes!
+                        for path in pos_paths[last_i]:
+                            new_paths.append(extend_path(steps, path))
+                    else:
+                        for weight, old_steps, unknown in pos_paths[last_i]:
+                            new_paths.append(
+                                (weight + 1, (step,) + old_steps, unknown)
+                            )
+                    max_last_i = i + 1
+                else:
+                    max_last_i = last_i
+            cur_nodes = list(dict.fromkeys(candidates))  # Replace nodes!
             # 2023-08-18, fix to improve performance
             # Decode tags does a big search of the best-shortest matching
             # sequences of tags, but the original algorithm didn't have
@@ -1181,14 +1276,8 @@ def decode_tags1(
             # This *can* cause bugs if it gets stuck in a local minimum
             # or something, but this whole process is one-dimensional
             # and not that complex, so hopefully it works out...
-            pw = []
-            path: list[PosPathStep]
-            for path in new_paths:
-                weight = len(path)
-                if any(x[1] == ["UNKNOWN"] for x in path):
-                    weight += 100  # Penalize unknown paths
-                pw.append((weight, path))
-            new_paths = [weightpath[1] for weightpath in sorted(pw)[:10]]
+            if len(new_paths) > 10:
+                new_paths = sorted(new_paths)[:10]
             pos_paths.append(new_paths)
 
         # print("END max_last_i={} len(wordlst)={} len(pos_paths)={}"
@@ -1196,14 +1285,19 @@ def decode_tags1(
 
         if cur_nodes:
             # print("END HAVE_NODES")
-            for node, start_i, last_i in cur_nodes:
-                if node.end:
+            for state, start_i, last_i in cur_nodes:
+                if ends[state]:
                     # print("$ END start_i={} last_i={}"
                     #       .format(start_i, last_i))
+                    steps = (
+                        (
+                            last_i,
+                            tag_automaton.tags[state],
+                            tag_automaton.topics[state],
+                        ),
+                    )
                     for path in pos_paths[start_i]:
-                        pos_paths[-1].append(
-                            [(last_i, node.tags, node.topics)] + path
-                        )
+                        pos_paths[-1].append(extend_path(steps, path))
                 else:
                     # print("UNK END start_i={} last_i={} wordlst={}"
                     #       .format(start_i, last_i, wordlst))
@@ -1215,15 +1309,12 @@ def decode_tags1(
                         allow_any,
                         no_unknown_starts,
                     )
-                    if pos_paths[start_i]:
-                        for path in pos_paths[start_i]:
-                            pos_paths[-1].append(u + path)
-                    else:
-                        pos_paths[-1].append(u)
+                    for path in pos_paths[start_i] or [(0, (), False)]:
+                        pos_paths[-1].append(extend_path(u, path))
         else:
             # Check for a final unknown tag
             # print("NO END NODES max_last_i={}".format(max_last_i))
-            paths = pos_paths[max_last_i] or [[]]
+            paths = pos_paths[max_last_i] or [(0, (), False)]
             u = check_unknown(
                 max_last_i,
                 len(wordlst),
@@ -1235,7 +1326,7 @@ def decode_tags1(
             if u:
                 # print("end max_last_i={}".format(max_last_i))
                 for path in list(paths):  # Copy in case it is the last pos
-                    pos_paths[-1].append(u + path)
+                    pos_paths[-1].append(extend_path(u, path))
 
     # import json
     # print("POS_PATHS:", json.dumps(pos_paths, indent=2, sort_keys=True))
@@ -1245,49 +1336,28 @@ def decode_tags1(
         return [], []
 
     # Find the best path
-    pw = []
-    for path in pos_paths[-1]:
-        weight = len(path)
-        if any(x[1] == ["UNKNOWN"] for x in path):
-            weight += 100  # Penalize unknown paths
-        pw.append((weight, path))
-    path = min(pw)[1]
+    _, path, _ = min(pos_paths[-1])
 
     # Convert the best path to tagsets and topics
-    tagsets: list[list[str]] = [[]]
+    tagsets: list[frozenset[str]] = [frozenset()]
     topics: list[str] = []
     for i, tagspec, topicspec in path:
-        if len(tagsets or "") > 16:
+        if len(tagsets) > 16:
             # ctx.error("Too many tagsets! This is probably exponential",
             #           sortid="form_descriptions/20230818")
             return [("error-unknown-tag", "error-exponential-tagsets")], []
-        if tagspec == ["UNKNOWN"]:
-            new_tagsets = []
-            for x in tagsets:
-                new_tagsets.append(x + topicspec)
-            tagsets = new_tagsets
+        if tagspec == ("UNKNOWN",):
+            tagsets = [x.union(topicspec) for x in tagsets]
             continue
         if tagspec:
-            new_tagsets = []
-            for x in tagsets:
-                for t in tagspec:
-                    if t:
-                        new_tags = list(x)
-                        for tag in t.split():
-                            if tag not in new_tags:
-                                new_tags.append(tag)
-                        new_tagsets.append(new_tags)
-                    else:
-                        new_tagsets.append(x)
-            tagsets = new_tagsets
-        if topicspec:
-            for t in topicspec:
-                for topic in t.split():
-                    if topic not in topics:
-                        topics.append(topic)
+            tagsets = [x.union(t.split()) for x in tagsets for t in tagspec]
+        for t in topicspec:
+            for topic in t.split():
+                if topic not in topics:
+                    topics.append(topic)
 
     # print("unsorted tagsets:", tagsets)
-    ret_tagsets = sorted(set(tuple(sorted(set(tags))) for tags in tagsets))
+    ret_tagsets = sorted(set(tuple(sorted(tags)) for tags in tagsets))
     # topics = list(sorted(set(topics)))   XXX tests expect not sorted
     # print("decode_tags: {} -> {} topics {}".format(src, tagsets, topics))
     # Yes, ret_tagsets is a list of tags in tuples, while topics is a LIST
@@ -1546,7 +1616,7 @@ def add_related(
     ruby_data: Optional[Sequence[tuple[str, str]]] = None,
     links: list[tuple[str, str]] | None = None,
     link_dict: dict[str, list[str]] | None = None,
-) -> Optional[list[tuple[str, ...]]]:
+) -> Optional[tuple[tuple[str, ...], ...]]:
     """Internal helper function for some post-processing entries for related
     forms (e.g., in word head).  This returns a list of list of tags to be
     added to following related forms or None (cf. walrus/English word head,
@@ -1608,8 +1678,8 @@ def add_related(
 
     following_tagsets = None  # Tagsets to add to following related forms
     roman = None
-    tagsets1: list[tuple[str, ...]] = [tuple()]
-    topics1: list[str] = []
+    tagsets1: tuple[tuple[str, ...], ...] = ((),)
+    topics1: tuple[str, ...] = ()
 
     m = re.match(r"\((([^()]|\([^()]*\))*)\)\s+", related)
     if m:
@@ -1942,25 +2012,9 @@ def parse_word_head(
     if link_words_not_alnum is None:
         link_words_not_alnum = []
 
-    if len(link_words_not_alnum) > 0:
-        # if we have link data (that is, links with stuff like commas and
-        # spaces, replace word_re with a modified local scope pattern
-        # print(f"links {list((c, ord(c)) for link in links for c in link)=}")
-        word_re = re.compile(
-            r"\b"  # In case we have forms that are longer and contain links
-            +
-            # or words as a substring...
-            r"\b|\b".join(
-                sorted(
-                    (re.escape(s) for s in link_words_not_alnum),
-                    key=lambda x: -len(x),
-                )
-            )
-            + r"\b|"
-            + word_pattern
-        )
-    else:
-        word_re = word_re_global
+    # if we have link data (that is, links with stuff like commas and
+    # spaces), keep the links as single words
+    word_tokenizer = HeadWordTokenizer(link_words_not_alnum)
 
     if "Lua execution error" in text or "Lua timeout error" in text:
         return
@@ -1991,10 +2045,7 @@ def parse_word_head(
     titleword = re.sub(
         r"^Reconstruction:[^/]*/", "", wxr.wtp.title or "MISSING_TITLE"
     )
-    titleparts = list(
-        m.group(0)
-        for m in re.finditer(word_re, wxr.wtp.title or "MISSING_TITLE")
-    )
+    titleparts = word_tokenizer.words(wxr.wtp.title or "MISSING_TITLE")
     if not titleparts:
         return
 
@@ -2190,9 +2241,9 @@ def parse_word_head(
         else:
             expanded_alts = map_with(xlat_descs_map, [alt])
         # print("EXPANDED_ALTS:", expanded_alts)
-        tagsets: Optional[list[tuple[str, ...]]]
+        tagsets: Optional[Sequence[tuple[str, ...]]]
         for alt in expanded_alts:
-            baseparts = list(m.group(0) for m in word_re.finditer(alt))
+            baseparts = word_tokenizer.words(alt)
             if alt_i > 0:
                 tagsets, topics = decode_tags(" ".join(baseparts))
                 if not any("error-unknown-tag" in x for x in tagsets):
@@ -2354,7 +2405,9 @@ def parse_word_head(
                     ),
                 )
             )
-        prev_tags: Union[list[list[str]], list[tuple[str, ...]], None] = None
+        prev_tags: Union[list[list[str]], Sequence[tuple[str, ...]], None] = (
+            None
+        )
         following_tags = None  # Added to prev_tags from previous parenthesized
         # part, e.g. walrus/English
         # "(both nonstandard, proscribed, uncommon)"
@@ -2623,7 +2676,7 @@ def parse_word_head(
                 )
                 continue
 
-            parts = list(m.group(0) for m in re.finditer(word_re, desc))
+            parts = word_tokenizer.words(desc)
             if not parts:
                 prev_tags = None
                 following_tags = None
@@ -3339,7 +3392,7 @@ alt_infl_disallowed: set[str] = set(
     [
         "error-unknown-tag",
         "place",  # Not in inflected forms and causes problems e.g. house/
-                  # English
+        # English
     ]
 )
 
@@ -3564,6 +3617,7 @@ def parse_alt_or_inflection_of1(
 
 
 @functools.lru_cache(maxsize=65536)
+@persistent_cache("classify_desc", DESC_DATA_MODULES)
 def classify_desc(
     desc: str,
     allow_unknown_tags=False,
@@ -3623,7 +3677,7 @@ def classify_desc(
         desc1 = re.sub(
             tokenizer_fixup_re, lambda m: tokenizer_fixup_map[m.group(0)], desc
         )
-        tokens = tokenizer.tokenize(desc1)
+        tokens = tokenize_desc(desc1)
         if not tokens:
             return "other"
         lst_bool = list(
@@ -1492,7 +1492,9 @@ def parse_simple_table(
         row1 = []
         row2 = []
         for cell in row:
-            cell1 = copy.deepcopy(cell)
+            # Shallow copies; the text and rowspan of the copies are replaced
+            # below, and the links list is only read
+            cell1 = copy.copy(cell)
             if "\n" in cell.text:
                 # Has more than one line - split this cell
                 parts = cell.text.strip().splitlines()
@@ -1503,7 +1505,7 @@ def parse_simple_table(
                         ),
                         sortid="inflection/1234",
                     )
-                cell2 = copy.deepcopy(cell)
+                cell2 = copy.copy(cell)
                 cell1.text = parts[0]
                 cell2.text = parts[1]
             else:
@@ -32,6 +32,7 @@ from wikitextprocessor.parser import (
 
 from ...clean import clean_template_args, clean_value
 from ...datautils import (
+    copy_data,
     data_append,
     data_extend,
     ns_title_prefix_tuple,
@@ -1012,17 +1013,22 @@ def parse_language(
     # a step.
     stack: list[str] = []  # names of items on the "stack"
 
-    def merge_base(data: WordData, base: WordData) -> None:
+    def merge_base(
+        data: WordData, base: WordData, copy_values: bool = True
+    ) -> None:
+        """Merges ``base`` into ``data``.  ``copy_values`` can be False if
+        ``base`` is discarded after this, so its values need not be copied."""
         for k, v in base.items():
-            # Copy the value to ensure that we don't share lists or
-            # dicts between structures (even nested ones).
-            v = copy.deepcopy(v)
+            if k in data and data[k] == v:  # type: ignore[literal-required]
+                continue
+            if copy_values:
+                # Copy the value to ensure that we don't share lists or
+                # dicts between structures (even nested ones).
+                v = copy_data(v)
             if k not in data:
                 # The list was copied above, so this will not create shared ref
                 data[k] = v  # type: ignore[literal-required]
                 continue
-            if data[k] == v:  # type: ignore[literal-required]
-                continue
             if (
                 isinstance(data[k], (list, tuple))  # type: ignore[literal-required]
                 or isinstance(
@@ -1132,11 +1138,12 @@ def parse_language(
         push_sense(sorting_ordinal)
         if wxr.wtp.subsection:
             data: WordData = {"senses": sense_datas}
-            merge_base(data, pos_data)
+            # pos_data is not used after this
+            merge_base(data, pos_data, copy_values=False)
             level_four_datas.append(data)
         pos_data = {}
         sense_datas = []
-        wxr.wtp.start_subsection(None)
+        wxr.start_subsection(None)
 
     def push_level_four_section(clear_sound_data: bool) -> None:
         """Starts collecting data for a new level four sections, which
@@ -1175,7 +1182,7 @@ def parse_language(
         inside_level_four = False
         # etymology section could under pronunciation section
         etym_data = (
-            copy.deepcopy(level_four_data) if len(level_four_data) > 0 else {}
+            copy_data(level_four_data) if len(level_four_data) > 0 else {}
         )
 
     def select_data() -> WordData:
@@ -1729,13 +1736,11 @@ def parse_language(
             collect_links=True,
             remove_anchors_from_links=True,
         )
-        if "links" in pos_data:
-            # WordData doesn't use `links`, so we can use `collect_links=True`
-            # above without special handling and smuggle link data.
-            extracted_links = pos_data["links"]  # type: ignore
-            del pos_data["links"]  # type: ignore
-        else:
-            extracted_links = None
+        # WordData doesn't use `links`, so we can use `collect_links=True`
+        # above without special handling and smuggle link data.  The links
+        # are from the expanded header; an empty list tells
+        # parse_word_head() not to expand the header nodes again.
+        extracted_links = pos_data.pop("links", [])  # type: ignore
         # print(f"{header_text=}, {extracted_links=}")
 
         header_text = re.sub(r"\s+", " ", header_text).strip()
@@ -1764,19 +1769,20 @@ def parse_language(
             # print(f"{tlb_tagsets=}, {tlb_topicsets=}")
 
         # print(f"{header_text=}")
-        parse_word_head(
-            wxr,
-            word,
-            pos_type,
-            header_text,
-            pos_data,
-            is_reconstruction,
-            header_group,
-            header_nodes,
-            ruby=ruby,
-            links=extracted_links,
-            label_templates=normal_label_templates,
-        )
+        with wxr.span("parse_word_head"):
+            parse_word_head(
+                wxr,
+                word,
+                pos_type,
+                header_text,
+                pos_data,
+                is_reconstruction,
+                header_group,
+                header_nodes,
+                ruby=ruby,
+                links=extracted_links,
+                label_templates=normal_label_templates,
+            )
         if "tags" in pos_data:
             # pos_data can get "tags" data from some source; type-checkers
             # doesn't like it, so let's ignore it.
@@ -2668,9 +2674,10 @@ def parse_language(
             )
             texts = [text]
         for text in texts:
-            tree = wxr.wtp.parse(
-                text, expand_all=True, template_fn=inflection_template_fn
-            )
+            with wxr.span("parse"):
+                tree = wxr.wtp.parse(
+                    text, expand_all=True, template_fn=inflection_template_fn
+                )
 
             if not text.strip():
                 continue
@@ -2684,16 +2691,17 @@ def parse_language(
                     template_name = m.group(1).strip()
                     tablecontext = TableContext(template_name)
 
-                parse_inflection_section(
-                    wxr,
-                    pos_data,
-                    word,
-                    language,
-                    pos,
-                    section,
-                    tree,
-                    tablecontext=tablecontext,
-                )
+                with wxr.span("parse_inflection_section"):
+                    parse_inflection_section(
+                        wxr,
+                        pos_data,
+                        word,
+                        language,
+                        pos,
+                        section,
+                        tree,
+                        tablecontext=tablecontext,
+                    )
 
     def get_subpage_section(
         title: str, subtitle: str, seqs: list[Union[list[str], tuple[str, ...]]]
@@ -2740,12 +2748,13 @@ def parse_language(
                     return ret
             return None
 
-        tree = wxr.wtp.parse(
-            subpage_content,
-            pre_expand=True,
-            additional_expand=ADDITIONAL_EXPAND_TEMPLATES,
-            do_not_pre_expand=DO_NOT_PRE_EXPAND_TEMPLATES,
-        )
+        with wxr.span("parse"):
+            tree = wxr.wtp.parse(
+                subpage_content,
+                pre_expand=True,
+                additional_expand=ADDITIONAL_EXPAND_TEMPLATES,
+                do_not_pre_expand=DO_NOT_PRE_EXPAND_TEMPLATES,
+            )
         assert tree.kind == NodeKind.ROOT
         for seq in seqs:
             ret = recurse(tree, seq)
@@ -2989,7 +2998,8 @@ def parse_language(
                             seqs,
                         )
                     if subnode is not None and isinstance(subnode, WikiNode):
-                        parse_translations(data, subnode)
+                        with wxr.span("translations"):
+                            parse_translations(data, subnode)
                     return ""
                 if name in (
                     "c",
@@ -3146,7 +3156,8 @@ def parse_language(
                             if subnode is not None and isinstance(
                                 subnode, WikiNode
                             ):
-                                parse_translations(data, subnode)
+                                with wxr.span("translations"):
+                                    parse_translations(data, subnode)
                         else:
                             wxr.wtp.error(
                                 "/translations link outside part-of-speech"
@@ -3307,8 +3318,8 @@ def parse_language(
                 wxr, etym_data, node.sarg if node.sarg else node.largs
             )
             t = t.lower()
-            # XXX these counts were never implemented fully, and even this
-            # gets discarded: Search STATISTICS_IMPLEMENTATION
+            # Returned with the page statistics when a run report is
+            # requested, see `page_handler()`
             wxr.config.section_counts[t] += 1
             # print("PROCESS_CHILDREN: T:", repr(t))
             if t in IGNORED_TITLES:
@@ -3324,7 +3335,7 @@ def parse_language(
                     # Pronunciation 1, etc, are used in Chinese Glyphs,
                     # and each of them may have senses under Definition
                     push_level_four_section(True)
-                    wxr.wtp.start_subsection(None)
+                    wxr.start_subsection(None)
                 if wxr.config.capture_pronunciation:
                     data = select_data()
                     parse_pronunciation(
@@ -3338,7 +3349,7 @@ def parse_language(
                     )
             elif t.startswith(tuple(ETYMOLOGY_TITLES)):
                 push_etym()
-                wxr.wtp.start_subsection(None)
+                wxr.start_subsection(None)
                 if wxr.config.capture_etymologies:
                     m = re.search(r"\s(\d+(\.\d+)?)$", t)
                     if m:
@@ -3357,7 +3368,8 @@ def parse_language(
                 extract_descendant_section(wxr, data, node, True)
             elif t == TRANSLATIONS_TITLE:
                 data = select_data()
-                parse_translations(data, node)
+                with wxr.span("translations"):
+                    parse_translations(data, node)
             elif t in INFLECTION_TITLES:
                 parse_inflection(node, t, pos)
             elif t == "alternative forms":
@@ -3371,7 +3383,7 @@ def parse_language(
                     push_pos()
                     dt = POS_TITLES[t_no_number]  # type:ignore[literal-required]
                     pos = dt["pos"] or "MISSING_POS"
-                    wxr.wtp.start_subsection(t)
+                    wxr.start_subsection(t)
                     if "debug" in dt:
                         wxr.wtp.debug(
                             "{} in section {}".format(dt["debug"], t),
@@ -3406,27 +3418,29 @@ def parse_language(
                     # print(f"LINKAGE_TITLES NODE {node=}")
                     rel = LINKAGE_TITLES[t_no_number]
                     data = select_data()
-                    parse_linkage(
-                        wxr,
-                        data,
-                        rel,
-                        node,
-                        word,
-                        sense_datas,
-                        is_reconstruction,
-                    )
-                elif t_no_number == COMPOUNDS_TITLE:
-                    data = select_data()
-                    if wxr.config.capture_compounds:
+                    with wxr.span("linkage"):
                         parse_linkage(
                             wxr,
                             data,
-                            "derived",
+                            rel,
                             node,
                             word,
                             sense_datas,
                             is_reconstruction,
                         )
+                elif t_no_number == COMPOUNDS_TITLE:
+                    data = select_data()
+                    if wxr.config.capture_compounds:
+                        with wxr.span("linkage"):
+                            parse_linkage(
+                                wxr,
+                                data,
+                                "derived",
+                                node,
+                                word,
+                                sense_datas,
+                                is_reconstruction,
+                            )
 
             # XXX parse interesting templates also from other sections.  E.g.,
             # {{Letter|...}} in ===See also===
@@ -3443,7 +3457,7 @@ def parse_language(
                 if "pos" not in pos_data:
                     pos_data["pos"] = "soft-redirect"
             else:
-                new_page_data = copy.deepcopy(base_data)
+                new_page_data = copy_data(base_data)
                 new_page_data["redirects"] = redirect_list
                 if "pos" not in new_page_data:
                     new_page_data["pos"] = "soft-redirect"
@@ -4076,12 +4090,13 @@ def parse_page(wxr: WiktextractContext, word: str, text: str) -> list[WordData]:
 
     # Parse the page, pre-expanding those templates that are likely to
     # influence parsing
-    tree = wxr.wtp.parse(
-        text,
-        pre_expand=True,
-        additional_expand=ADDITIONAL_EXPAND_TEMPLATES,
-        do_not_pre_expand=DO_NOT_PRE_EXPAND_TEMPLATES,
-    )
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(
+            text,
+            pre_expand=True,
+            additional_expand=ADDITIONAL_EXPAND_TEMPLATES,
+            do_not_pre_expand=DO_NOT_PRE_EXPAND_TEMPLATES,
+        )
     # from wikitextprocessor.parser import print_tree
     # print("PAGE PARSE:", print_tree(tree))
 
@@ -4117,7 +4132,7 @@ def parse_page(wxr: WiktextractContext, word: str, text: str) -> list[WordData]:
             and lang_code not in wxr.config.capture_language_codes
         ):
             continue
-        wxr.wtp.start_section(lang)
+        wxr.start_section(lang)
 
         # Collect all words from the page.
         # print(f"{langnode=}")
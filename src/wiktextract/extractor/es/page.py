@@ -46,7 +46,7 @@ def parse_section(
     section_title = clean_node(wxr, categories, level_node.largs)
     original_section_title = section_title
     section_title = section_title.lower()
-    wxr.wtp.start_subsection(original_section_title)
+    wxr.start_subsection(original_section_title)
     if section_title == "":
         return None
 
@@ -153,7 +153,8 @@ def parse_page(
     if wxr.config.verbose:
         logger.info(f"Parsing page: {page_title}")
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         categories = {}
@@ -174,7 +175,7 @@ def parse_page(
             and lang_code not in wxr.config.capture_language_codes
         ):
             continue
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             lang=lang_name,
             lang_code=lang_code,
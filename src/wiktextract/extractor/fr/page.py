@@ -57,7 +57,7 @@ def parse_section(
             section_type = first_param.strip().lower()
             title_categories = {}
             subtitle = clean_node(wxr, title_categories, level_node.largs)
-            wxr.wtp.start_subsection(subtitle)
+            wxr.start_subsection(subtitle)
             if section_type in IGNORED_SECTIONS:
                 pass
             # POS parameters:
@@ -231,7 +231,8 @@ def parse_page(
         logger.info(f"Parsing page: {page_title}")
     wxr.config.word = page_title
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         for subtitle_template in level2_node.find_content(NodeKind.TEMPLATE):
@@ -246,7 +247,7 @@ def parse_page(
                 ):
                     continue
                 lang_name = clean_node(wxr, categories, subtitle_template)
-                wxr.wtp.start_section(lang_name)
+                wxr.start_section(lang_name)
                 base_data = WordEntry(
                     word=page_title,
                     lang_code=lang_code,
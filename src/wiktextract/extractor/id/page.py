@@ -24,7 +24,7 @@ def parse_section(
     title_text = clean_node(wxr, None, level_node.largs).rstrip(
         string.digits + string.whitespace
     )
-    wxr.wtp.start_subsection(title_text)
+    wxr.start_subsection(title_text)
     if title_text in POS_DATA:
         extract_pos_section(wxr, page_data, base_data, level_node, title_text)
     elif title_text == "Etimologi":
@@ -89,7 +89,8 @@ def parse_page(
     if page_title.startswith(("Portal:", "Rekonstruksi:", "Thesaurus:", "WK:")):
         return []
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         cats = {}
@@ -98,7 +99,7 @@ def parse_page(
             name_to_code(lang_name.lower().removeprefix("bahasa "), "id")
             or "unknown"
         )
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
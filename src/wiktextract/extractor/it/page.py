@@ -21,25 +21,25 @@ def parse_section(
 ) -> None:
     title_text = clean_node(wxr, None, level_node.largs)
     if title_text in POS_DATA or title_text.startswith("Trascrizione"):
-        wxr.wtp.start_subsection(title_text)
+        wxr.start_subsection(title_text)
         extract_pos_section(wxr, page_data, base_data, level_node, title_text)
     elif title_text == "Traduzione":
-        wxr.wtp.start_subsection(title_text)
+        wxr.start_subsection(title_text)
         extract_translation_section(wxr, page_data, level_node)
     elif title_text == "Etimologia / Derivazione":
-        wxr.wtp.start_subsection(title_text)
+        wxr.start_subsection(title_text)
         extract_etymology_section(wxr, page_data, level_node)
     elif title_text == "Citazione":
-        wxr.wtp.start_subsection(title_text)
+        wxr.start_subsection(title_text)
         extract_citation_section(wxr, page_data, level_node)
     elif title_text == "Sillabazione":
-        wxr.wtp.start_subsection(title_text)
+        wxr.start_subsection(title_text)
         extract_hyphenation_section(wxr, page_data, level_node)
     elif title_text == "Pronuncia":
-        wxr.wtp.start_subsection(title_text)
+        wxr.start_subsection(title_text)
         extract_pronunciation_section(wxr, page_data, level_node)
     elif title_text in LINKAGE_SECTIONS:
-        wxr.wtp.start_subsection(title_text)
+        wxr.start_subsection(title_text)
         extract_linkage_section(
             wxr, page_data, level_node, LINKAGE_SECTIONS[title_text]
         )
@@ -64,7 +64,8 @@ def parse_page(
     # https://it.wiktionary.org/wiki/Wikizionario:Manuale_di_stile
     # https://it.wiktionary.org/wiki/Aiuto:Come_iniziare_una_pagina
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         lang_cats = {}
@@ -80,7 +81,7 @@ def parse_page(
             and lang_code not in wxr.config.capture_language_codes
         ):
             continue
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
@@ -149,7 +149,8 @@ def parse_page(
     ) or page_title.endswith("(活用)"):
         return []
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         lang_name = clean_node(wxr, None, level2_node.largs)
@@ -166,7 +167,7 @@ def parse_page(
                     lang_code = template.template_name
         if lang_code == "":
             lang_code = "unknown"
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
@@ -133,7 +133,7 @@ def parse_language_section(
         and lang_code not in wxr.config.capture_language_codes
     ):
         return
-    wxr.wtp.start_section(lang_name)
+    wxr.start_section(lang_name)
     base_data = WordEntry(
         word=wxr.wtp.title,
         lang_code=lang_code,
@@ -177,7 +177,8 @@ def parse_page(
     if page_title.startswith(("Appendix:", "T195546/NS111")):
         return []
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         parse_language_section(wxr, page_data, level2_node)
@@ -26,7 +26,7 @@ def parse_section(
     level_node: LevelNode,
 ) -> None:
     title_text = clean_node(wxr, None, level_node.largs)
-    wxr.wtp.start_subsection(title_text)
+    wxr.start_subsection(title_text)
     title_text = title_text.rstrip(string.digits + string.whitespace + "IVX")
     lower_title = title_text.lower()
     if lower_title in POS_DATA:
@@ -82,7 +82,8 @@ def parse_page(
     if page_title.startswith(("Portal:", "Reconstruction:")):
         return []
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
     page_data: list[WordEntry] = []
 
     for level2_node in tree.find_child(NodeKind.LEVEL2):
@@ -91,7 +92,7 @@ def parse_page(
         lang_code = (
             name_to_code(lang_name.removeprefix("Bahasa "), "ms") or "unknown"
         )
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
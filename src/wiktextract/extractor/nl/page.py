@@ -52,7 +52,7 @@ def parse_section(
     # https://nl.wiktionary.org/wiki/Categorie:Lemmasjablonen
     title_text = clean_node(wxr, None, level_node.largs)
     title_text = re.sub(r"\s+#?\d+:?$", "", title_text)
-    wxr.wtp.start_subsection(title_text)
+    wxr.start_subsection(title_text)
     etymology_data = []
 
     if title_text in POS_DATA:
@@ -151,7 +151,8 @@ def parse_page(
     ):
         return []  # skip conjugation pages
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         lang_name = clean_node(wxr, None, level2_node.largs)
@@ -163,7 +164,7 @@ def parse_page(
             and lang_code not in wxr.config.capture_language_codes
         ):
             continue
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
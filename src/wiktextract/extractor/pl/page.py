@@ -27,7 +27,7 @@ def parse_section(
     # title templates
     # https://pl.wiktionary.org/wiki/Kategoria:Szablony_szablonów_haseł
     title_text = clean_node(wxr, None, level_node.largs)
-    wxr.wtp.start_subsection(title_text)
+    wxr.start_subsection(title_text)
     if title_text == "wymowa" and wxr.config.capture_pronunciation:
         extract_sound_section(wxr, base_data, level_node)
     elif title_text == "znaczenia":
@@ -73,7 +73,8 @@ def parse_page(
     # page layout
     # https://pl.wiktionary.org/wiki/Wikisłownik:Zasady_tworzenia_haseł
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         after_parenthesis = False
@@ -105,7 +106,7 @@ def parse_page(
             and lang_code not in wxr.config.capture_language_codes
         ):
             continue
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
@@ -211,7 +211,7 @@ def parse_section(
     wxr: WiktextractContext, page_data: list[WordEntry], level_node: WikiNode
 ) -> None:
     section_title = clean_node(wxr, None, level_node.largs).lower()
-    wxr.wtp.start_subsection(section_title)
+    wxr.start_subsection(section_title)
     if section_title in [
         # Morphological and syntactic properties
         "морфологические и синтаксические свойства",
@@ -294,7 +294,8 @@ def parse_page(
         logger.info(f"Parsing page: {page_title}")
     wxr.config.word = page_title
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text)
     page_data: list[WordEntry] = []
 
     for level1_node in tree.find_child(NodeKind.LEVEL1):
@@ -311,7 +312,7 @@ def parse_page(
             continue
         categories = {"categories": []}
         lang_name = clean_node(wxr, categories, level1_node.largs)
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             lang=lang_name,
             lang_code=lang_code,
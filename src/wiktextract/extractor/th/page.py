@@ -38,7 +38,7 @@ def parse_section(
 ) -> None:
     title_text = clean_node(wxr, None, level_node.largs)
     title_text = title_text.rstrip(string.digits + string.whitespace)
-    wxr.wtp.start_subsection(title_text)
+    wxr.start_subsection(title_text)
     if title_text in POS_DATA:
         extract_pos_section(wxr, page_data, base_data, level_node, title_text)
         if len(page_data[-1].senses) == 0 and title_text in LINKAGE_SECTIONS:
@@ -138,7 +138,8 @@ def parse_page(
     if page_title.endswith("/คำแปลภาษาอื่น"):
         return []
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         lang_name = clean_node(wxr, None, level2_node.largs)
@@ -148,7 +149,7 @@ def parse_page(
             lang_code = "unknown"
         if lang_name == "":
             lang_name = "unknown"
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
@@ -23,7 +23,7 @@ def parse_section(
     level_node: LevelNode,
 ) -> None:
     title_text = clean_node(wxr, None, level_node.largs)
-    wxr.wtp.start_subsection(title_text)
+    wxr.start_subsection(title_text)
     title_text = title_text.rstrip(string.digits + string.whitespace)
     if title_text in POS_DATA:
         extract_pos_section(wxr, page_data, base_data, level_node, title_text)
@@ -98,12 +98,13 @@ def parse_page(
     # page layout
     # https://tr.wiktionary.org/wiki/Vikisözlük:Girdilerin_biçimi
     wxr.wtp.start_page(page_title)
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
     page_data: list[WordEntry] = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
         lang_name = clean_node(wxr, None, level2_node.largs)
         lang_code = name_to_code(lang_name, "id") or "unknown"
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
@@ -47,7 +47,7 @@ def parse_section(
     subtitle = clean_node(wxr, None, level_node.largs)
     # remove number suffix from subtitle
     subtitle = re.sub(r"\s*(?:（.+）|\d+)$", "", subtitle)
-    wxr.wtp.start_subsection(subtitle)
+    wxr.start_subsection(subtitle)
     if subtitle in IGNORED_TITLES:
         pass
     elif subtitle in POS_DATA:
@@ -203,7 +203,8 @@ def parse_page(
 
     # Parse the page, pre-expanding those templates that are likely to
     # influence parsing
-    tree = wxr.wtp.parse(page_text, pre_expand=True)
+    with wxr.span("parse"):
+        tree = wxr.wtp.parse(page_text, pre_expand=True)
 
     page_data = []
     for level2_node in tree.find_child(NodeKind.LEVEL2):
@@ -221,7 +222,7 @@ def parse_page(
             and lang_code not in wxr.config.capture_language_codes
         ):
             continue
-        wxr.wtp.start_section(lang_name)
+        wxr.start_section(lang_name)
         base_data = WordEntry(
             word=wxr.wtp.title,
             lang_code=lang_code,
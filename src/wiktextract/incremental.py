@@ -0,0 +1,620 @@
+# Incremental re-extraction between dump snapshots.  A state database keeps
+# the body hashes of all saved pages and the (word, lang_code, pos) keys of
+# the entries extracted from each page in the previous run.  A page is
+# extracted again only if its body changed or if any template or Lua module
+# it uses, directly or through other templates and modules, changed.  Pages
+# that transclude a changed page with `{{:foo}}` and the pages whose
+# subpages, such as "dog/translations", changed are extracted again too.
+# The new entries are merged into the previous output by key, and a delta
+# file of added, changed and removed entries can be written for downstream
+# users.
+# The entries of the extracted pages are written after the other entries,
+# so the order of the merged output differs from that of a full run.  All
+# pages are extracted again if the extraction settings or the code or data
+# files of wiktextract change.
+#
+# The dependencies are found from the page, template and module bodies:
+# template calls, `#invoke` calls and `require()`/`mw.loadData()` calls with
+# a constant module name.  As the bodies of unchanged pages are unchanged,
+# the dependency graph is rebuilt from the current database on each run;
+# only the hashes and the entry keys need to be saved.  Template names
+# generated by other expansions are not found; a `require()` whose name is a
+# constant prefix joined with something else depends on all modules with
+# that prefix.
+
+import hashlib
+import io
+import json
+import re
+import sqlite3
+from bisect import bisect_left
+from collections import defaultdict
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TextIO
+
+from wikitextprocessor import Page
+
+from .compression import open_input
+from .wxr_context import WiktextractContext
+from .wxr_logging import logger
+
+# (word, lang_code, pos) of an entry; redirect entries use their title as
+# the word
+EntryKey = tuple[str, str, str]
+
+# Title under which the entries of words that only occur in the thesaurus
+# are recorded
+THESAURUS_ONLY_TITLE = ""
+
+TEMPLATE_CALL_RE = re.compile(
+    r"\{\{\s*(#invoke\s*:)?\s*([^{}|<>\[\]\n]+?)\s*(?=\||}})"
+)
+LUA_REQUIRE_RE = re.compile(
+    r"""(?:\brequire|\bmw\.loadData|\bmw\.loadJsonData)\s*\(?\s*
+    (?:"([^"\n]+)"|'([^'\n]+)')\s*(\.\.)?""",
+    re.VERBOSE,
+)
+
+STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS hashes (
+    title TEXT PRIMARY KEY, namespace_id INTEGER, hash BLOB
+);
+CREATE TABLE IF NOT EXISTS page_keys (
+    title TEXT, word TEXT, lang_code TEXT, pos TEXT
+);
+CREATE INDEX IF NOT EXISTS page_keys_title ON page_keys (title);
+CREATE INDEX IF NOT EXISTS page_keys_key ON page_keys (word, lang_code, pos);
+DROP TABLE IF EXISTS new_hashes;
+CREATE TABLE new_hashes (
+    title TEXT PRIMARY KEY, namespace_id INTEGER, hash BLOB
+);
+DROP TABLE IF EXISTS replaced;
+CREATE TEMP TABLE replaced (title TEXT PRIMARY KEY);
+"""
+
+
+def entry_key(data: dict[str, Any]) -> EntryKey:
+    if "word" in data:
+        return (data["word"], data.get("lang_code", ""), data.get("pos", ""))
+    return (data.get("title", ""), "", data.get("pos", ""))
+
+
+def body_hash(page: Page) -> bytes:
+    text = page.body if page.body is not None else page.redirect_to
+    return hashlib.blake2b(
+        (text or "").encode("utf-8"), digest_size=16
+    ).digest()
+
+
+def source_hash() -> str:
+    """Returns a hash of the code and data files of the installed wiktextract
+    package.  The version number is not changed by every code change, so
+    this is what tells that the extractors changed."""
+    package_dir = Path(__file__).parent
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(package_dir.rglob("*")):
+        if path.suffix not in (".py", ".json") or not path.is_file():
+            continue
+        h.update(path.relative_to(package_dir).as_posix().encode("utf-8"))
+        h.update(b"\0")
+        h.update(path.read_bytes())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def config_fingerprint(wxr: WiktextractContext) -> str:
+    """Extraction settings that affect the output; if these change, all
+    pages are extracted again."""
+    try:
+        wiktextract_version = version("wiktextract")
+    except PackageNotFoundError:
+        wiktextract_version = None
+    config = wxr.config
+    return json.dumps(
+        {
+            "version": wiktextract_version,
+            "source_hash": source_hash(),
+            "edition": config.dump_file_lang_code,
+            "capture_language_codes": sorted(config.capture_language_codes)
+            if config.capture_language_codes is not None
+            else None,
+            **{
+                name: getattr(config, name)
+                for name in config.__slots__
+                if name.startswith("capture_")
+                and name != "capture_language_codes"
+            },
+            "extract_ns_names": config.extract_ns_names,
+        },
+        sort_keys=True,
+    )
+
+
+class DependencyFinder:
+    """Finds the templates and modules a page uses from its body."""
+
+    __slots__ = ("template_ns", "module_ns", "module_prefixes", "ns_prefixes")
+
+    def __init__(self, wxr: WiktextractContext) -> None:
+        ns_data = wxr.wtp.NAMESPACE_DATA
+        self.template_ns = ns_data["Template"]["name"]
+        module_data = ns_data["Module"]
+        self.module_ns = module_data["name"]
+        self.module_prefixes = tuple(
+            name + ":"
+            for name in [module_data["name"], "Module"]
+            + list(module_data.get("aliases", []))
+        )
+        # Lowercased namespace prefix -> local namespace name
+        self.ns_prefixes: dict[str, str] = {}
+        for canonical, data in ns_data.items():
+            if data["id"] == 0:
+                continue
+            for name in [canonical, data["name"]] + list(
+                data.get("aliases", [])
+            ):
+                self.ns_prefixes[name.lower()] = data["name"]
+
+    def canonical_title(self, ns_name: str, name: str) -> str:
+        # Wiktionary titles are case-sensitive, also the first letter
+        name = " ".join(name.replace("_", " ").split())
+        if name == "":
+            return ""
+        return f"{ns_name}:{name}"
+
+    def wikitext_dependencies(self, text: str) -> set[str]:
+        deps = set()
+        for m in TEMPLATE_CALL_RE.finditer(text):
+            invoke, name = m.groups()
+            if invoke:
+                deps.add(self.canonical_title(self.module_ns, name))
+                continue
+            if name.startswith("#") or "{" in name:
+                continue
+            prefix, colon, rest = name.partition(":")
+            if colon:
+                ns_name = self.ns_prefixes.get(prefix.strip().lower())
+                if ns_name is not None:
+                    deps.add(self.canonical_title(ns_name, rest))
+                elif prefix.strip() == "":
+                    # transcluded page in the main namespace
+                    deps.add(" ".join(rest.replace("_", " ").split()))
+                # otherwise a parser function such as {{lc:...}}
+                continue
+            deps.add(self.canonical_title(self.template_ns, name))
+        deps.discard("")
+        return deps
+
+    def lua_dependencies(self, text: str) -> tuple[set[str], set[str]]:
+        """Returns the required modules and the prefixes of modules
+        required with a computed name."""
+        deps = set()
+        prefixes = set()
+        for m in LUA_REQUIRE_RE.finditer(text):
+            name = m.group(1) or m.group(2)
+            if not name.startswith(self.module_prefixes):
+                continue
+            _, _, rest = name.partition(":")
+            if m.group(3):
+                prefixes.add(f"{self.module_ns}:{rest}")
+            else:
+                deps.add(self.canonical_title(self.module_ns, rest))
+        return deps, prefixes
+
+    def dependencies(self, page: Page) -> tuple[set[str], set[str]]:
+        if page.body is None:
+            # redirects depend on their target
+            return {page.redirect_to} if page.redirect_to else set(), set()
+        if page.model == "Scribunto" or page.title.startswith(
+            self.module_prefixes
+        ):
+            return self.lua_dependencies(page.body)
+        return self.wikitext_dependencies(page.body), set()
+
+
+class IncrementalExtraction:
+    """Selects the pages to extract again and merges the new entries into
+    the previous output ``previous_path``.  The state is kept in the SQLite
+    database ``state_path``.  If ``delta_path`` is given, the changed
+    entries are written to it as JSON lines."""
+
+    __slots__ = (
+        "state_path",
+        "previous_path",
+        "delta_path",
+        "conn",
+        "full",
+        "titles",
+        "removed_titles",
+        "new_entries_path",
+        "new_keys",
+    )
+
+    def __init__(
+        self,
+        state_path: str | Path,
+        previous_path: str | Path | None,
+        delta_path: str | Path | None = None,
+    ) -> None:
+        self.state_path = Path(state_path)
+        self.previous_path = (
+            Path(previous_path) if previous_path is not None else None
+        )
+        self.delta_path = Path(delta_path) if delta_path is not None else None
+        self.conn: sqlite3.Connection | None = None
+        # True if all pages are extracted
+        self.full = False
+        # Titles of the pages to extract
+        self.titles: set[str] = set()
+        self.removed_titles: set[str] = set()
+        self.new_entries_path = Path(f"{self.state_path}.new.jsonl")
+        # Entry keys of the extracted pages
+        self.new_keys: dict[str, list[EntryKey]] = {}
+
+    def prepare(self, wxr: WiktextractContext) -> None:
+        """Compares the pages to the previous run and selects the pages to
+        extract."""
+        self.conn = sqlite3.connect(self.state_path)
+        self.conn.executescript(STATE_SCHEMA)
+        fingerprint = config_fingerprint(wxr)
+        row = self.conn.execute(
+            "SELECT value FROM info WHERE key = 'config'"
+        ).fetchone()
+        self.full = (
+            row is None
+            or row[0] != fingerprint
+            or self.previous_path is None
+            or not self.previous_path.exists()
+        )
+        if self.full:
+            if row is not None:
+                logger.info(
+                    "Extraction code, settings or previous output changed, "
+                    "extracting all pages"
+                )
+            self.conn.execute("DELETE FROM hashes")
+            self.conn.execute("DELETE FROM page_keys")
+        self.conn.execute(
+            "INSERT OR REPLACE INTO info VALUES ('config', ?)", (fingerprint,)
+        )
+
+        ns_data = wxr.wtp.NAMESPACE_DATA
+        extract_ns_ids = {
+            ns_data.get(ns, {}).get("id", 0)  # type: ignore[call-overload]
+            for ns in wxr.config.extract_ns_names
+        }
+        support_ns_ids = {
+            ns_data.get(ns, {}).get("id", 0)  # type: ignore[call-overload]
+            for ns in wxr.config.save_ns_names
+        } - extract_ns_ids
+        thesaurus_prefix = None
+        if wxr.config.extract_thesaurus_pages and "Thesaurus" in ns_data:
+            thesaurus_prefix = ns_data["Thesaurus"]["name"] + ":"
+            support_ns_ids.add(ns_data["Thesaurus"]["id"])
+        support_ns_names = {
+            data["name"]
+            for data in ns_data.values()
+            if data["id"] in support_ns_ids
+        }
+        finder = DependencyFinder(wxr)
+
+        def is_support_title(title: str) -> bool:
+            return title.partition(":")[0] in support_ns_names
+
+        # Pages that use each page: the templates, modules and other pages
+        # used by the support pages, and the pages of the extracted
+        # namespaces that the extracted pages transclude
+        users: dict[str, set[str]] = defaultdict(set)
+        prefix_users: dict[str, set[str]] = defaultdict(set)
+        for page in wxr.wtp.get_all_pages(list(support_ns_ids), True):
+            self.add_hash(page)
+            deps, prefixes = finder.dependencies(page)
+            for dep in deps:
+                users[dep].add(page.title)
+            for prefix in prefixes:
+                prefix_users[prefix].add(page.title)
+        # Changed pages and all pages that use them, transitively
+        affected: set[str] = set()
+
+        def add_affected(titles: Iterable[str]) -> list[str]:
+            added = []
+            stack = list(titles)
+            while stack:
+                title = stack.pop()
+                if title in affected:
+                    continue
+                affected.add(title)
+                added.append(title)
+                stack.extend(users.get(title, ()))
+                for prefix, prefix_titles in prefix_users.items():
+                    if title.startswith(prefix):
+                        stack.extend(prefix_titles)
+                if not is_support_title(title):
+                    # Extractors read subpages such as "dog/translations"
+                    # when extracting "dog"
+                    i = title.find("/")
+                    while i > 0:
+                        stack.append(title[:i])
+                        i = title.find("/", i + 1)
+            return added
+
+        add_affected(self.changed_titles(support_ns_ids))
+        affected_sorted = sorted(affected)
+
+        def uses_affected(deps: set[str], prefixes: set[str]) -> bool:
+            if not deps.isdisjoint(affected):
+                return True
+            for prefix in prefixes:
+                i = bisect_left(affected_sorted, prefix)
+                if i < len(affected_sorted) and affected_sorted[i].startswith(
+                    prefix
+                ):
+                    return True
+            return False
+
+        self.titles = set()
+        for page in wxr.wtp.get_all_pages(list(extract_ns_ids), True):
+            page_hash = self.add_hash(page)
+            if self.full:
+                self.titles.add(page.title)
+                continue
+            deps, prefixes = finder.dependencies(page)
+            if page.body is not None:
+                # The entry of a redirect does not depend on its target
+                for dep in deps:
+                    if not is_support_title(dep):
+                        users[dep].add(page.title)
+            row = self.conn.execute(
+                "SELECT hash FROM hashes WHERE title = ?", (page.title,)
+            ).fetchone()
+            if row is None or row[0] != page_hash:
+                self.titles.add(page.title)
+            elif affected and uses_affected(deps, prefixes):
+                self.titles.add(page.title)
+        if not self.full:
+            # Pages that use a changed, removed or re-extracted page of the
+            # extracted namespaces.  A support page that transcludes one
+            # affects the pages that use it, which are found with another
+            # pass over the pages.
+            added = add_affected(
+                list(self.titles) + list(self.changed_titles(extract_ns_ids))
+            )
+            while True:
+                self.titles.update(
+                    title
+                    for title in added
+                    if not is_support_title(title) and self.is_saved(title)
+                )
+                if all(not is_support_title(title) for title in added):
+                    break
+                affected_sorted = sorted(affected)
+                added = add_affected(
+                    [
+                        page.title
+                        for page in wxr.wtp.get_all_pages(
+                            list(extract_ns_ids), True
+                        )
+                        if page.title not in self.titles
+                        and uses_affected(*finder.dependencies(page))
+                    ]
+                )
+        if thesaurus_prefix is not None:
+            # Thesaurus linkages are added to the entries of the word
+            for title in affected:
+                if title.startswith(thesaurus_prefix):
+                    word = title[len(thesaurus_prefix) :]
+                    if self.conn.execute(
+                        "SELECT 1 FROM new_hashes WHERE title = ?", (word,)
+                    ).fetchone():
+                        self.titles.add(word)
+        self.removed_titles = {
+            title
+            for (title,) in self.conn.execute(
+                "SELECT title FROM hashes WHERE namespace_id IN ({}) AND "
+                "title NOT IN (SELECT title FROM new_hashes)".format(
+                    ",".join("?" * len(extract_ns_ids))
+                ),
+                list(extract_ns_ids),
+            )
+        }
+        self.add_pages_with_same_keys()
+        logger.info(
+            f"Extracting {len(self.titles)} changed pages, "
+            f"{len(self.removed_titles)} pages removed"
+        )
+
+    def add_hash(self, page: Page) -> bytes:
+        assert self.conn is not None
+        page_hash = body_hash(page)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO new_hashes VALUES (?, ?, ?)",
+            (page.title, page.namespace_id, page_hash),
+        )
+        return page_hash
+
+    def is_saved(self, title: str) -> bool:
+        """Returns True if the page ``title`` is in the current database."""
+        assert self.conn is not None
+        return (
+            self.conn.execute(
+                "SELECT 1 FROM new_hashes WHERE title = ?", (title,)
+            ).fetchone()
+            is not None
+        )
+
+    def changed_titles(self, ns_ids: Iterable[int]) -> Iterator[str]:
+        """Yields the titles of new, changed and removed pages in the
+        namespaces ``ns_ids``."""
+        assert self.conn is not None
+        ns_ids = list(ns_ids)
+        placeholders = ",".join("?" * len(ns_ids))
+        yield from (
+            title
+            for (title,) in self.conn.execute(
+                "SELECT n.title FROM new_hashes n "
+                "LEFT JOIN hashes h ON n.title = h.title "
+                f"WHERE n.namespace_id IN ({placeholders}) "
+                "AND (h.hash IS NULL OR h.hash != n.hash)",
+                ns_ids,
+            )
+        )
+        yield from (
+            title
+            for (title,) in self.conn.execute(
+                f"SELECT title FROM hashes WHERE namespace_id IN "
+                f"({placeholders}) AND title NOT IN "
+                "(SELECT title FROM new_hashes)",
+                ns_ids,
+            )
+        )
+
+    def add_pages_with_same_keys(self) -> None:
+        """Entries are replaced by key, so pages that had entries with the
+        same key as a page to extract or a removed page are extracted
+        too."""
+        assert self.conn is not None
+        self.conn.execute("DELETE FROM replaced")
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO replaced VALUES (?)",
+            ((title,) for title in self.titles | self.removed_titles),
+        )
+        for (title,) in self.conn.execute(
+            "SELECT DISTINCT other.title FROM replaced r "
+            "JOIN page_keys k ON k.title = r.title "
+            "JOIN page_keys other ON other.word = k.word "
+            "AND other.lang_code = k.lang_code AND other.pos = k.pos "
+            "WHERE other.title != ?",
+            (THESAURUS_ONLY_TITLE,),
+        ).fetchall():
+            if title not in self.removed_titles:
+                self.titles.add(title)
+
+    def pages(self, pages: Iterable[Page]) -> Iterator[Page]:
+        for page in pages:
+            if page.title in self.titles:
+                yield page
+
+    def open_new_entries(self) -> TextIO:
+        return open(self.new_entries_path, "w", encoding="utf-8")
+
+    def page_done(self, title: str, page_data: list[dict[str, Any]]) -> None:
+        self.new_keys[title] = [entry_key(data) for data in page_data]
+
+    def merge(
+        self,
+        wxr: WiktextractContext,
+        out_f: TextIO,
+        emit_thesaurus_words: bool,
+    ) -> None:
+        """Writes the entries of the previous output that were not
+        replaced and the new entries to ``out_f``, updates the state
+        database and writes the delta file."""
+        from .thesaurus import emit_words_in_thesaurus
+
+        assert self.conn is not None
+        replaced_titles = self.titles | self.removed_titles
+        replaced_titles.add(THESAURUS_ONLY_TITLE)
+        self.conn.execute("DELETE FROM replaced")
+        self.conn.executemany(
+            "INSERT INTO replaced VALUES (?)",
+            ((title,) for title in replaced_titles),
+        )
+        replaced_keys = set(
+            self.conn.execute(
+                "SELECT DISTINCT k.word, k.lang_code, k.pos FROM page_keys k "
+                "JOIN replaced r ON k.title = r.title"
+            )
+        )
+        old_entries: dict[EntryKey, list[str]] = defaultdict(list)
+        new_entries: dict[EntryKey, list[str]] = defaultdict(list)
+        emitted: set[EntryKey] = set()
+
+        def write(line: str, key: EntryKey) -> None:
+            out_f.write(line)
+            if all(key):
+                emitted.add(key)
+
+        if not self.full and self.previous_path is not None:
+            with open_input(self.previous_path) as f:
+                for line in f:
+                    key = entry_key(json.loads(line))
+                    if key in replaced_keys:
+                        old_entries[key].append(line)
+                    else:
+                        write(line, key)
+        with open(self.new_entries_path, encoding="utf-8") as f:
+            for line in f:
+                key = entry_key(json.loads(line))
+                new_entries[key].append(line)
+                write(line, key)
+        self.new_entries_path.unlink()
+        if emit_thesaurus_words:
+            buf = io.StringIO()
+            emit_words_in_thesaurus(wxr, emitted, buf, False)
+            keys = []
+            for line in buf.getvalue().splitlines(keepends=True):
+                key = entry_key(json.loads(line))
+                keys.append(key)
+                new_entries[key].append(line)
+                write(line, key)
+            self.new_keys[THESAURUS_ONLY_TITLE] = keys
+
+        if self.delta_path is not None:
+            self.write_delta(old_entries, new_entries)
+        self.save()
+
+    def write_delta(
+        self,
+        old_entries: dict[EntryKey, list[str]],
+        new_entries: dict[EntryKey, list[str]],
+    ) -> None:
+        num_changes = 0
+        with open(self.delta_path, "w", encoding="utf-8") as f:  # type: ignore[arg-type]
+            for key in sorted(old_entries.keys() | new_entries.keys()):
+                old = [json.loads(line) for line in old_entries.get(key, ())]
+                new = [json.loads(line) for line in new_entries.get(key, ())]
+                if old == new:
+                    continue
+                change = (
+                    "changed" if old and new else "added" if new else "removed"
+                )
+                f.write(
+                    json.dumps(
+                        {
+                            "change": change,
+                            "word": key[0],
+                            "lang_code": key[1],
+                            "pos": key[2],
+                            "entries": new,
+                        },
+                        ensure_ascii=False,
+                    )
+                )
+                f.write("\n")
+                num_changes += 1
+        logger.info(f"Wrote {num_changes} changes to {self.delta_path}")
+
+    def save(self) -> None:
+        assert self.conn is not None
+        self.conn.execute(
+            "DELETE FROM page_keys WHERE title IN (SELECT title FROM replaced)"
+        )
+        self.conn.executemany(
+            "INSERT INTO page_keys VALUES (?, ?, ?, ?)",
+            (
+                (title, *key)
+                for title, keys in self.new_keys.items()
+                for key in set(keys)
+            ),
+        )
+        self.conn.executescript(
+            """
+            DROP TABLE hashes;
+            ALTER TABLE new_hashes RENAME TO hashes;
+            """
+        )
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
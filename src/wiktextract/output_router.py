@@ -0,0 +1,104 @@
+# Writes the extracted entries into one output file per language,
+# `<out_dir>/<lang_code>.jsonl` (with the suffix of the compression format,
+# if any), instead of one file for all languages.  The files are opened when
+# the first entry of their language is written, and at most
+# ``max_open_files`` are kept open: the least recently used one is closed
+# when another is needed, and reopened for appending later.  The files are
+# written under a ".tmp" suffix and renamed when the router is closed, and
+# the number of entries of each language is saved in "counts.json".
+
+import json
+import os
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import TextIO
+
+from .compression import COMPRESSION_SUFFIXES, open_output
+from .wxr_logging import logger
+
+# Block size of compressed files, smaller than for the single output file
+# because many of them can be open at once
+BLOCK_SIZE = 1024 * 1024
+
+
+class LanguageRouter:
+    """Output files of each language code in ``out_dir``."""
+
+    __slots__ = (
+        "out_dir",
+        "compression",
+        "suffix",
+        "max_open_files",
+        "num_threads",
+        "files",
+        "counts",
+    )
+
+    def __init__(
+        self,
+        out_dir: str | Path,
+        compression: str | None = None,
+        max_open_files: int = 64,
+        num_threads: int = 1,
+    ) -> None:
+        assert max_open_files > 0
+        self.out_dir = Path(out_dir)
+        self.compression = compression
+        self.suffix = ".jsonl" + next(
+            (
+                suffix
+                for suffix, name in COMPRESSION_SUFFIXES.items()
+                if name == compression
+            ),
+            "",
+        )
+        self.max_open_files = max_open_files
+        self.num_threads = num_threads
+        self.files: OrderedDict[str, TextIO] = OrderedDict()
+        # Number of entries written for each language code
+        self.counts: dict[str, int] = {}
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, lang_code: str) -> Path:
+        return self.out_dir / f"{lang_code}{self.suffix}"
+
+    def tmp_path(self, lang_code: str) -> Path:
+        return self.out_dir / f"{lang_code}{self.suffix}.tmp"
+
+    def file_for(self, data: dict) -> TextIO:
+        """Returns the output file of the language of the entry ``data``."""
+        # Language codes are used as file names
+        lang_code = re.sub(r"[^\w-]", "_", data.get("lang_code") or "unknown")
+        out_f = self.files.get(lang_code)
+        if out_f is None:
+            if len(self.files) >= self.max_open_files:
+                self.files.popitem(last=False)[1].close()
+            out_f = open_output(
+                self.tmp_path(lang_code),
+                self.compression,
+                lang_code in self.counts,
+                self.num_threads,
+                BLOCK_SIZE,
+            )
+            self.files[lang_code] = out_f
+        else:
+            self.files.move_to_end(lang_code)
+        self.counts[lang_code] = self.counts.get(lang_code, 0) + 1
+        return out_f
+
+    def close(self) -> None:
+        """Closes the files, renames them to their final names and writes
+        the number of entries of each language to "counts.json"."""
+        while self.files:
+            self.files.popitem()[1].close()
+        for lang_code in self.counts:
+            os.replace(self.tmp_path(lang_code), self.path(lang_code))
+        with open(self.out_dir / "counts.json", "w", encoding="utf-8") as f:
+            json.dump(self.counts, f, indent=2, sort_keys=True)
+        top = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        logger.info(
+            f"Wrote {sum(self.counts.values())} entries in "
+            f"{len(self.counts)} languages to {self.out_dir}, most: "
+            + ", ".join(f"{lang_code} {count}" for lang_code, count in top[:10])
+        )
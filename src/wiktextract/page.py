@@ -42,12 +42,14 @@ def parse_page(
     page text in Wikimedia format.  Other arguments indicate what is
     captured."""
     page_extractor_mod = import_extractor_module(wxr.wtp.lang_code, "page")
-    page_data = page_extractor_mod.parse_page(wxr, page_title, page_text)
-    if wxr.config.extract_thesaurus_pages:
-        inject_linkages(wxr, page_data)
-    if wxr.config.dump_file_lang_code == "en":
-        process_categories(wxr, page_data)
-    remove_duplicate_data(page_data)
+    with wxr.span("extract"):
+        page_data = page_extractor_mod.parse_page(wxr, page_title, page_text)
+    with wxr.span("postprocess"):
+        if wxr.config.extract_thesaurus_pages:
+            inject_linkages(wxr, page_data)
+        if wxr.config.dump_file_lang_code == "en":
+            process_categories(wxr, page_data)
+        remove_duplicate_data(page_data)
     return page_data
 
 
@@ -369,12 +371,13 @@ def clean_node(
         clean_node_handler_fn = clean_node_handler_fn_default
 
     # print("clean_node: value={!r}".format(value))
-    v = wxr.wtp.node_to_html(
-        wikinode,
-        node_handler_fn=clean_node_handler_fn,
-        template_fn=template_fn,
-        post_template_fn=post_template_fn,
-    )
+    with wxr.span("expand"):
+        v = wxr.wtp.node_to_html(
+            wikinode,
+            node_handler_fn=clean_node_handler_fn,
+            template_fn=template_fn,
+            post_template_fn=post_template_fn,
+        )
     # print("##########")
     # print(f"{wikinode=}")
     # print("clean_node: v={!r}".format(v))
@@ -426,7 +429,8 @@ def clean_node(
                 # We want to keep link data as is, even duplicated
                 data_append(sense_data, "links", ltuple)
 
-    v = clean_value(wxr, v, no_strip=no_strip, no_html_strip=no_html_strip)
+    with wxr.span("clean_value"):
+        v = clean_value(wxr, v, no_strip=no_strip, no_html_strip=no_html_strip)
     # print("After clean_value:", repr(v))
 
     # Strip any unhandled templates and other stuff.  This is mostly intended
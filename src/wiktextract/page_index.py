@@ -0,0 +1,188 @@
+# Full-text index of the page bodies in the database, for selecting the
+# pages to extract without reading every page body: pages matching a
+# --search-pattern, pages using a template (--search-template) and pages
+# from a title list (--titles).  Without the index, a search pattern is a
+# LIKE scan over all page bodies.
+#
+# The index is an FTS5 table with the trigram tokenizer (SQLite 3.34 or
+# later) whose content is the "pages" table of the database, so the bodies
+# are not stored twice.  It is saved in the database file: it is built once
+# after the first phase, by --build-page-index or by the first run that
+# needs it, and triggers keep it up to date when pages are saved later,
+# e.g. override pages.  LIKE patterns with at least three characters
+# between the wildcards are answered from the index.
+
+import json
+import sqlite3
+import time
+from typing import Iterator
+
+from wikitextprocessor import Page
+
+from .incremental import DependencyFinder
+from .wxr_context import WiktextractContext
+from .wxr_logging import logger
+
+PAGE_INDEX_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS page_index USING fts5(
+    body, content='pages', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS page_index_insert AFTER INSERT ON pages BEGIN
+    INSERT INTO page_index (rowid, body) VALUES (new.rowid, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS page_index_delete AFTER DELETE ON pages BEGIN
+    INSERT INTO page_index (page_index, rowid, body)
+    VALUES ('delete', old.rowid, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS page_index_update AFTER UPDATE ON pages BEGIN
+    INSERT INTO page_index (page_index, rowid, body)
+    VALUES ('delete', old.rowid, old.body);
+    INSERT INTO page_index (rowid, body) VALUES (new.rowid, new.body);
+END;
+"""
+
+# Number of pages read from the database in one query
+PAGE_CHUNK_SIZE = 500
+
+
+def has_page_index(db_conn: sqlite3.Connection) -> bool:
+    return (
+        db_conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+            "AND name = 'page_index'"
+        ).fetchone()
+        is not None
+    )
+
+
+def build_page_index(db_conn: sqlite3.Connection) -> bool:
+    """Builds or rebuilds the page index.  Returns False if this SQLite
+    version has no FTS5 trigram tokenizer."""
+    logger.info("Building the page index")
+    start_time = time.time()
+    try:
+        db_conn.executescript(PAGE_INDEX_SCHEMA)
+        db_conn.execute(
+            "INSERT INTO page_index (page_index) VALUES ('rebuild')"
+        )
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Can't build the page index: {e}")
+        db_conn.rollback()
+        return False
+    db_conn.commit()
+    logger.info(f"Built the page index in {time.time() - start_time:.1f}s")
+    return True
+
+
+class PageSelection:
+    """Selects the pages whose body matches the LIKE pattern
+    ``search_pattern``, that use any of the templates ``templates`` and
+    whose title is in ``titles``.  Criteria that are None are not used."""
+
+    __slots__ = ("search_pattern", "templates", "titles", "rowids")
+
+    def __init__(
+        self,
+        search_pattern: str | None = None,
+        templates: list[str] | None = None,
+        titles: list[str] | None = None,
+    ) -> None:
+        self.search_pattern = search_pattern
+        self.templates = templates
+        self.titles = titles
+        # Row ids of the selected pages in the "pages" table, in title order
+        self.rowids: list[int] = []
+
+    def select(self, wxr: WiktextractContext, namespace_ids: list[int]) -> int:
+        """Finds the wikitext pages of ``namespace_ids`` to extract and
+        returns their number."""
+        db_conn = wxr.wtp.db_conn
+        use_index = (
+            self.search_pattern is not None or self.templates is not None
+        ) and (has_page_index(db_conn) or build_page_index(db_conn))
+        conditions = [
+            f"namespace_id IN ({', '.join('?' * len(namespace_ids))})",
+            "model = 'wikitext'",
+        ]
+        params: list[int | str] = list(namespace_ids)
+        patterns = []
+        if self.search_pattern is not None:
+            patterns.append([self.search_pattern])
+        template_titles = set()
+        if self.templates is not None:
+            finder = DependencyFinder(wxr)
+            prefix = finder.template_ns + ":"
+            for name in self.templates:
+                name = name.removeprefix(prefix).removeprefix("Template:")
+                template_titles.add(
+                    finder.canonical_title(finder.template_ns, name)
+                )
+            # "_" matches a space or an underscore
+            patterns.append(
+                [
+                    "%" + title.removeprefix(prefix).replace(" ", "_") + "%"
+                    for title in sorted(template_titles)
+                ]
+            )
+        for alternatives in patterns:
+            if use_index:
+                conditions.append(
+                    "rowid IN ("
+                    + " UNION ".join(
+                        ["SELECT rowid FROM page_index WHERE body LIKE ?"]
+                        * len(alternatives)
+                    )
+                    + ")"
+                )
+            else:
+                conditions.append(
+                    "(" + " OR ".join(["body LIKE ?"] * len(alternatives)) + ")"
+                )
+            params.extend(alternatives)
+        if self.titles is not None:
+            conditions.append("title IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(self.titles))
+        query = (
+            f"SELECT rowid, {'body' if template_titles else 'NULL'} "
+            f"FROM pages WHERE {' AND '.join(conditions)} ORDER BY title"
+        )
+        if template_titles:
+            # The patterns also match other text, check the template calls
+            self.rowids = [
+                rowid
+                for rowid, body in db_conn.execute(query, params)
+                if not finder.wikitext_dependencies(body).isdisjoint(
+                    template_titles
+                )
+            ]
+        else:
+            self.rowids = [rowid for rowid, _ in db_conn.execute(query, params)]
+        logger.info(f"Selected {len(self.rowids)} pages to extract")
+        return len(self.rowids)
+
+    def pages(self, wxr: WiktextractContext) -> Iterator[Page]:
+        """Yields the selected pages, in title order."""
+        for start in range(0, len(self.rowids), PAGE_CHUNK_SIZE):
+            chunk = self.rowids[start : start + PAGE_CHUNK_SIZE]
+            for (
+                title,
+                namespace_id,
+                redirect_to,
+                need_pre_expand,
+                body,
+                model,
+            ) in wxr.wtp.db_conn.execute(
+                "SELECT title, namespace_id, redirect_to, need_pre_expand, "
+                "body, model FROM pages "
+                f"WHERE rowid IN ({', '.join('?' * len(chunk))}) "
+                "ORDER BY title",
+                chunk,
+            ):
+                yield Page(
+                    title=title,
+                    namespace_id=namespace_id,
+                    redirect_to=redirect_to,
+                    need_pre_expand=bool(need_pre_expand),
+                    body=body,
+                    model=model,
+                )
@@ -0,0 +1,104 @@
+# CPU time profiling of the worker processes used in the second phase.
+# Each worker profiles the selected pages with its own `cProfile.Profile`
+# and dumps the statistics to a file when it exits; the parent process then
+# merges the files into a single `pstats.Stats` object.
+
+import cProfile
+import os
+import pstats
+import shutil
+import tempfile
+import zlib
+from contextlib import AbstractContextManager, nullcontext
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .wxr_logging import logger
+
+
+class WorkerProfiler:
+    """Profiling settings passed to the worker processes.  Pages are
+    profiled if their title is in ``titles`` or, when no titles are given,
+    if they fall into the ``sample_rate`` fraction of pages.  Sampling is
+    based on a hash of the title, so the same pages are selected in every
+    run."""
+
+    __slots__ = ("sample_rate", "titles", "stats_dir", "profile", "stats")
+
+    def __init__(
+        self, sample_rate: float = 1.0, titles: Optional[Iterable[str]] = None
+    ):
+        assert 0.0 <= sample_rate <= 1.0
+        self.sample_rate = sample_rate
+        self.titles = frozenset(titles) if titles is not None else None
+        self.stats_dir: Optional[str] = None
+        self.profile: Optional[cProfile.Profile] = None
+        # Merged statistics of all workers, set by `collect()`
+        self.stats: Optional[pstats.Stats] = None
+
+    def __getstate__(self):
+        # `cProfile.Profile` can't be pickled, create it in the worker
+        return (self.sample_rate, self.titles, self.stats_dir)
+
+    def __setstate__(self, state) -> None:
+        self.sample_rate, self.titles, self.stats_dir = state
+        self.profile = None
+        self.stats = None
+
+    def start(self) -> None:
+        """Creates the temporary directory for the worker statistics files.
+        Called in the parent process before starting the workers."""
+        self.stats_dir = tempfile.mkdtemp(prefix="wiktextract-profile-")
+
+    def start_worker(self) -> None:
+        """Called from the worker process initializer."""
+        self.profile = cProfile.Profile()
+        # `atexit` handlers are not run in `multiprocessing` worker processes
+        Finalize(None, self.dump_worker_stats, exitpriority=10)
+
+    def is_selected(self, title: str) -> bool:
+        if self.titles is not None:
+            return title in self.titles
+        if self.sample_rate >= 1.0:
+            return True
+        return (
+            zlib.crc32(title.encode("utf-8")) % 1_000_000
+            < self.sample_rate * 1_000_000
+        )
+
+    def page_context(self, title: str) -> AbstractContextManager:
+        """Returns a context manager that profiles the processing of the
+        page if it is selected."""
+        if self.profile is not None and self.is_selected(title):
+            return self.profile
+        return nullcontext()
+
+    def dump_worker_stats(self) -> None:
+        if self.profile is None or self.stats_dir is None:
+            return
+        self.profile.create_stats()
+        if self.profile.stats:  # type: ignore[attr-defined]
+            self.profile.dump_stats(
+                Path(self.stats_dir) / f"worker-{os.getpid()}.prof"
+            )
+
+    def collect(self) -> Optional[pstats.Stats]:
+        """Merges the statistics files dumped by the workers and removes
+        the temporary directory.  Called in the parent process after all
+        workers have exited."""
+        if self.stats_dir is None:
+            return self.stats
+        paths = [
+            str(path)
+            for path in sorted(Path(self.stats_dir).glob("worker-*.prof"))
+        ]
+        if paths:
+            if self.stats is None:
+                self.stats = pstats.Stats(*paths)
+            else:
+                self.stats.add(*paths)
+            logger.info(f"Merged profiling statistics of {len(paths)} workers")
+        shutil.rmtree(self.stats_dir, ignore_errors=True)
+        self.stats_dir = None
+        return self.stats
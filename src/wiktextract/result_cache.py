@@ -0,0 +1,232 @@
+# Persistent cache of the results of functions that are called with the
+# same arguments on many pages, such as `decode_tags()` and `classify_desc()`
+# of the English extractor.  Their `functools.lru_cache` starts empty in
+# every worker process of every run; with `--result-cache FILE`, the results
+# are also looked up in an SQLite database that all workers share and that
+# is kept between runs.  New results are saved by each worker in batches.
+#
+# Results are stored with a version, a hash of the source files of the
+# modules whose data the function uses (e.g. tags.py and topics.py), so
+# results computed with other tag tables are not used; they are deleted at
+# the end of the run.  The workers count the lookups and hits of each
+# function, and the parent process logs the hit rates of the run.
+
+import functools
+import hashlib
+import inspect
+import pickle
+import sqlite3
+import sys
+from contextlib import closing
+from multiprocessing.util import Finalize
+from typing import Any, Callable, Optional, TypeVar
+
+from .wxr_logging import logger
+
+RESULT_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    function TEXT,
+    key TEXT,
+    version TEXT,
+    value BLOB,
+    PRIMARY KEY (function, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS run_stats (
+    function TEXT,
+    version TEXT,
+    lookups INTEGER,
+    hits INTEGER
+);
+"""
+
+# Number of new results a worker collects before saving them
+FLUSH_SIZE = 1000
+
+# Cache of this worker process, None if the cache is not used
+worker_cache: Optional["ResultCache"] = None
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def source_version(module_names: tuple[str, ...]) -> str:
+    """Returns a hash of the source files of the modules."""
+    h = hashlib.sha256()
+    for name in module_names:
+        path = sys.modules[name].__file__
+        if path is not None:
+            with open(path, "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+def cache_key(value: Any) -> str:
+    """Returns a string identifying the argument value.  Set elements are
+    sorted, as their order differs between processes."""
+    if isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(cache_key(x) for x in value)) + "}"
+    if isinstance(value, (list, tuple)):
+        return "(" + ", ".join(cache_key(x) for x in value) + ")"
+    return repr(value)
+
+
+class ResultCache:
+    """The result cache database at ``path``, passed to the worker
+    processes."""
+
+    __slots__ = ("path", "conn", "versions", "pending", "counts")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        # Version of each function, see `source_version()`
+        self.versions: dict[str, str] = {}
+        # New results not saved yet, by function and key
+        self.pending: dict[tuple[str, str], tuple[str, bytes]] = {}
+        # Number of lookups and hits of each function since the last save
+        self.counts: dict[str, list[int]] = {}
+
+    def __getstate__(self):
+        return self.path
+
+    def __setstate__(self, state) -> None:
+        self.__init__(state)  # type: ignore[misc]
+
+    def connect(self) -> sqlite3.Connection:
+        # Wait for the other workers saving their results
+        conn = sqlite3.connect(self.path, timeout=600)
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(RESULT_CACHE_SCHEMA)
+        return conn
+
+    def start(self) -> None:
+        """Creates the database if needed and resets the statistics of the
+        run.  Called in the parent process before starting the workers."""
+        with closing(self.connect()) as conn:
+            conn.execute("DELETE FROM run_stats")
+            conn.commit()
+
+    def start_worker(self) -> None:
+        """Called from the worker process initializer."""
+        global worker_cache
+        self.conn = self.connect()
+        worker_cache = self
+        # `atexit` handlers are not run in `multiprocessing` worker processes
+        Finalize(None, self.save, exitpriority=10)
+
+    def version(self, name: str, module_names: tuple[str, ...]) -> str:
+        version = self.versions.get(name)
+        if version is None:
+            version = self.versions[name] = source_version(module_names)
+        return version
+
+    def get(self, name: str, version: str, key: str) -> tuple[bool, Any]:
+        """Returns (True, result) if the result is in the cache, otherwise
+        (False, None)."""
+        counts = self.counts.get(name)
+        if counts is None:
+            counts = self.counts[name] = [0, 0]
+        counts[0] += 1
+        new_result = self.pending.get((name, key))
+        if new_result is not None:
+            value = new_result[1]
+        else:
+            row = self.conn.execute(  # type: ignore[union-attr]
+                "SELECT value FROM results "
+                "WHERE function = ? AND key = ? AND version = ?",
+                (name, key, version),
+            ).fetchone()
+            if row is None:
+                return False, None
+            value = row[0]
+        counts[1] += 1
+        return True, pickle.loads(value)
+
+    def put(self, name: str, version: str, key: str, value: Any) -> None:
+        self.pending[(name, key)] = (version, pickle.dumps(value))
+        if len(self.pending) >= FLUSH_SIZE:
+            self.save()
+
+    def save(self) -> None:
+        """Saves the new results and the counts of this worker."""
+        if self.conn is None or not (self.pending or self.counts):
+            return
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                [
+                    (name, key, version, value)
+                    for (name, key), (version, value) in self.pending.items()
+                ],
+            )
+            self.conn.executemany(
+                "INSERT INTO run_stats VALUES (?, ?, ?, ?)",
+                [
+                    (name, self.versions[name], lookups, hits)
+                    for name, (lookups, hits) in self.counts.items()
+                ],
+            )
+        self.pending = {}
+        self.counts = {}
+
+    def finish(self) -> dict[str, dict[str, Any]]:
+        """Logs and returns the hit rates of the run and deletes the results
+        of other versions of the functions used in the run.  Called in the
+        parent process after the workers have exited."""
+        stats = {}
+        with closing(self.connect()) as conn:
+            for name, lookups, hits in conn.execute(
+                "SELECT function, SUM(lookups), SUM(hits) FROM run_stats "
+                "GROUP BY function ORDER BY function"
+            ):
+                hit_rate = hits / lookups if lookups else 0.0
+                stats[name] = {
+                    "lookups": lookups,
+                    "hits": hits,
+                    "hit_rate": hit_rate,
+                }
+                logger.info(
+                    f"Result cache: {hits} of {lookups} {name}() calls "
+                    f"found ({hit_rate:.1%})"
+                )
+            conn.execute(
+                "DELETE FROM results WHERE function IN "
+                "(SELECT function FROM run_stats) AND version NOT IN "
+                "(SELECT version FROM run_stats "
+                "WHERE run_stats.function = results.function)"
+            )
+            conn.commit()
+        return stats
+
+
+def persistent_cache(
+    name: str, module_names: tuple[str, ...]
+) -> Callable[[F], F]:
+    """Decorator that looks up the results of the function in the result
+    cache of the worker process, if it is used.  The function must only
+    depend on its arguments and on the data in the modules
+    ``module_names``.  Apply `functools.lru_cache` on top of this, so that
+    the database is only read once per argument in a process."""
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = worker_cache
+            if cache is None:
+                return func(*args, **kwargs)
+            # The same key for positional, keyword and default arguments
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = cache_key(bound.args)
+            version = cache.version(name, module_names)
+            found, value = cache.get(name, version, key)
+            if not found:
+                value = func(*args, **kwargs)
+                cache.put(name, version, key, value)
+            return value
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -0,0 +1,316 @@
+# Timing statistics for the second (extraction) phase.  Worker processes
+# measure each page with a PageTimer and return the result together with the
+# extracted data; the parent process merges them into a RunReport, which is
+# written out as a machine-readable JSON file at the end of the run.
+#
+# Optionally, the time spent in named spans of the extraction code (parsing,
+# template expansion, cleaning, tag decoding, ...) is also measured; see
+# `WiktextractContext.span()`.
+
+import heapq
+import json
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import AbstractContextManager, nullcontext
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, TypedDict
+
+if TYPE_CHECKING:
+    from .config import WiktionaryConfig
+
+# Upper bounds (in seconds) of the histogram buckets; the last bucket
+# collects everything above the last bound.
+HISTOGRAM_BOUNDS = (
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+    5.0,
+    10.0,
+    20.0,
+    50.0,
+    100.0,
+)
+
+# Language section and subsection (usually a part-of-speech) with the
+# wall time spent in it, in seconds
+SectionTimeData = tuple[str, Optional[str], float]
+
+
+# Number of calls, inclusive time and exclusive time of a span, in seconds
+SpanTimeData = tuple[int, float, float]
+
+
+class PageStatsData(TypedDict):
+    title: str
+    wall_time: float
+    cpu_time: float
+    sections: list[SectionTimeData]
+    section_counts: dict[str, int]
+    spans: dict[str, SpanTimeData]
+
+
+class SpanTimer:
+    """Measures the call count and the inclusive and exclusive wall time of
+    named spans.  Exclusive time does not include the time of spans nested
+    inside the span, and the inclusive time of recursive spans is only
+    counted for the outermost one."""
+
+    __slots__ = ("stack", "totals", "pending")
+
+    def __init__(self) -> None:
+        # Name, start time and time spent in nested spans of open spans
+        self.stack: list[list[Any]] = []
+        self.totals: dict[str, list[Any]] = {}
+        self.pending = ""
+
+    def span(self, name: str) -> "SpanTimer":
+        self.pending = name
+        return self
+
+    def __enter__(self) -> None:
+        self.stack.append([self.pending, time.perf_counter(), 0.0])
+
+    def __exit__(self, *exc_info: Any) -> None:
+        name, start, nested = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        totals = self.totals.get(name)
+        if totals is None:
+            totals = self.totals[name] = [0, 0.0, 0.0]
+        totals[0] += 1
+        if all(frame[0] != name for frame in self.stack):
+            totals[1] += elapsed
+        totals[2] += elapsed - nested
+
+    def take(self) -> dict[str, SpanTimeData]:
+        """Returns the totals collected since the previous call."""
+        totals = {k: tuple(v) for k, v in self.totals.items()}
+        self.totals = {}
+        return totals  # type: ignore[return-value]
+
+
+# Span timer of this process; None when span timing is disabled
+span_timer: Optional[SpanTimer] = None
+NULL_SPAN = nullcontext()
+
+
+def enable_spans(enable: bool) -> None:
+    global span_timer
+    span_timer = SpanTimer() if enable else None
+
+
+def span(name: str) -> AbstractContextManager:
+    """Returns a context manager that measures the time spent in the
+    enclosed code under ``name``.  This does next to nothing when span
+    timing is disabled.  Use `WiktextractContext.span()` where the context
+    is available; this function is for code that does not have it, such as
+    cached functions."""
+    if span_timer is None:
+        return NULL_SPAN
+    return span_timer.span(name)
+
+
+class PageTimer:
+    """Measures the wall and CPU time used for one page in a worker process.
+    Time between calls to ``switch()`` is charged to the language section
+    and subsection that were current before the call; time spent outside
+    any language section (parsing the page, post-processing) only counts
+    towards the page total."""
+
+    __slots__ = (
+        "spans",
+        "title",
+        "wall_start",
+        "cpu_start",
+        "clock",
+        "section",
+        "subsection",
+        "sections",
+    )
+
+    def __init__(self, spans: bool = False) -> None:
+        # Also enable span timing in the worker processes
+        self.spans = spans
+        self.start_page("")
+
+    def start_page(self, title: str) -> None:
+        self.title = title
+        self.wall_start = self.clock = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.section: Optional[str] = None
+        self.subsection: Optional[str] = None
+        self.sections: dict[tuple[str, Optional[str]], float] = {}
+
+    def switch(self, section: Optional[str], subsection: Optional[str]) -> None:
+        now = time.perf_counter()
+        if self.section is not None:
+            key = (self.section, self.subsection)
+            self.sections[key] = self.sections.get(key, 0.0) + now - self.clock
+        self.clock = now
+        self.section = section
+        self.subsection = subsection
+
+    def finish_page(self, section_counts: dict[str, int]) -> PageStatsData:
+        self.switch(None, None)
+        return {
+            "title": self.title,
+            "wall_time": time.perf_counter() - self.wall_start,
+            "cpu_time": time.process_time() - self.cpu_start,
+            "sections": [
+                (lang, pos, t) for (lang, pos), t in self.sections.items()
+            ],
+            "section_counts": section_counts,
+            "spans": span_timer.take() if span_timer is not None else {},
+        }
+
+
+class Histogram:
+    """Counts values into the fixed buckets of ``HISTOGRAM_BOUNDS``."""
+
+    __slots__ = ("counts", "total", "maximum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value: float) -> None:
+        self.counts[bisect_left(HISTOGRAM_BOUNDS, value)] += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def to_json(self) -> dict[str, Any]:
+        count = sum(self.counts)
+        return {
+            "bounds": list(HISTOGRAM_BOUNDS),
+            "counts": self.counts,
+            "count": count,
+            "sum": self.total,
+            "mean": self.total / count if count else 0.0,
+            "max": self.maximum,
+        }
+
+
+class TopN:
+    """Keeps the ``n`` items with the largest keys."""
+
+    __slots__ = ("n", "heap", "seq")
+
+    def __init__(self, n: int) -> None:
+        self.n = n
+        self.heap: list[tuple[float, int, dict[str, Any]]] = []
+        self.seq = 0
+
+    def add(self, key: float, item: dict[str, Any]) -> None:
+        self.seq += 1
+        if len(self.heap) < self.n:
+            heapq.heappush(self.heap, (key, self.seq, item))
+        elif key > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (key, self.seq, item))
+
+    def to_json(self) -> list[dict[str, Any]]:
+        return [item for _, _, item in sorted(self.heap, reverse=True)]
+
+
+class RunReport:
+    """Collects the page statistics returned by the worker processes."""
+
+    def __init__(self, top_n: int = 100) -> None:
+        self.start_time = time.time()
+        self.start_clock = time.perf_counter()
+        self.num_pages = 0
+        self.wall_times = Histogram()
+        self.cpu_times = Histogram()
+        self.slowest_pages = TopN(top_n)
+        self.slowest_sections = TopN(top_n)
+        self.languages: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+        self.pos: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+        self.spans: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+        # Hit rates of the result cache, see `ResultCache.finish()`
+        self.result_cache: Optional[dict[str, dict[str, Any]]] = None
+
+    def add_page(self, stats: PageStatsData) -> None:
+        self.num_pages += 1
+        self.wall_times.add(stats["wall_time"])
+        self.cpu_times.add(stats["cpu_time"])
+        self.slowest_pages.add(
+            stats["wall_time"],
+            {
+                "title": stats["title"],
+                "wall_time": stats["wall_time"],
+                "cpu_time": stats["cpu_time"],
+            },
+        )
+        for lang in {lang for lang, _, _ in stats["sections"]}:
+            self.languages[lang][0] += 1
+        for lang, pos, t in stats["sections"]:
+            self.languages[lang][1] += t
+            if pos is not None:
+                pos_totals = self.pos[pos]
+                pos_totals[0] += 1
+                pos_totals[1] += t
+            self.slowest_sections.add(
+                t,
+                {"title": stats["title"], "lang": lang, "pos": pos, "time": t},
+            )
+        for name, (count, inclusive, exclusive) in stats["spans"].items():
+            totals = self.spans[name]
+            totals[0] += count
+            totals[1] += inclusive
+            totals[2] += exclusive
+
+    def to_json(self, config: "WiktionaryConfig") -> dict[str, Any]:
+        elapsed = time.perf_counter() - self.start_clock
+        try:
+            wiktextract_version = version("wiktextract")
+        except PackageNotFoundError:
+            wiktextract_version = None
+        return {
+            "wiktextract_version": wiktextract_version,
+            "edition": config.dump_file_lang_code,
+            "start_time": self.start_time,
+            "elapsed": elapsed,
+            "num_pages": self.num_pages,
+            "pages_per_second": self.num_pages / elapsed if elapsed else 0.0,
+            "page_wall_time": self.wall_times.to_json(),
+            "page_cpu_time": self.cpu_times.to_json(),
+            "slowest_pages": self.slowest_pages.to_json(),
+            "slowest_sections": self.slowest_sections.to_json(),
+            "languages": {
+                k: {"count": v[0], "time": v[1]}
+                for k, v in self.languages.items()
+            },
+            "pos": {
+                k: {"count": v[0], "time": v[1]} for k, v in self.pos.items()
+            },
+            "section_counts": config.section_counts,
+            "spans": {
+                k: {
+                    "count": v[0],
+                    "inclusive": v[1],
+                    "exclusive": v[2],
+                    # Fraction of the total page processing time
+                    "exclusive_share": v[2] / self.wall_times.total
+                    if self.wall_times.total
+                    else 0.0,
+                }
+                for k, v in self.spans.items()
+            },
+            "result_cache": self.result_cache,
+        }
+
+    def write(self, config: "WiktionaryConfig", path: str | Path) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(config), f, indent=2, sort_keys=True)
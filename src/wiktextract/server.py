@@ -0,0 +1,301 @@
+# Extraction service for tools that need single pages extracted quickly,
+# e.g. previews while editing.  `wiktwords --serve` keeps a pool of worker
+# processes with initialized extraction contexts (database connections, Lua
+# runtime, imported extractor modules) and answers HTTP requests on a TCP
+# port or a Unix socket:
+#
+#   GET /extract?title=TITLE    extract the page TITLE from the database
+#   POST /extract               extract {"title": ..., "text": ...}, where
+#                               "text" is wikitext; without "text" the page
+#                               is read from the database
+#   POST /reload                reload the override pages
+#
+# The response of /extract is {"title": ..., "entries": [...], "errors":
+# [...], "warnings": [...], "debugs": [...]}.  Override pages are also
+# reloaded automatically when the override files have changed.  The worker
+# processes are replaced after a reload, because they cache templates and
+# Lua modules.  All worker processes are started and warmed up with an
+# extraction before requests are served, also after a reload.
+
+import json
+import os
+import socketserver
+import stat
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from copy import deepcopy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import get_all_start_methods, get_context
+from multiprocessing.synchronize import Barrier
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from wikitextprocessor import Page
+from wikitextprocessor.dumpparser import analyze_and_overwrite_pages
+from wikitextprocessor.luaexec import initialize_lua
+
+from . import wiktionary
+from .thesaurus import extract_thesaurus_data, thesaurus_linkage_number
+from .wiktionary import check_page_data, init_worker, page_handler
+from .wxr_context import WiktextractContext
+from .wxr_logging import logger
+
+
+def extract_page(title: str, text: str | None) -> dict[str, Any]:
+    """Extracts one page in a worker process."""
+    wxr = wiktionary.worker_wxr
+    if text is None:
+        text = wxr.wtp.get_page_body(title, None)
+        if text is None:
+            return {"title": title, "error": "page not found"}
+    page_data, ret, _ = page_handler(
+        Page(title=title, namespace_id=0, body=text)
+    )
+    check_page_data(wxr, page_data, ret)
+    return {
+        "title": title,
+        "entries": page_data,
+        "errors": ret.get("errors", []),
+        "warnings": ret.get("warnings", []),
+        "debugs": ret.get("debugs", []),
+    }
+
+
+# Seconds the warm-up tasks wait for the other worker processes
+WARM_UP_TIMEOUT = 600
+
+# Barrier of the warm-up tasks of the pool of this worker process
+warm_up_barrier: Barrier | None = None
+
+
+def init_server_worker(wxr: WiktextractContext, barrier: Barrier) -> None:
+    global warm_up_barrier
+    init_worker(wxr)
+    warm_up_barrier = barrier
+
+
+def warm_up_worker() -> int:
+    """Extracts an empty page, which imports the extractor modules, and
+    initializes Lua in a worker process.  Then waits for the other workers
+    of the pool, so that each of them gets one warm-up task.  Returns the
+    process id."""
+    wxr = wiktionary.worker_wxr
+    extract_page("Wiktextract warm-up", "")
+    if wxr.wtp.lua is None:
+        initialize_lua(wxr.wtp)
+    warm_up_barrier.wait(WARM_UP_TIMEOUT)  # type: ignore[union-attr]
+    return os.getpid()
+
+
+def is_socket(path: str) -> bool:
+    try:
+        return stat.S_ISSOCK(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+def override_mtime(paths: list[Path]) -> float:
+    """Returns the latest modification time of the override files."""
+    mtime = 0.0
+    for path in paths:
+        files = path.rglob("*") if path.is_dir() else [path]
+        for file in files:
+            try:
+                mtime = max(mtime, file.stat().st_mtime)
+            except FileNotFoundError:
+                pass
+    return mtime
+
+
+class ExtractionService:
+    """Pool of ``num_processes`` worker processes extracting pages with
+    copies of ``wxr``."""
+
+    __slots__ = (
+        "wxr",
+        "num_processes",
+        "override_paths",
+        "override_mtime",
+        "executor",
+        "worker_pids",
+        "lock",
+    )
+
+    def __init__(
+        self,
+        wxr: WiktextractContext,
+        num_processes: int | None,
+        override_paths: list[Path] | None = None,
+    ) -> None:
+        self.wxr = wxr
+        self.num_processes = num_processes
+        self.override_paths = override_paths or []
+        self.override_mtime = override_mtime(self.override_paths)
+        self.lock = threading.Lock()
+        # Process ids of the warmed-up worker processes
+        self.worker_pids: list[int] = []
+        if (
+            wxr.config.extract_thesaurus_pages
+            and thesaurus_linkage_number(wxr.thesaurus_db_conn) == 0  # type: ignore[arg-type]
+        ):
+            extract_thesaurus_data(wxr, num_processes)
+        self.executor = self.start_pool()
+
+    def start_pool(self) -> ProcessPoolExecutor:
+        """Starts the worker processes and waits until all of them have
+        been warmed up with `warm_up_worker()`."""
+        num_workers = self.num_processes or os.cpu_count() or 1
+        mp_context = get_context(
+            "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
+        )
+        self.wxr.remove_unpicklable_objects()
+        executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=mp_context,
+            initializer=init_server_worker,
+            initargs=(deepcopy(self.wxr), mp_context.Barrier(num_workers)),
+        )
+        # Reloads are done in the request handler threads
+        self.wxr.reconnect_databases(check_same_thread=False)
+        # A worker process is started for each task submitted while the
+        # others are busy
+        futures = [executor.submit(warm_up_worker) for _ in range(num_workers)]
+        self.worker_pids = [future.result() for future in futures]
+        logger.info(f"Started {num_workers} extraction worker processes")
+        return executor
+
+    def extract(self, title: str, text: str | None) -> dict[str, Any]:
+        if (
+            self.override_paths
+            and override_mtime(self.override_paths) > self.override_mtime
+        ):
+            self.reload_overrides(force=False)
+        with self.lock:
+            future = self.executor.submit(extract_page, title, text)
+        return future.result()
+
+    def reload_overrides(self, force: bool = True) -> None:
+        with self.lock:
+            mtime = override_mtime(self.override_paths)
+            if not force and mtime <= self.override_mtime:
+                # Already reloaded by another request
+                return
+            self.override_mtime = mtime
+            if self.override_paths:
+                analyze_and_overwrite_pages(
+                    self.wxr.wtp, self.override_paths, True, None
+                )
+            old_executor = self.executor
+            self.executor = self.start_pool()
+        # Requests already submitted are finished by the old workers
+        old_executor.shutdown(wait=False)
+        logger.info("Reloaded override pages")
+
+    def shutdown(self) -> None:
+        self.executor.shutdown()
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    server: Any
+
+    def send_json(self, status: int, data: Any) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def extract(self, title: Any, text: Any) -> None:
+        if not isinstance(title, str) or not (
+            text is None or isinstance(text, str)
+        ):
+            self.send_json(400, {"error": "invalid title or text"})
+            return
+        result = self.server.service.extract(title, text)
+        self.send_json(404 if "error" in result else 200, result)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/extract":
+            self.send_json(404, {"error": "unknown path"})
+            return
+        titles = parse_qs(url.query).get("title")
+        self.extract(titles[0] if titles else None, None)
+
+    def do_POST(self) -> None:
+        path = urlsplit(self.path).path
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if path == "/reload":
+            self.server.service.reload_overrides()
+            self.send_json(200, {"reloaded": True})
+        elif path == "/extract":
+            try:
+                request = json.loads(body)
+            except ValueError:
+                self.send_json(400, {"error": "invalid JSON"})
+                return
+            if not isinstance(request, dict):
+                self.send_json(400, {"error": "expected a JSON object"})
+                return
+            self.extract(request.get("title"), request.get("text"))
+        else:
+            self.send_json(404, {"error": "unknown path"})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class ThreadingUnixHTTPServer(
+    socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    daemon_threads = True
+
+    def get_request(self) -> tuple:
+        # The client address of a Unix socket is an empty string, but
+        # `BaseHTTPRequestHandler` expects a (host, port) tuple
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def serve(
+    wxr: WiktextractContext,
+    address: str,
+    num_processes: int | None,
+    override_paths: list[Path] | None = None,
+) -> None:
+    """Serves extraction requests on ``address``, which is either
+    "HOST:PORT" or the path of a Unix socket, until interrupted."""
+    host, sep, port = address.rpartition(":")
+    is_tcp = sep != "" and port.isdigit()
+    if not is_tcp and os.path.lexists(address):
+        if not is_socket(address):
+            logger.error(
+                f"{address} exists and is not a socket; use HOST:PORT for "
+                "a TCP port"
+            )
+            sys.exit(1)
+        # Left by a previous server
+        os.remove(address)
+    service = ExtractionService(wxr, num_processes, override_paths)
+    server: socketserver.BaseServer
+    if is_tcp:
+        server = ThreadingHTTPServer(
+            (host or "127.0.0.1", int(port)), RequestHandler
+        )
+    else:
+        server = ThreadingUnixHTTPServer(address, RequestHandler)
+    server.service = service  # type: ignore[attr-defined]
+    logger.info(f"Serving extraction requests on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if not is_tcp and is_socket(address):
+            os.remove(address)
@@ -0,0 +1,210 @@
+# Sharded extraction over several machines.  Each machine runs the second
+# phase on the same database with `--shard K/N` and extracts only its share
+# of the pages; the shares are computed from the page sizes in the same
+# deterministic way on every machine.  Besides the output file, each shard
+# writes a summary file with its errors and the emitted (word, lang_code,
+# pos) keys.  The errors from before the first page, e.g. those of the
+# thesaurus extraction, are the same in every shard; they are kept apart
+# from the errors of the pages and merged only once.  `merge_shards()`
+# combines the shard outputs and summaries and then emits the words that
+# only occur in the thesaurus, which needs the emitted keys of all shards.
+
+import heapq
+import json
+import shutil
+from argparse import ArgumentTypeError
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+from wikitextprocessor import Page
+
+from .checkpoint import ERROR_LISTS
+from .compression import open_input
+from .thesaurus import (
+    emit_words_in_thesaurus,
+    extract_thesaurus_data,
+    thesaurus_linkage_number,
+)
+from .wxr_context import WiktextractContext
+from .wxr_logging import logger
+
+SHARD_SUMMARY_VERSION = 2
+
+
+class ShardError(Exception):
+    pass
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parses a "K/N" shard option, where 1 <= K <= N."""
+    shard, _, num_shards = value.partition("/")
+    try:
+        k, n = int(shard), int(num_shards)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid shard {value!r}, expected K/N")
+    if not 1 <= k <= n:
+        raise ArgumentTypeError(f"invalid shard {value!r}, need 1 <= K <= N")
+    return k, n
+
+
+def shard_summary_path(out_path: str | Path) -> Path:
+    return Path(f"{out_path}.shard.json")
+
+
+class ShardExtraction:
+    """Selects the pages of shard ``shard`` (1-based) of ``num_shards`` and
+    writes the shard summary to ``summary_path``."""
+
+    __slots__ = ("shard", "num_shards", "summary_path", "titles", "error_sizes")
+
+    def __init__(
+        self, shard: int, num_shards: int, summary_path: str | Path
+    ) -> None:
+        assert 1 <= shard <= num_shards
+        self.shard = shard
+        self.num_shards = num_shards
+        self.summary_path = Path(summary_path)
+        self.titles: set[str] = set()
+        # Lengths of the error lists before the first page
+        self.error_sizes: dict[str, int] = {}
+
+    def select(
+        self,
+        wxr: WiktextractContext,
+        namespace_ids: list[int],
+        rowids: list[int] | None = None,
+    ) -> None:
+        """Assigns the wikitext pages of ``namespace_ids``, or only those
+        with the ``rowids`` of a `PageSelection`, to shards, largest first,
+        always to the shard with the smallest total size so far.  Ties are
+        broken by the title and the shard number, so that every machine
+        gets the same result.  Only the sizes are read from the database,
+        not the page bodies.  The errors reported until now are kept apart
+        from those of the pages."""
+        self.error_sizes = {
+            name: len(getattr(wxr.config, name)) for name in ERROR_LISTS
+        }
+        conditions = [
+            f"namespace_id IN ({', '.join('?' * len(namespace_ids))})",
+            "model = 'wikitext'",
+        ]
+        params: list[int | str] = list(namespace_ids)
+        if rowids is not None:
+            conditions.append("rowid IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(rowids))
+        sizes = sorted(
+            (-(size + 1), title)
+            for title, size in wxr.wtp.db_conn.execute(
+                "SELECT title, "
+                "length(coalesce(nullif(body, ''), redirect_to, '')) "
+                f"FROM pages WHERE {' AND '.join(conditions)}",
+                params,
+            )
+        )
+        loads = [(0, i) for i in range(1, self.num_shards + 1)]
+        self.titles = set()
+        for neg_size, title in sizes:
+            load, shard = loads[0]
+            if shard == self.shard:
+                self.titles.add(title)
+            heapq.heapreplace(loads, (load - neg_size, shard))
+        logger.info(
+            f"Shard {self.shard}/{self.num_shards}: {len(self.titles)} of "
+            f"{len(sizes)} pages"
+        )
+
+    def pages(self, pages: Iterable[Page]) -> Iterator[Page]:
+        for page in pages:
+            if page.title in self.titles:
+                yield page
+
+    def write_summary(
+        self, wxr: WiktextractContext, emitted: set[tuple[str, str, str]]
+    ) -> None:
+        summary = {
+            "version": SHARD_SUMMARY_VERSION,
+            "edition": wxr.config.dump_file_lang_code,
+            "shard": self.shard,
+            "num_shards": self.num_shards,
+            "num_pages": len(self.titles),
+            "emitted": sorted(emitted),
+        }
+        before_pages = {}
+        for name in ERROR_LISTS:
+            errors = getattr(wxr.config, name)
+            size = self.error_sizes.get(name, 0)
+            before_pages[name] = errors[:size]
+            summary[name] = errors[size:]
+        summary["before_pages"] = before_pages
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False)
+        logger.info(f"Shard summary written to {self.summary_path}")
+
+
+def merge_shards(
+    wxr: WiktextractContext,
+    shard_out_paths: list[str],
+    out_f: TextIO,
+    human_readable: bool,
+    num_processes: int | None = None,
+) -> None:
+    """Concatenates the shard output files in shard order, merges their
+    errors into ``wxr.config`` and emits the words that only occur in the
+    thesaurus."""
+    summaries = []
+    for path in shard_out_paths:
+        try:
+            with open(shard_summary_path(path), encoding="utf-8") as f:
+                summary = json.load(f)
+        except FileNotFoundError:
+            raise ShardError(
+                f"No shard summary {shard_summary_path(path)}, the shard "
+                f"extraction of {path} is incomplete"
+            )
+        if summary.get("version") != SHARD_SUMMARY_VERSION:
+            raise ShardError(
+                f"Unsupported shard summary {shard_summary_path(path)}"
+            )
+        summaries.append((summary, path))
+    summaries.sort(key=lambda item: item[0]["shard"])
+    shards = [summary["shard"] for summary, _ in summaries]
+    num_shards = {summary["num_shards"] for summary, _ in summaries}
+    if len(num_shards) != 1 or shards != list(
+        range(1, next(iter(num_shards)) + 1)
+    ):
+        raise ShardError(
+            f"Expected the outputs of all shards of one run, got shards "
+            f"{shards} of {sorted(num_shards)}"
+        )
+    for summary, _ in summaries:
+        if summary["edition"] != wxr.config.dump_file_lang_code:
+            raise ShardError(
+                f"Shard {summary['shard']} is from the {summary['edition']} "
+                "edition"
+            )
+
+    emitted: set[tuple[str, str, str]] = set()
+    for name in ERROR_LISTS:
+        getattr(wxr.config, name).extend(summaries[0][0]["before_pages"][name])
+    for summary, path in summaries:
+        logger.info(f"Merging shard {summary['shard']} from {path}")
+        with open_input(path) as f:
+            shutil.copyfileobj(f, out_f)
+        emitted.update(tuple(key) for key in summary["emitted"])  # type: ignore[misc]
+        for name in ERROR_LISTS:
+            getattr(wxr.config, name).extend(summary[name])
+
+    if wxr.config.dump_file_lang_code == "en":
+        if (
+            wxr.config.extract_thesaurus_pages
+            and thesaurus_linkage_number(wxr.thesaurus_db_conn) == 0  # type: ignore[arg-type]
+        ):
+            error_sizes = {
+                name: len(getattr(wxr.config, name)) for name in ERROR_LISTS
+            }
+            extract_thesaurus_data(wxr, num_processes)
+            # Its errors are already merged from the shards
+            for name, size in error_sizes.items():
+                del getattr(wxr.config, name)[size:]
+        emit_words_in_thesaurus(wxr, emitted, out_f, human_readable)
+    logger.info(f"Merged {len(summaries)} shards")
@@ -0,0 +1,125 @@
+# Output sorted by (lang_code, word, pos), so that the output files of two
+# runs can be compared with diff.  The serialized entries are collected in
+# memory with their sort keys; when they take more than ``max_run_bytes``,
+# they are sorted and spilled to a temporary run file.  At the end the runs
+# are merged into the output file.  The entries are kept as bytes
+# throughout, they are not parsed again.  Entries with the same key keep the
+# order in which they were written, which is deterministic because pages
+# are processed in database order, so the output is the same byte for byte
+# if the extracted data is the same.
+
+import heapq
+import struct
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from typing import BinaryIO, Iterator, TextIO
+
+from .wxr_logging import logger
+
+# Lengths of the key and the entry in the run files
+RECORD_HEADER = struct.Struct(">II")
+
+
+def sort_key(data: dict, ordinal: int) -> bytes:
+    # Fields are separated by zero bytes, which sort before any other
+    # character, and UTF-8 sorts in code point order like `str`
+    return "\0".join(
+        (
+            str(data.get("lang_code", "")),
+            str(data.get("word", "")),
+            str(data.get("pos", "")),
+            "",
+        )
+    ).encode("utf-8") + ordinal.to_bytes(8, "big")
+
+
+def read_run(f: BinaryIO) -> Iterator[tuple[bytes, bytes]]:
+    while header := f.read(RECORD_HEADER.size):
+        key_len, entry_len = RECORD_HEADER.unpack(header)
+        yield f.read(key_len), f.read(entry_len)
+
+
+class SortedOutput:
+    """Sorts the entries written to it in runs of at most ``max_run_bytes``
+    bytes, which are kept in temporary files in ``tmp_dir``."""
+
+    __slots__ = (
+        "tmp_dir",
+        "max_run_bytes",
+        "entries",
+        "run_bytes",
+        "runs",
+        "ordinal",
+    )
+
+    def __init__(
+        self,
+        tmp_dir: str | Path | None = None,
+        max_run_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory(
+            prefix="wiktextract-sort-", dir=tmp_dir
+        )
+        self.max_run_bytes = max_run_bytes
+        self.entries: list[tuple[bytes, bytes]] = []
+        self.run_bytes = 0
+        self.runs: list[Path] = []
+        # Number of entries added so far
+        self.ordinal = 0
+
+    def add(self, data: dict, text: str) -> None:
+        """Adds the entry ``data`` serialized as ``text``."""
+        entry = text.encode("utf-8")
+        self.entries.append((sort_key(data, self.ordinal), entry))
+        self.ordinal += 1
+        self.run_bytes += len(entry)
+        if self.run_bytes >= self.max_run_bytes:
+            self.spill()
+
+    def spill(self) -> None:
+        self.entries.sort()
+        path = Path(self.tmp_dir.name) / f"run{len(self.runs)}"
+        with open(path, "wb", buffering=1024 * 1024) as f:
+            for key, entry in self.entries:
+                f.write(RECORD_HEADER.pack(len(key), len(entry)))
+                f.write(key)
+                f.write(entry)
+        self.runs.append(path)
+        logger.info(
+            f"Sorted output: spilled {len(self.entries)} entries to {path}"
+        )
+        self.entries = []
+        self.run_bytes = 0
+
+    def finish(self, out_f: TextIO) -> None:
+        """Writes all entries to ``out_f`` in sorted order and removes the
+        run files."""
+        self.entries.sort()
+        out_f.flush()
+        # Write the bytes directly to the binary buffer of a text file
+        write = (
+            out_f.buffer.write
+            if hasattr(out_f, "buffer")
+            else lambda entry: out_f.write(entry.decode("utf-8"))
+        )
+        try:
+            with ExitStack() as stack:
+                runs = [
+                    read_run(
+                        stack.enter_context(
+                            open(path, "rb", buffering=1024 * 1024)
+                        )
+                    )
+                    for path in self.runs
+                ]
+                logger.info(
+                    f"Sorted output: merging {self.ordinal} entries from "
+                    f"{len(runs)} runs"
+                )
+                for _, entry in heapq.merge(*runs, iter(self.entries)):
+                    write(entry)
+        finally:
+            self.entries = []
+            self.tmp_dir.cleanup()
+        out_f.flush()
@@ -21,6 +21,8 @@ from wikitextprocessor import Page
 from wikitextprocessor.core import CollatedErrorReturnData, NamespaceDataEntry
 
 from .import_utils import import_extractor_module
+from .output_router import LanguageRouter
+from .sorted_output import SortedOutput
 from .wxr_context import WiktextractContext
 from .wxr_logging import logger
 
@@ -239,7 +241,7 @@ def close_thesaurus_db(db_path: Path, db_conn: sqlite3.Connection) -> None:
 def emit_words_in_thesaurus(
     wxr: WiktextractContext,
     emitted: set[tuple[str, str, str]],
-    out_f: TextIO,
+    out_f: TextIO | LanguageRouter | SortedOutput,
     human_readable: bool,
 ) -> None:
     # Emit words that occur in thesaurus as main words but for which
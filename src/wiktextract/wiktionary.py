@@ -5,6 +5,7 @@
 # Copyright (c) 2018-2022, 2024 Tatu Ylonen.  See file LICENSE and https://ylonen.org
 
 import atexit
+import functools
 import io
 import json
 import os
@@ -12,31 +13,46 @@ import re
 import tarfile
 import tempfile
 import time
+from collections import deque
 from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from copy import deepcopy
 from multiprocessing import current_process, get_all_start_methods, get_context
 from pathlib import Path
 from traceback import format_exc
-from typing import TextIO
+from typing import Any, Iterable, Iterator, TextIO
 
 from wikitextprocessor import Page
 from wikitextprocessor.core import CollatedErrorReturnData, ErrorMessageData
 from wikitextprocessor.dumpparser import process_dump
 
+from .checkpoint import Checkpoint
+from .dump_stream import pages_from_dump, store_page_stubs
 from .import_utils import import_extractor_module
+from .incremental import IncrementalExtraction
+from .output_router import LanguageRouter
 from .page import parse_page
+from .page_index import PageSelection
+from .profiling import WorkerProfiler
+from .result_cache import ResultCache
+from .run_report import PageStatsData, PageTimer, RunReport, enable_spans
+from .shards import ShardExtraction
+from .sorted_output import SortedOutput
 from .thesaurus import (
     emit_words_in_thesaurus,
     extract_thesaurus_data,
     thesaurus_linkage_number,
 )
+from .worker_pool import RecyclingPool
 from .wxr_context import WiktextractContext
 from .wxr_logging import logger
 
+worker_profiler: WorkerProfiler | None = None
+
 
 def page_handler(
     page: Page,
-) -> tuple[list[dict[str, str]], CollatedErrorReturnData]:
+) -> tuple[list[dict[str, str]], CollatedErrorReturnData, PageStatsData | None]:
     # Make sure there are no newlines or other strange characters in the
     # title.  They could cause security problems at several post-processing
     # steps.
@@ -47,12 +63,22 @@ def page_handler(
     # processed into /tmp/wiktextract*/wiktextract-*.  Once a hang
     # has been observed, these files contain page(s) that hang.  They should
     # be checked before aborting the process, as an interrupt might delete them.
-    with tempfile.TemporaryDirectory(prefix="wiktextract") as tmpdirname:
+    profile_context = (
+        worker_profiler.page_context(page.title)
+        if worker_profiler is not None
+        else nullcontext()
+    )
+    with (
+        profile_context,
+        tempfile.TemporaryDirectory(prefix="wiktextract") as tmpdirname,
+    ):
         debug_path = "{}/wiktextract-{}".format(tmpdirname, os.getpid())
         with open(debug_path, "w", encoding="utf-8") as f:
             f.write(page.title + "\n")
 
         worker_wxr.wtp.start_page(page.title)
+        if worker_wxr.page_timer is not None:
+            worker_wxr.page_timer.start_page(page.title)
         try:
             title = re.sub(r"[\s\000-\037]+", " ", page.title)
             title = title.strip()
@@ -76,7 +102,11 @@ def page_handler(
                         )
                     )
 
-            return page_data, worker_wxr.wtp.to_return()
+            return (
+                page_data,
+                worker_wxr.wtp.to_return(),
+                finish_page_stats(worker_wxr),
+            )
         except Exception:
             worker_wxr.wtp.error(
                 f'=== EXCEPTION while parsing page "{page.title}" '
@@ -84,7 +114,64 @@ def page_handler(
                 format_exc(),
                 "page_handler_exception",
             )
-            return [], worker_wxr.wtp.to_return()
+            return [], worker_wxr.wtp.to_return(), finish_page_stats(worker_wxr)
+
+
+def finish_page_stats(wxr: WiktextractContext) -> PageStatsData | None:
+    """Returns the statistics of the page just processed in a worker
+    process, or None if no run report was requested."""
+    if wxr.page_timer is None:
+        return None
+    section_counts = dict(wxr.config.section_counts)
+    wxr.config.section_counts.clear()
+    return wxr.page_timer.finish_page(section_counts)
+
+
+# Fields of the entries that the parent process uses when writing them
+# out: the output file of `LanguageRouter`, the sort key of `SortedOutput`,
+# the emitted words and the entry keys of incremental extraction
+ENTRY_KEY_FIELDS = ("word", "title", "lang_code", "pos")
+
+
+def check_page_data(
+    wxr: WiktextractContext,
+    page_data: list[dict[str, Any]],
+    ret: CollatedErrorReturnData,
+) -> None:
+    """Checks the entries of a page with `check_json_data()` and adds the
+    debug messages it reports to the messages ``ret`` of the page."""
+    debugs = wxr.config.debugs
+    num_debugs = len(debugs)
+    for data in page_data:
+        check_json_data(wxr, data)
+    if len(debugs) > num_debugs:
+        # Returned after the messages of the page, like when the parent
+        # process checked the entries
+        ret["debugs"] = ret.get("debugs", []) + debugs[num_debugs:]
+        del debugs[num_debugs:]
+
+
+def serialized_page_handler(
+    page: Page, human_readable: bool = False
+) -> tuple[
+    list[tuple[dict[str, str], str]],
+    CollatedErrorReturnData,
+    PageStatsData | None,
+]:
+    """Like `page_handler()`, but checks the entries with `check_json_data()`
+    and serializes them as JSON in the worker process.  Only the JSON text
+    and the ``ENTRY_KEY_FIELDS`` of each entry are returned, so the parent
+    process doesn't unpickle and serialize the whole entries."""
+    page_data, ret, page_stats = page_handler(page)
+    check_page_data(worker_wxr, page_data, ret)
+    entries = [
+        (
+            {k: data[k] for k in ENTRY_KEY_FIELDS if k in data},
+            json_text(data, human_readable),
+        )
+        for data in page_data
+    ]
+    return entries, ret, page_stats
 
 
 def parse_wiktionary(
@@ -98,10 +185,26 @@ def parse_wiktionary(
     override_folders: list[str] | list[Path] | None = None,
     skip_extract_dump: bool = False,
     save_pages_path: str | Path | None = None,
+    run_report_path: str | Path | None = None,
+    profiler: WorkerProfiler | None = None,
+    run_report_spans: bool = False,
+    checkpoint: Checkpoint | None = None,
+    resume: bool = False,
+    incremental: IncrementalExtraction | None = None,
+    shard: ShardExtraction | None = None,
+    router: LanguageRouter | None = None,
+    sorted_output: SortedOutput | None = None,
+    max_pages_per_worker: int | None = None,
+    max_worker_rss: int | None = None,
+    stream_pages: bool = False,
+    result_cache: ResultCache | None = None,
 ) -> None:
     """Parses Wiktionary from the dump file ``path`` (which should point
     to a "enwiktionary-<date>-pages-articles.xml.bz2" file.  This
-    calls `word_cb(data)` for all words defined for languages in `languages`."""
+    calls `word_cb(data)` for all words defined for languages in `languages`.
+    If ``stream_pages`` is true, the pages of the extracted namespaces are
+    not stored in the database but read from the dump file again in the
+    second phase."""
     capture_language_codes = wxr.config.capture_language_codes
     if capture_language_codes is not None:
         assert isinstance(capture_language_codes, (list, tuple, set))
@@ -114,6 +217,8 @@ def parse_wiktionary(
     if save_pages_path is not None:
         save_pages_path = Path(save_pages_path)
 
+    if stream_pages:
+        namespace_ids = namespace_ids - set(extract_namespace_ids(wxr))
     analyze_template_mod = import_extractor_module(
         wxr.wtp.lang_code, "analyze_template"
     )
@@ -130,18 +235,59 @@ def parse_wiktionary(
     )
 
     if not phase1_only:
-        reprocess_wiktionary(wxr, num_processes, out_f, human_readable)
+        reprocess_wiktionary(
+            wxr,
+            num_processes,
+            out_f,
+            human_readable,
+            run_report_path=run_report_path,
+            profiler=profiler,
+            run_report_spans=run_report_spans,
+            checkpoint=checkpoint,
+            resume=resume,
+            incremental=incremental,
+            shard=shard,
+            router=router,
+            sorted_output=sorted_output,
+            max_pages_per_worker=max_pages_per_worker,
+            max_worker_rss=max_worker_rss,
+            stream_dump_path=dump_path if stream_pages else None,
+            result_cache=result_cache,
+        )
 
 
-def write_json_data(data: dict, out_f: TextIO, human_readable: bool) -> None:
+def json_text(data: dict, human_readable: bool) -> str:
+    if human_readable:
+        return json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False)
+    return json.dumps(data, ensure_ascii=False)
+
+
+def write_json_data(
+    data: dict,
+    out_f: TextIO | LanguageRouter | SortedOutput,
+    human_readable: bool,
+) -> None:
+    if isinstance(out_f, LanguageRouter):
+        out_f = out_f.file_for(data)
     if out_f is not None:
-        if human_readable:
-            out_f.write(
-                json.dumps(data, indent=2, sort_keys=True, ensure_ascii=False)
-            )
+        write_json_text(data, json_text(data, human_readable), out_f)
+
+
+def write_json_text(
+    data: dict,
+    text: str,
+    out_f: TextIO | LanguageRouter | SortedOutput,
+) -> None:
+    """Writes the entry ``data`` serialized as ``text``.  Only the
+    ``ENTRY_KEY_FIELDS`` of ``data`` are used."""
+    if isinstance(out_f, LanguageRouter):
+        out_f = out_f.file_for(data)
+    if out_f is not None:
+        if isinstance(out_f, SortedOutput):
+            out_f.add(data, text + "\n")
         else:
-            out_f.write(json.dumps(data, ensure_ascii=False))
-        out_f.write("\n")
+            out_f.write(text)
+            out_f.write("\n")
 
 
 def estimate_progress(
@@ -754,11 +900,38 @@ def check_json_data(wxr: WiktextractContext, dt: dict) -> None:
         # template checking code above into a function
 
 
-def init_worker(wxr: WiktextractContext) -> None:
-    global worker_wxr
+def extract_namespace_ids(wxr: WiktextractContext) -> list[int]:
+    return list(
+        {
+            wxr.wtp.NAMESPACE_DATA.get(ns, {}).get("id", 0)  # type: ignore[call-overload]
+            for ns in wxr.config.extract_ns_names
+        }
+    )
+
+
+def track_titles(pages: Iterable[Page], titles: deque[str]) -> Iterator[Page]:
+    # `executor.map()` only returns the results, so the titles of the pages
+    # are kept in the same order
+    for page in pages:
+        titles.append(page.title)
+        yield page
+
+
+def init_worker(
+    wxr: WiktextractContext,
+    profiler: WorkerProfiler | None = None,
+    result_cache: ResultCache | None = None,
+) -> None:
+    global worker_wxr, worker_profiler
     worker_wxr = wxr
     worker_wxr.reconnect_databases()
     atexit.register(worker_wxr.remove_unpicklable_objects)
+    worker_profiler = profiler
+    enable_spans(wxr.page_timer is not None and wxr.page_timer.spans)
+    if worker_profiler is not None:
+        worker_profiler.start_worker()
+    if result_cache is not None:
+        result_cache.start_worker()
 
 
 def reprocess_wiktionary(
@@ -767,8 +940,47 @@ def reprocess_wiktionary(
     out_f: TextIO,
     human_readable: bool = False,
     search_pattern: str | None = None,
+    run_report_path: str | Path | None = None,
+    profiler: WorkerProfiler | None = None,
+    run_report_spans: bool = False,
+    checkpoint: Checkpoint | None = None,
+    resume: bool = False,
+    incremental: IncrementalExtraction | None = None,
+    shard: ShardExtraction | None = None,
+    router: LanguageRouter | None = None,
+    sorted_output: SortedOutput | None = None,
+    max_pages_per_worker: int | None = None,
+    max_worker_rss: int | None = None,
+    stream_dump_path: str | None = None,
+    page_selection: PageSelection | None = None,
+    result_cache: ResultCache | None = None,
 ) -> None:
-    """Reprocesses the Wiktionary from the sqlite db."""
+    """Reprocesses the Wiktionary from the sqlite db.  If
+    ``run_report_path`` is given, per-page and per-section timing statistics
+    are collected in the worker processes and written to that file as
+    JSON; ``run_report_spans`` adds the time spent in the spans of the
+    extraction code (see `WiktextractContext.span()`) to it.  If
+    ``profiler`` is given, the worker processes are profiled and the merged
+    statistics are available in ``profiler.stats`` after this returns.  If
+    ``checkpoint`` is given, progress is saved to it so that an interrupted
+    run can be continued with ``resume``; ``out_f`` must then be a regular
+    file, which is appended to when resuming.  If ``incremental`` is given,
+    only the pages that changed since the previous run are extracted and
+    the results are merged with the previous output.  If ``shard`` is
+    given, only the pages of that shard are extracted and its summary is
+    written for `merge_shards()`, which emits the thesaurus words.  If
+    ``router`` is given, the entries are written to its file of their
+    language instead of ``out_f``.  If ``sorted_output`` is given, the
+    entries are collected in it and written to ``out_f`` sorted by language
+    code, word and part of speech at the end.  The worker processes are
+    replaced after ``max_pages_per_worker`` pages or when their memory use
+    exceeds ``max_worker_rss`` megabytes, if given.  If
+    ``stream_dump_path`` is given, the pages are read from that dump file
+    instead of the database; see `dump_stream`.  If ``page_selection`` is
+    given, only the pages it selects are extracted; a ``search_pattern``
+    is selected with the page index, see `page_index`.  If
+    ``result_cache`` is given, the workers share the results of cached
+    functions through it, see `result_cache`."""
     logger.info("Second phase - processing pages")
 
     # Extract thesaurus data. This iterates over thesaurus pages,
@@ -780,51 +992,140 @@ def reprocess_wiktionary(
         extract_thesaurus_data(wxr, num_processes)
 
     emitted = set()
-    process_ns_ids: list[int] = list(
-        {
-            wxr.wtp.NAMESPACE_DATA.get(ns, {}).get("id", 0)  # type: ignore[call-overload]
-            for ns in wxr.config.extract_ns_names
-        }
-    )
+    skipped_pages = 0
+    if checkpoint is not None:
+        emitted = checkpoint.start(wxr, resume)
+        skipped_pages = checkpoint.pages_done
+    process_ns_ids = extract_namespace_ids(wxr)
+    if page_selection is None and search_pattern is not None:
+        page_selection = PageSelection(search_pattern)
+    if page_selection is not None:
+        num_selected_pages = page_selection.select(wxr, process_ns_ids)
     start_time = time.time()
     last_time = start_time
-    all_page_nums = wxr.wtp.saved_page_nums(
-        process_ns_ids, True, "wikitext", search_pattern
-    )
+    page_out_f: TextIO | LanguageRouter | SortedOutput = out_f
+    if router is not None:
+        page_out_f = router
+    elif sorted_output is not None:
+        page_out_f = sorted_output
+    if incremental is not None:
+        incremental.prepare(wxr)
+        all_page_nums = len(incremental.titles)
+        page_out_f = incremental.open_new_entries()
+    elif shard is not None:
+        shard.select(
+            wxr,
+            process_ns_ids,
+            page_selection.rowids if page_selection is not None else None,
+        )
+        all_page_nums = len(shard.titles) - skipped_pages
+    elif page_selection is not None:
+        all_page_nums = num_selected_pages - skipped_pages
+    elif stream_dump_path is not None:
+        all_page_nums = (
+            store_page_stubs(wxr, stream_dump_path, process_ns_ids)
+            - skipped_pages
+        )
+    else:
+        all_page_nums = (
+            wxr.wtp.saved_page_nums(process_ns_ids, True, "wikitext")
+            - skipped_pages
+        )
+    run_report = None
+    if run_report_path is not None:
+        run_report = RunReport()
+        wxr.page_timer = PageTimer(run_report_spans)
+    if profiler is not None:
+        profiler.start()
+    if result_cache is not None:
+        result_cache.start()
     wxr.remove_unpicklable_objects()
-    with ProcessPoolExecutor(
+    pool_args = dict(
         max_workers=num_processes,
         mp_context=get_context(
             "forkserver" if "forkserver" in get_all_start_methods() else "spawn"
         ),
         initializer=init_worker,
-        initargs=(deepcopy(wxr),),
-    ) as executor:
+        initargs=(deepcopy(wxr), profiler, result_cache),
+    )
+    if max_pages_per_worker is not None or max_worker_rss is not None:
+        executor = RecyclingPool(
+            **pool_args,  # type: ignore[arg-type]
+            max_pages=max_pages_per_worker,
+            max_rss_mb=max_worker_rss,
+        )
+    else:
+        executor = ProcessPoolExecutor(**pool_args)  # type: ignore[arg-type]
+    with executor:
         wxr.reconnect_databases()
-        for processed_pages, (page_data, wtp_stats) in enumerate(
+        if page_selection is not None:
+            pages = page_selection.pages(wxr)
+        elif stream_dump_path is not None:
+            pages = pages_from_dump(wxr, stream_dump_path, process_ns_ids)
+        else:
+            pages = wxr.wtp.get_all_pages(process_ns_ids, True, "wikitext")
+        if incremental is not None:
+            pages = incremental.pages(pages)
+        if shard is not None:
+            pages = shard.pages(pages)
+        if checkpoint is not None:
+            pages = checkpoint.pages(pages)
+        page_titles: deque[str] = deque()
+        for processed_pages, (entries, wtp_stats, page_stats) in enumerate(
             executor.map(
-                page_handler,
-                wxr.wtp.get_all_pages(
-                    process_ns_ids, True, "wikitext", search_pattern
+                functools.partial(
+                    serialized_page_handler, human_readable=human_readable
                 ),
+                track_titles(pages, page_titles),
                 chunksize=100,  # default is 1 too slow
             )
         ):
+            title = page_titles.popleft()
             wxr.config.merge_return(wtp_stats)
-            for dt in page_data:
-                check_json_data(wxr, dt)
-                write_json_data(dt, out_f, human_readable)
+            if run_report is not None and page_stats is not None:
+                run_report.add_page(page_stats)
+                wxr.config.merge_statistics(page_stats)
+            page_emitted = []
+            for dt, text in entries:
+                write_json_text(dt, text, page_out_f)
                 word = dt.get("word")
                 lang_code = dt.get("lang_code")
                 pos = dt.get("pos")
                 if word and lang_code and pos:
                     emitted.add((word, lang_code, pos))
+                    page_emitted.append((word, lang_code, pos))
+            if checkpoint is not None:
+                checkpoint.page_done(wxr, title, page_emitted)
+                checkpoint.save_if_due(out_f)
+            if incremental is not None:
+                incremental.page_done(title, [dt for dt, _ in entries])
             last_time = estimate_progress(
                 processed_pages, all_page_nums, start_time, last_time
             )
 
-    if wxr.config.dump_file_lang_code == "en":
-        emit_words_in_thesaurus(wxr, emitted, out_f, human_readable)
+    if profiler is not None:
+        profiler.collect()
+    if result_cache is not None:
+        result_cache_stats = result_cache.finish()
+        if run_report is not None:
+            run_report.result_cache = result_cache_stats
+    if incremental is not None:
+        page_out_f.close()  # type: ignore[union-attr]
+        incremental.merge(wxr, out_f, wxr.config.dump_file_lang_code == "en")
+    elif shard is not None:
+        shard.write_summary(wxr, emitted)
+    elif wxr.config.dump_file_lang_code == "en":
+        emit_words_in_thesaurus(wxr, emitted, page_out_f, human_readable)
+    if checkpoint is not None:
+        checkpoint.finish()
+    if router is not None:
+        router.close()
+    if sorted_output is not None:
+        sorted_output.finish(out_f)
+    if run_report is not None:
+        wxr.page_timer = None
+        run_report.write(wxr.config, run_report_path)  # type: ignore[arg-type]
+        logger.info(f"Run report written to {run_report_path}")
     logger.info("Reprocessing wiktionary complete")
 
 
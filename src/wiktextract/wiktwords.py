@@ -12,6 +12,7 @@ import argparse
 import collections
 import json
 import logging
+import multiprocessing
 import os
 import pstats
 import sys
@@ -24,7 +25,27 @@ from wikitextprocessor import Wtp
 from wikitextprocessor.dumpparser import analyze_and_overwrite_pages
 
 from .categories import extract_categories
+from .checkpoint import Checkpoint, CheckpointError
+from .compression import (
+    COMPRESSION_SUFFIXES,
+    compression_format,
+    open_output,
+)
 from .config import WiktionaryConfig
+from .incremental import IncrementalExtraction
+from .output_router import LanguageRouter
+from .page_index import PageSelection, build_page_index
+from .profiling import WorkerProfiler
+from .result_cache import ResultCache
+from .server import serve
+from .shards import (
+    ShardError,
+    ShardExtraction,
+    merge_shards,
+    parse_shard,
+    shard_summary_path,
+)
+from .sorted_output import SortedOutput
 from .template_override import template_override_fns
 from .thesaurus import (
     close_thesaurus_db,
@@ -99,7 +120,8 @@ def main():
         "--out",
         type=str,
         default=None,
-        help="Path where to write output (- for stdout)",
+        help="Path where to write output (- for stdout); compressed when it "
+        "ends with .gz, .bz2, .xz or .zst",
     )
     parser.add_argument(
         "--errors", type=str, help="File in which to save error information"
@@ -263,7 +285,185 @@ def main():
         "--profile",
         action="store_true",
         default=False,
-        help="Enable CPU time profiling",
+        help="Enable CPU time profiling of the main process and the worker "
+        "processes",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        default=None,
+        help="Save the merged profiling statistics in this pstats file "
+        "instead of printing them",
+    )
+    parser.add_argument(
+        "--profile-sample-rate",
+        type=float,
+        default=1.0,
+        help="Profile only this fraction of pages (0.0-1.0, the same pages "
+        "are selected in every run)",
+    )
+    parser.add_argument(
+        "--profile-titles",
+        type=str,
+        default=None,
+        help="Profile only the pages whose titles are listed in this file, "
+        "one title per line",
+    )
+    parser.add_argument(
+        "--run-report",
+        type=str,
+        default=None,
+        help="Write per-page and per-section timing statistics of the "
+        "extraction phase as JSON in this file",
+    )
+    parser.add_argument(
+        "--run-report-spans",
+        action="store_true",
+        default=False,
+        help="Also measure the time spent in parsing, template expansion, "
+        "cleaning, tag decoding and other stages of the extraction in the "
+        "run report (slows down extraction somewhat)",
+    )
+    parser.add_argument(
+        "--compression-threads",
+        type=int,
+        default=4,
+        help="Number of threads compressing the --out file when its name "
+        "ends with .gz, .bz2, .xz or .zst (default 4)",
+    )
+    parser.add_argument(
+        "--lang-out-dir",
+        type=str,
+        default=None,
+        metavar="DIR",
+        help="Write the entries of each language to DIR/<lang_code>.jsonl "
+        "instead of --out, and their numbers to DIR/counts.json",
+    )
+    parser.add_argument(
+        "--lang-out-compression",
+        type=str,
+        default=None,
+        choices=list(COMPRESSION_SUFFIXES.values()),
+        help="Compress the --lang-out-dir files in this format",
+    )
+    parser.add_argument(
+        "--max-open-files",
+        type=int,
+        default=64,
+        help="Maximum number of --lang-out-dir files kept open (default 64)",
+    )
+    parser.add_argument(
+        "--sorted-output",
+        action="store_true",
+        default=False,
+        help="Sort the output by language code, word and part of speech, "
+        "so that the outputs of two runs can be compared with diff",
+    )
+    parser.add_argument(
+        "--sort-memory",
+        type=int,
+        default=512,
+        metavar="MB",
+        help="With --sorted-output, sort runs of this many megabytes in "
+        "memory before spilling them to temporary files next to --out "
+        "(default 512)",
+    )
+    parser.add_argument(
+        "--max-pages-per-worker",
+        type=int,
+        default=None,
+        help="Replace each extraction worker process with a new one after "
+        "it has processed this many pages",
+    )
+    parser.add_argument(
+        "--max-worker-rss",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="Replace an extraction worker process with a new one when its "
+        "resident memory exceeds this many megabytes",
+    )
+    parser.add_argument(
+        "--stream-pages",
+        action="store_true",
+        default=False,
+        help="Only store templates, modules and other support pages and the "
+        "titles of the pages to extract in the database and read the pages "
+        "to extract from the dump file again in the extraction phase, "
+        "which needs much less disk space",
+    )
+    parser.add_argument(
+        "--result-cache",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Keep the results of tag decoding and description "
+        "classification in this SQLite file, shared by the worker processes "
+        "and reused by later runs until the tag tables change",
+    )
+    parser.add_argument(
+        "--serve",
+        type=str,
+        default=None,
+        metavar="ADDRESS",
+        help="Serve extraction requests of single pages over HTTP on "
+        "ADDRESS, which is HOST:PORT or the path of a Unix socket, with "
+        "--num-processes worker processes.  Override pages (--override) "
+        "are reloaded when they change",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Every N pages, save the progress of the extraction phase to "
+        ".checkpoint and .journal files next to the --out file, so that an "
+        "interrupted run can be continued with --resume (default 0, no "
+        "checkpoints)",
+    )
+    parser.add_argument(
+        "--incremental",
+        type=str,
+        default=None,
+        metavar="STATE_DB",
+        help="Only extract the pages that changed, or whose templates or "
+        "modules changed, since the previous run with the same state "
+        "database file, and merge them into the existing --out file.  The "
+        "entries of re-extracted pages are written after the unchanged "
+        "entries, so the order differs from a full run",
+    )
+    parser.add_argument(
+        "--delta",
+        type=str,
+        default=None,
+        help="With --incremental, write the added, changed and removed "
+        "entries to this JSONL file",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Continue an interrupted extraction from its last checkpoint, "
+        "appending to the output file.  Use the same options as in the "
+        "interrupted run",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        metavar="K/N",
+        help="Only extract the K-th of N parts of the pages, balanced by "
+        "page size, so that N machines can share the extraction phase.  "
+        "Combine the --out files of the shards with --merge-shards",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        type=str,
+        nargs="+",
+        default=None,
+        metavar="SHARD_OUT",
+        help="Combine the --out files of all shards of a --shard run into "
+        "the --out file, and merge their errors for --errors",
     )
     parser.add_argument(
         "--categories-file",
@@ -308,8 +508,38 @@ def main():
         "character. Example: '%%==English==%%', '%%==Anglo_Saxon==%%'; "
         "functions only with ready database file",
     )
+    parser.add_argument(
+        "--search-template",
+        type=str,
+        action="append",
+        default=None,
+        metavar="NAME",
+        help="Only extract the pages that use this template (can be "
+        "specified multiple times); functions only with ready database file",
+    )
+    parser.add_argument(
+        "--titles",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Only extract the pages whose titles are listed in this file, "
+        "one per line; functions only with ready database file",
+    )
+    parser.add_argument(
+        "--build-page-index",
+        action="store_true",
+        default=False,
+        help="Build the full-text index of the page bodies in the database, "
+        "which --search-pattern and --search-template use",
+    )
     args = parser.parse_args()
 
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        # The forkserver is started by the first process pool, so this must
+        # be set before any pool exists.  Worker processes are then forked
+        # from a server that has already imported the extraction code.
+        multiprocessing.set_forkserver_preload(["wiktextract.wiktionary"])
+
     if not args.quiet:
         logger.setLevel(logging.DEBUG)
 
@@ -364,14 +594,161 @@ def main():
 
     # Open output file.
     out_path = args.out
-    if not out_path and args.pages_dir:
+    checkpoint = None
+    incremental = None
+    if args.incremental is not None:
+        if (
+            not out_path
+            or out_path == "-"
+            or out_path.startswith("/dev/")
+            or args.human_readable
+            or args.resume
+        ):
+            logger.error(
+                "--incremental needs an --out file and can't be used with "
+                "--human-readable or --resume"
+            )
+            sys.exit(1)
+        incremental = IncrementalExtraction(
+            args.incremental, out_path, args.delta
+        )
+    if (args.shard is not None or args.merge_shards is not None) and (
+        not out_path
+        or out_path == "-"
+        or out_path.startswith("/dev/")
+        or args.incremental is not None
+    ):
+        logger.error(
+            "--shard and --merge-shards need an --out file and can't be used "
+            "with --incremental"
+        )
+        sys.exit(1)
+    if args.merge_shards is not None and (
+        args.path or args.page or args.shard is not None or args.resume
+    ):
+        logger.error(
+            "--merge-shards can't be used with a dump file, --page, --shard "
+            "or --resume"
+        )
+        sys.exit(1)
+    if args.serve is not None and (
+        not args.db_path or args.path or args.page or out_path
+    ):
+        logger.error(
+            "--serve needs --db-path and can't be used with a dump file, "
+            "--page or --out"
+        )
+        sys.exit(1)
+    if args.stream_pages and (
+        not args.path
+        or args.page
+        or args.search_pattern
+        or args.search_template
+        or args.titles
+        or args.incremental is not None
+        or args.shard is not None
+        or args.merge_shards is not None
+        or args.resume
+    ):
+        logger.error(
+            "--stream-pages needs a dump file and can't be used with --page, "
+            "--search-pattern, --search-template, --titles, --incremental, "
+            "--shard, --merge-shards or --resume"
+        )
+        sys.exit(1)
+    page_selection = None
+    if args.search_template or args.titles is not None:
+        if args.incremental is not None:
+            logger.error(
+                "--search-template and --titles can't be used with "
+                "--incremental"
+            )
+            sys.exit(1)
+        titles = None
+        if args.titles is not None:
+            with open(args.titles, encoding="utf-8") as f:
+                titles = [line.strip() for line in f if line.strip() != ""]
+        page_selection = PageSelection(
+            args.search_pattern, args.search_template, titles
+        )
+    result_cache = None
+    if args.result_cache is not None:
+        result_cache = ResultCache(args.result_cache)
+    router = None
+    if args.lang_out_dir is not None:
+        if (
+            out_path
+            or args.incremental is not None
+            or args.shard is not None
+            or args.merge_shards is not None
+            or args.resume
+        ):
+            logger.error(
+                "--lang-out-dir can't be used with --out, --incremental, "
+                "--shard, --merge-shards or --resume"
+            )
+            sys.exit(1)
+        router = LanguageRouter(
+            args.lang_out_dir,
+            args.lang_out_compression,
+            args.max_open_files,
+        )
+    shard = None
+    if args.shard is not None:
+        shard = ShardExtraction(*args.shard, shard_summary_path(out_path))
+    sorted_output = None
+    if args.sorted_output:
+        if (
+            router is not None
+            or args.incremental is not None
+            or args.shard is not None
+            or args.merge_shards is not None
+            or args.resume
+        ):
+            logger.error(
+                "--sorted-output can't be used with --lang-out-dir, "
+                "--incremental, --shard, --merge-shards or --resume"
+            )
+            sys.exit(1)
+        sorted_output = SortedOutput(
+            os.path.dirname(os.path.abspath(out_path))
+            if out_path and out_path != "-" and not out_path.startswith("/dev/")
+            else None,
+            args.sort_memory * 1024 * 1024,
+        )
+    if not out_path and (args.pages_dir or router is not None):
         out_f = None
     elif out_path and out_path != "-":
         if out_path.startswith("/dev/"):
             out_tmp_path = out_path
         else:
             out_tmp_path = out_path + ".tmp"
-        out_f = open(out_tmp_path, "w", buffering=1024 * 1024, encoding="utf-8")
+            if (
+                args.checkpoint_interval > 0
+                and incremental is None
+                and sorted_output is None
+            ):
+                checkpoint = Checkpoint(out_path, args.checkpoint_interval)
+        append = False
+        if args.resume:
+            if checkpoint is None:
+                logger.error(
+                    "--resume needs an output file and --checkpoint-interval"
+                )
+                sys.exit(1)
+            try:
+                checkpoint.load(args.dump_file_language_code)
+                checkpoint.truncate_output(out_tmp_path)
+            except CheckpointError as e:
+                logger.error(str(e))
+                sys.exit(1)
+            append = True
+        out_f = open_output(
+            out_tmp_path,
+            compression_format(out_path),
+            append,
+            args.compression_threads,
+        )
     else:
         out_tmp_path = out_path
         out_f = sys.stdout
@@ -423,6 +800,13 @@ def main():
 
         pr = cProfile.Profile()
         pr.enable()
+        profile_titles = None
+        if args.profile_titles:
+            with open(args.profile_titles, encoding="utf-8") as f:
+                profile_titles = [line.strip() for line in f if line.strip()]
+        profiler = WorkerProfiler(args.profile_sample_rate, profile_titles)
+    else:
+        profiler = None
 
     skip_extract_dump = wxr.wtp.saved_page_nums() > 0
     default_override_json_path = (
@@ -457,6 +841,19 @@ def main():
                 args.override,
                 skip_extract_dump,
                 args.pages_dir,
+                args.run_report,
+                profiler,
+                args.run_report_spans,
+                checkpoint,
+                args.resume,
+                incremental,
+                shard,
+                router,
+                sorted_output,
+                args.max_pages_per_worker,
+                args.max_worker_rss,
+                args.stream_pages,
+                result_cache,
             )
 
         if args.override is not None and args.path is None:
@@ -467,6 +864,9 @@ def main():
                 None,
             )
 
+        if args.build_page_index:
+            build_page_index(wxr.wtp.db_conn)
+
         if args.page and not args.skip_extraction:
             # Parse a single Wiktionary page (extracted using --pages-dir)
             if not args.db_path:
@@ -484,7 +884,28 @@ def main():
             # --errors with single page extraction
             wxr.config.merge_return(wxr.wtp.to_return())
 
-        if not args.path and not args.page and not args.skip_extraction:
+        if args.serve is not None:
+            serve(
+                wxr,
+                args.serve,
+                args.num_processes,
+                [Path(p) for p in args.override]
+                if args.override is not None
+                else None,
+            )
+        elif args.merge_shards is not None:
+            try:
+                merge_shards(
+                    wxr,
+                    args.merge_shards,
+                    out_f,
+                    args.human_readable,
+                    args.num_processes,
+                )
+            except ShardError as e:
+                logger.error(str(e))
+                sys.exit(1)
+        elif not args.path and not args.page and not args.skip_extraction:
             # Parse again from the db file
             reprocess_wiktionary(
                 wxr,
@@ -492,8 +913,24 @@ def main():
                 out_f,
                 args.human_readable,
                 search_pattern=args.search_pattern,
+                run_report_path=args.run_report,
+                profiler=profiler,
+                run_report_spans=args.run_report_spans,
+                checkpoint=checkpoint,
+                resume=args.resume,
+                incremental=incremental,
+                shard=shard,
+                router=router,
+                sorted_output=sorted_output,
+                max_pages_per_worker=args.max_pages_per_worker,
+                max_worker_rss=args.max_worker_rss,
+                page_selection=page_selection,
+                result_cache=result_cache,
             )
-
+    except CheckpointError as e:
+        # The pages differ from those of the interrupted run
+        logger.error(str(e))
+        sys.exit(1)
     finally:
         if out_path and out_path != "-" and out_f is not None:
             out_f.close()
@@ -514,8 +951,13 @@ def main():
 
     if args.profile:
         pr.disable()
-        ps = pstats.Stats(pr).sort_stats(pstats.SortKey.CUMULATIVE)
-        ps.print_stats()
+        ps = pstats.Stats(pr)
+        if profiler is not None and profiler.stats is not None:
+            ps.add(profiler.stats)
+        if args.profile_output:
+            ps.dump_stats(args.profile_output)
+        else:
+            ps.sort_stats(pstats.SortKey.CUMULATIVE).print_stats()
 
     if out_f is not None and out_path != out_tmp_path:
         try:
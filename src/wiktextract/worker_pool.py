@@ -0,0 +1,193 @@
+# Process pool for the second phase whose worker processes are replaced
+# after they have processed ``max_pages`` pages or when their resident
+# memory exceeds ``max_rss_mb`` megabytes.  Long-lived workers accumulate
+# memory in the Lua runtime, in caches and in a fragmented Python heap.
+# A worker checks the limits after each chunk of pages, sends the results
+# of the chunk and exits; the parent process then starts a new worker.  The
+# results are returned in the order of the input, like
+# `ProcessPoolExecutor.map()`.
+
+import os
+import queue
+import resource
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+from multiprocessing.context import BaseContext
+from traceback import format_exc
+from typing import Any, Callable, Iterable, Iterator
+
+from .wxr_logging import logger
+
+
+def current_rss_mb() -> float:
+    """Returns the resident memory of this process in megabytes."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Peak instead of current memory, in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def worker_main(
+    task_queue: Any,
+    result_queue: Any,
+    initializer: Callable | None,
+    initargs: tuple,
+    max_pages: int | None,
+    max_rss_mb: float | None,
+) -> None:
+    if initializer is not None:
+        initializer(*initargs)
+    pid = os.getpid()
+    num_pages = 0
+    while (task := task_queue.get()) is not None:
+        chunk_id, fn, items = task
+        try:
+            results = [fn(item) for item in items]
+        except Exception:
+            # The exception might not be picklable
+            result_queue.put((chunk_id, pid, None, format_exc(), None))
+            return
+        num_pages += len(items)
+        reason = None
+        if max_pages is not None and num_pages >= max_pages:
+            reason = "pages"
+        elif max_rss_mb is not None and current_rss_mb() >= max_rss_mb:
+            reason = "rss"
+        result_queue.put((chunk_id, pid, results, None, reason))
+        if reason is not None:
+            return
+
+
+class RecyclingPool:
+    """Pool of ``max_workers`` processes with the same interface as
+    `ProcessPoolExecutor` for `map()`."""
+
+    __slots__ = (
+        "max_workers",
+        "mp_context",
+        "initializer",
+        "initargs",
+        "max_pages",
+        "max_rss_mb",
+        "task_queue",
+        "result_queue",
+        "workers",
+        "num_pages",
+        "recycled",
+    )
+
+    def __init__(
+        self,
+        max_workers: int | None,
+        mp_context: BaseContext,
+        initializer: Callable | None = None,
+        initargs: tuple = (),
+        max_pages: int | None = None,
+        max_rss_mb: float | None = None,
+    ) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.mp_context = mp_context
+        self.initializer = initializer
+        self.initargs = initargs
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.task_queue = mp_context.Queue()
+        self.result_queue = mp_context.Queue()
+        self.workers: dict[int, Any] = {}
+        self.num_pages = 0
+        # Number of replaced workers by the limit they reached
+        self.recycled = {"pages": 0, "rss": 0}
+        for _ in range(self.max_workers):
+            self.start_worker()
+
+    def __enter__(self) -> "RecyclingPool":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.shutdown(exc_type is None)
+
+    def start_worker(self) -> None:
+        process = self.mp_context.Process(  # type: ignore[attr-defined]
+            target=worker_main,
+            args=(
+                self.task_queue,
+                self.result_queue,
+                self.initializer,
+                self.initargs,
+                self.max_pages,
+                self.max_rss_mb,
+            ),
+        )
+        process.start()
+        self.workers[process.pid] = process
+
+    def get_result(self) -> tuple:
+        while True:
+            try:
+                return self.result_queue.get(timeout=1)
+            except queue.Empty:
+                for process in self.workers.values():
+                    # Replaced workers exit with 0 after sending their
+                    # results
+                    if process.exitcode not in (None, 0):
+                        raise BrokenProcessPool(
+                            f"Worker process {process.pid} exited with "
+                            f"code {process.exitcode}"
+                        )
+
+    def map(
+        self, fn: Callable, iterable: Iterable, chunksize: int = 1
+    ) -> Iterator:
+        items = iter(iterable)
+        chunks = enumerate(iter(lambda: list(islice(items, chunksize)), []))
+        finished: dict[int, list] = {}
+        next_chunk_id = 0
+        in_flight = 0
+        # Two chunks per worker keep the workers busy while the results
+        # are being handled
+        for chunk_id, chunk in islice(chunks, 2 * self.max_workers):
+            self.task_queue.put((chunk_id, fn, chunk))
+            in_flight += 1
+        while in_flight > 0:
+            chunk_id, pid, results, error, reason = self.get_result()
+            in_flight -= 1
+            if error is not None:
+                raise RuntimeError(f"Exception in worker process:\n{error}")
+            self.num_pages += len(results)
+            if reason is not None:
+                self.workers.pop(pid).join()
+                self.recycled[reason] += 1
+                self.start_worker()
+            finished[chunk_id] = results
+            for new_chunk_id, chunk in islice(chunks, 1):
+                self.task_queue.put((new_chunk_id, fn, chunk))
+                in_flight += 1
+            while next_chunk_id in finished:
+                yield from finished.pop(next_chunk_id)
+                next_chunk_id += 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        for process in self.workers.values():
+            if wait:
+                self.task_queue.put(None)
+            else:
+                process.terminate()
+        for process in self.workers.values():
+            process.join()
+        self.workers.clear()
+        num_recycled = sum(self.recycled.values())
+        logger.info(
+            f"Recycled {num_recycled} worker processes "
+            f"({self.recycled['pages']} after {self.max_pages} pages, "
+            f"{self.recycled['rss']} over {self.max_rss_mb} MB), "
+            + (
+                f"one per {self.num_pages / num_recycled:.0f} pages"
+                if num_recycled > 0
+                else f"in {self.num_pages} pages"
+            )
+        )
@@ -1,10 +1,13 @@
 # Wiktextract context object
 import re
 import sqlite3
+from contextlib import AbstractContextManager
 
 from wikitextprocessor import Wtp
 
+from . import run_report
 from .config import WiktionaryConfig
+from .run_report import NULL_SPAN, PageTimer
 
 
 class WiktextractContext:
@@ -16,6 +19,7 @@ class WiktextractContext:
         "pos",
         "thesaurus_db_path",
         "thesaurus_db_conn",
+        "page_timer",
     )
 
     def __init__(self, wtp: Wtp, config: WiktionaryConfig):
@@ -26,6 +30,8 @@ class WiktextractContext:
         self.lang = None
         self.word = None
         self.pos = None
+        # Set to a `PageTimer` to collect timing statistics for the run report
+        self.page_timer: PageTimer | None = None
         self.thesaurus_db_path = wtp.db_path.with_stem(  # type: ignore[union-attr]
             f"{wtp.db_path.stem}_thesaurus"  # type: ignore[union-attr]
         )
@@ -39,6 +45,28 @@ class WiktextractContext:
                 config.linktrailing_regex_pattern
             )
 
+    def start_section(self, title: str | None) -> None:
+        """Starts a new language section; use this instead of calling
+        `Wtp.start_section()` directly so that the time spent in the section
+        is counted in the run report."""
+        self.wtp.start_section(title)
+        if self.page_timer is not None:
+            self.page_timer.switch(title, None)
+
+    def start_subsection(self, title: str | None) -> None:
+        self.wtp.start_subsection(title)
+        if self.page_timer is not None:
+            self.page_timer.switch(self.page_timer.section, title)
+
+    def span(self, name: str) -> AbstractContextManager:
+        """Returns a context manager that measures the time spent in the
+        enclosed code under ``name`` for the run report, e.g.
+        ``with wxr.span("parse"): ...``.  This does next to nothing unless
+        span timing is enabled."""
+        if run_report.span_timer is None:
+            return NULL_SPAN
+        return run_report.span_timer.span(name)
+
     def reconnect_databases(self, check_same_thread: bool = True) -> None:
         # `multiprocessing.pool.Pool.imap()` runs in another thread, if the db
         # connection is used to create iterable data for `imap`,
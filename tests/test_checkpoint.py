@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from wikitextprocessor import Page, Wtp
+
+from wiktextract.checkpoint import Checkpoint, CheckpointError
+from wiktextract.config import WiktionaryConfig
+from wiktextract.wxr_context import WiktextractContext
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.out_path = Path(self.tmp_dir.name) / "out.jsonl"
+        self.pages = [
+            Page(title=title, namespace_id=0, body="")
+            for title in ("a", "b", "c")
+        ]
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def new_wxr(self) -> WiktextractContext:
+        wxr = WiktextractContext(Wtp(), WiktionaryConfig())
+        self.addCleanup(wxr.wtp.close_db_conn)
+        return wxr
+
+    def interrupted_run(self) -> None:
+        # Processes two pages, saves a checkpoint after the first one
+        wxr = self.new_wxr()
+        wxr.config.warnings.append({"msg": "thesaurus"})
+        checkpoint = Checkpoint(self.out_path, interval=1)
+        self.assertEqual(checkpoint.start(wxr, False), set())
+        pages = checkpoint.pages(self.pages)
+        with open(self.out_path, "w", encoding="utf-8") as out_f:
+            next(pages)
+            out_f.write('{"word": "a"}\n')
+            wxr.config.errors.append({"msg": "error in a"})
+            checkpoint.page_done(wxr, "a", [("a", "en", "noun")])
+            checkpoint.save_if_due(out_f)
+            next(pages)
+            out_f.write('{"word": "b"}\n')
+            wxr.config.errors.append({"msg": "error in b"})
+            checkpoint.page_done(wxr, "b", [("b", "en", "noun")])
+        # interrupted before the next checkpoint
+        checkpoint.journal_f.close()
+
+    def test_resume(self):
+        self.interrupted_run()
+        wxr = self.new_wxr()
+        checkpoint = Checkpoint(self.out_path)
+        checkpoint.load("en")
+        checkpoint.truncate_output(self.out_path)
+        self.assertEqual(
+            self.out_path.read_text(encoding="utf-8"), '{"word": "a"}\n'
+        )
+        emitted = checkpoint.start(wxr, True)
+        self.assertEqual(emitted, {("a", "en", "noun")})
+        self.assertEqual(wxr.config.warnings, [{"msg": "thesaurus"}])
+        self.assertEqual(wxr.config.errors, [{"msg": "error in a"}])
+        self.assertEqual(
+            [page.title for page in checkpoint.pages(self.pages)], ["b", "c"]
+        )
+        checkpoint.finish()
+        self.assertFalse(checkpoint.state_path.exists())
+        self.assertFalse(checkpoint.journal_path.exists())
+
+    def test_resume_errors_before_pages(self):
+        # Errors from before the first page are restored from the journal,
+        # also if the resumed run reports them again
+        self.interrupted_run()
+        wxr = self.new_wxr()
+        wxr.config.warnings.append({"msg": "thesaurus"})
+        checkpoint = Checkpoint(self.out_path)
+        checkpoint.load("en")
+        checkpoint.start(wxr, True)
+        self.assertEqual(wxr.config.warnings, [{"msg": "thesaurus"}])
+        self.assertEqual(wxr.config.errors, [{"msg": "error in a"}])
+        checkpoint.finish()
+
+    def test_changed_pages(self):
+        self.interrupted_run()
+        checkpoint = Checkpoint(self.out_path)
+        checkpoint.load("en")
+        with self.assertRaises(CheckpointError):
+            list(checkpoint.pages(self.pages[1:]))
+
+    def test_wrong_edition(self):
+        self.interrupted_run()
+        with self.assertRaises(CheckpointError):
+            Checkpoint(self.out_path).load("fr")
+
+    def test_no_checkpoint(self):
+        with self.assertRaises(CheckpointError):
+            Checkpoint(self.out_path).load("en")
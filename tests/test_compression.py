@@ -0,0 +1,58 @@
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from wiktextract.compression import (
+    BlockCompressedWriter,
+    block_compressor,
+    compression_format,
+    open_input,
+    open_output,
+)
+
+
+class TestCompression(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.lines = [f'{{"word": "word{i}"}}\n' for i in range(1000)]
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def test_compression_format(self):
+        self.assertEqual(compression_format("out.jsonl.gz"), "gzip")
+        self.assertEqual(compression_format("out.jsonl.XZ"), "xz")
+        self.assertIsNone(compression_format("out.jsonl"))
+
+    def write_blocks(self, path: Path, compression: str) -> None:
+        # Small blocks, so that the output has many compressed streams
+        writer = BlockCompressedWriter(
+            open(path, "wb"), block_compressor(compression), 2, 100
+        )
+        with io.TextIOWrapper(writer, encoding="utf-8") as f:
+            f.writelines(self.lines)
+
+    def test_formats(self):
+        for suffix in (".gz", ".bz2", ".xz"):
+            with self.subTest(suffix=suffix):
+                path = Path(self.tmp_dir.name) / f"out.jsonl{suffix}"
+                self.write_blocks(path, compression_format(path))
+                with open_input(path) as f:
+                    self.assertEqual(f.readlines(), self.lines)
+
+    def test_truncate_and_append(self):
+        # Truncating to the size after a flush and appending, like when
+        # resuming from a checkpoint
+        path = Path(self.tmp_dir.name) / "out.jsonl.gz"
+        with open_output(path, "gzip") as f:
+            f.writelines(self.lines[:500])
+            f.flush()
+            size = os.fstat(f.fileno()).st_size
+            f.write('{"word": "lost"}\n')
+        os.truncate(path, size)
+        with open_output(path, "gzip", append=True) as f:
+            f.writelines(self.lines[500:])
+        with open_input(path) as f:
+            self.assertEqual(f.readlines(), self.lines)
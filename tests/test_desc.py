@@ -3,7 +3,7 @@ import unittest
 from wikitextprocessor import Wtp
 
 from wiktextract.config import WiktionaryConfig
-from wiktextract.datautils import split_at_comma_semi
+from wiktextract.datautils import comma_semi_splitter, split_at_comma_semi
 from wiktextract.thesaurus import close_thesaurus_db
 from wiktextract.wxr_context import WiktextractContext
 
@@ -82,3 +82,14 @@ class DescTests(unittest.TestCase):
         self.assertEqual(split_at_comma_semi("foo (bar\nzappa)",
                                              extra=[r"\n"]),
                          ["foo (bar\nzappa)"])
+
+    def test_comma_semi15(self):
+        self.assertEqual(split_at_comma_semi("Hunde, die bellen, beißen "
+                                             "nicht, dogs",
+                                             skipped=["Hunde, die bellen, "
+                                                      "beißen nicht"]),
+                         ["Hunde, die bellen, beißen nicht", "dogs"])
+
+    def test_comma_semi_splitter_cached(self):
+        self.assertIs(comma_semi_splitter((",", " or ")),
+                      comma_semi_splitter((",", " or ")))
@@ -0,0 +1,126 @@
+import bz2
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from wikitextprocessor import Wtp
+
+from wiktextract.config import WiktionaryConfig
+from wiktextract.dump_stream import (
+    iter_dump_pages,
+    pages_from_dump,
+    store_page_stubs,
+)
+from wiktextract.wxr_context import WiktextractContext
+
+DUMP = """<mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">
+  <siteinfo><sitename>Wiktionary</sitename></siteinfo>
+  <page>
+    <title>dog</title>
+    <ns>0</ns>
+    <revision><model>wikitext</model><text>==English==</text></revision>
+  </page>
+  <page>
+    <title>Template:l</title>
+    <ns>10</ns>
+    <revision><model>wikitext</model><text>{{{2}}}</text></revision>
+  </page>
+  <page>
+    <title>doggy</title>
+    <ns>0</ns>
+    <redirect title="dog" />
+    <revision><model>wikitext</model><text>#REDIRECT [[dog]]</text></revision>
+  </page>
+  <page>
+    <title>data.json</title>
+    <ns>0</ns>
+    <revision><model>json</model><text>{}</text></revision>
+  </page>
+  <page>
+    <title>dog/translations</title>
+    <ns>0</ns>
+    <revision><model>wikitext</model><text>====Translations====</text></revision>
+  </page>
+</mediawiki>
+"""
+
+
+class TestDumpStream(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = TemporaryDirectory()
+        self.dump_path = Path(self.tmp_dir.name) / "pages-articles.xml"
+        self.dump_path.write_text(DUMP, encoding="utf-8")
+        self.contexts: list[WiktextractContext] = []
+
+    def tearDown(self) -> None:
+        for wxr in self.contexts:
+            wxr.wtp.close_db_conn()
+        self.tmp_dir.cleanup()
+
+    def create_context(self) -> WiktextractContext:
+        wxr = WiktextractContext(
+            Wtp(db_path=Path(self.tmp_dir.name) / f"{len(self.contexts)}.db"),
+            WiktionaryConfig(),
+        )
+        self.contexts.append(wxr)
+        return wxr
+
+    def test_main_pages(self):
+        pages = list(iter_dump_pages(str(self.dump_path), {0}))
+        self.assertEqual(
+            [page.title for page in pages], ["dog", "doggy", "dog/translations"]
+        )
+        self.assertEqual(pages[0].body, "==English==")
+        self.assertIsNone(pages[0].redirect_to)
+        self.assertEqual(pages[1].redirect_to, "dog")
+        self.assertIsNone(pages[1].body)
+
+    def test_bz2(self):
+        bz2_path = self.dump_path.with_suffix(".xml.bz2")
+        bz2_path.write_bytes(bz2.compress(self.dump_path.read_bytes()))
+        pages = list(iter_dump_pages(str(bz2_path), [0, 10]))
+        self.assertEqual(
+            [(page.title, page.namespace_id) for page in pages],
+            [
+                ("dog", 0),
+                ("Template:l", 10),
+                ("doggy", 0),
+                ("dog/translations", 0),
+            ],
+        )
+
+    def test_page_stubs(self):
+        # Without --stream-pages, all pages are stored in the first phase
+        full = self.create_context()
+        for page in iter_dump_pages(str(self.dump_path), [0]):
+            full.wtp.add_page(
+                page.title,
+                page.namespace_id,
+                body=page.body,
+                redirect_to=page.redirect_to,
+                model=page.model,
+            )
+        streamed = self.create_context()
+        self.assertEqual(
+            store_page_stubs(streamed, str(self.dump_path), [0]), 3
+        )
+        for title in ("dog", "doggy", "dog/translations", "cat"):
+            with self.subTest(title=title):
+                self.assertEqual(
+                    streamed.wtp.page_exists(title), full.wtp.page_exists(title)
+                )
+        self.assertEqual(
+            streamed.wtp.get_page_body("dog/translations", 0),
+            "====Translations====",
+        )
+        self.assertEqual(
+            [
+                (page.title, page.body, page.redirect_to)
+                for page in pages_from_dump(streamed, str(self.dump_path), [0])
+            ],
+            [
+                ("dog", "==English==", None),
+                ("doggy", None, "dog"),
+                ("dog/translations", "====Translations====", None),
+            ],
+        )
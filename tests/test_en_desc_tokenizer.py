@@ -0,0 +1,39 @@
+import unittest
+
+from nltk import TweetTokenizer
+
+from wiktextract.extractor.en.desc_tokenizer import tokenize_desc
+
+
+class DescTokenizerTests(unittest.TestCase):
+    def test_tokens(self):
+        self.assertEqual(
+            tokenize_desc("colloquial, U.S., dialectal (rare)"),
+            ["colloquial", ",", "U", ".", "S", ".", ",", "dialectal"]
+            + ["(", "rare", ")"],
+        )
+        self.assertEqual(
+            tokenize_desc("one's self-esteem..."),
+            ["one's", "self-esteem", "..."],
+        )
+
+    def test_same_as_tweet_tokenizer(self):
+        tokenizer = TweetTokenizer()
+        for desc in [
+            "third-person singular simple present",
+            "Don't do that!!!!",
+            "slang, 1990s-2000s",
+            "1/2 fl.oz of water",
+            "(foo 8) bar)",
+            "(bar): baz",
+            ":-) and <3",
+            "H₂O, tso⁴ and ①",
+            "salt &amp; pepper &#8212; &bogus;",
+            "see example.com or https://example.com/a_(b)",
+            "call +1 555-123-4567",
+            "#hashtag @user a@b.org",
+            "--> <--",
+            "“quoted” ‘words’ ―",
+        ]:
+            with self.subTest(desc=desc):
+                self.assertEqual(tokenize_desc(desc), tokenizer.tokenize(desc))
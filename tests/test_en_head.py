@@ -7,7 +7,10 @@ import unittest
 from wikitextprocessor import Wtp
 
 from wiktextract.config import WiktionaryConfig
-from wiktextract.extractor.en.form_descriptions import parse_word_head
+from wiktextract.extractor.en.form_descriptions import (
+    HeadWordTokenizer,
+    parse_word_head,
+)
 from wiktextract.extractor.en.page import parse_language, parse_page
 from wiktextract.thesaurus import close_thesaurus_db
 from wiktextract.wxr_context import WiktextractContext
@@ -1522,3 +1525,14 @@ class HeadTests(unittest.TestCase):
                 }
             ],
         )
+
+    def test_head_word_tokenizer(self):
+        tokenizer = HeadWordTokenizer(["New York", "New York City", "(s)"])
+        self.assertEqual(
+            tokenizer.words("New York City (plural New York Cities)"),
+            ["New York City", "(plural New York Cities)"],
+        )
+        self.assertEqual(
+            tokenizer.words("New York, New Yorker, a(s)"),
+            ["New York", "New", "Yorker", "a", "(s)"],
+        )
@@ -0,0 +1,152 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from wikitextprocessor import Wtp
+
+from wiktextract.config import WiktionaryConfig
+from wiktextract.incremental import DependencyFinder, IncrementalExtraction
+from wiktextract.wxr_context import WiktextractContext
+
+
+class TestIncremental(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self) -> None:
+        self.wxr = WiktextractContext(Wtp(), WiktionaryConfig())
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmp_dir.name) / "state.db"
+        self.out_path = Path(self.tmp_dir.name) / "out.jsonl"
+        self.delta_path = Path(self.tmp_dir.name) / "delta.jsonl"
+
+    def tearDown(self) -> None:
+        self.wxr.wtp.close_db_conn()
+        self.tmp_dir.cleanup()
+
+    def test_wikitext_dependencies(self):
+        finder = DependencyFinder(self.wxr)
+        self.assertEqual(
+            finder.wikitext_dependencies(
+                "{{en-noun|s}} {{#invoke:links|f}} {{lc:X}} {{#if:a|b}} "
+                "{{Template:en_verb}} {{:dog}}"
+            ),
+            {"Template:en-noun", "Module:links", "Template:en verb", "dog"},
+        )
+
+    def test_lua_dependencies(self):
+        finder = DependencyFinder(self.wxr)
+        self.assertEqual(
+            finder.lua_dependencies(
+                'local m = require("Module:languages")\n'
+                "local d = mw.loadData('Module:languages/data/' .. c)\n"
+                'local s = require("strict")'
+            ),
+            ({"Module:languages"}, {"Module:languages/data/"}),
+        )
+
+    def run_extraction(self, entries: dict[str, list[dict]]) -> set[str]:
+        # Runs one extraction with the given entries of each page and
+        # returns the titles of the extracted pages
+        incremental = IncrementalExtraction(
+            self.state_path, self.out_path, self.delta_path
+        )
+        incremental.prepare(self.wxr)
+        titles = set(incremental.titles)
+        with incremental.open_new_entries() as f:
+            for title in sorted(titles):
+                for data in entries[title]:
+                    f.write(json.dumps(data) + "\n")
+                incremental.page_done(title, entries[title])
+        out_f = io.StringIO()
+        incremental.merge(self.wxr, out_f, False)
+        self.out_path.write_text(out_f.getvalue(), encoding="utf-8")
+        return titles
+
+    def test_incremental_extraction(self):
+        wtp = self.wxr.wtp
+        wtp.add_page("Template:t", 10, body="t")
+        wtp.add_page("Template:u", 10, body="{{t}}")
+        wtp.add_page("Module:m", 828, body="return {}")
+        wtp.add_page("a", 0, body="{{u}}")
+        wtp.add_page("b", 0, body="b")
+        wtp.add_page("c", 0, body="{{#invoke:m|f}}")
+        entries = {
+            title: [{"word": title, "lang_code": "en", "pos": "noun"}]
+            for title in "abc"
+        }
+        self.assertEqual(self.run_extraction(entries), {"a", "b", "c"})
+        self.assertEqual(self.run_extraction(entries), set())
+
+        # Template:u uses the changed Template:t
+        wtp.add_page("Template:t", 10, body="changed")
+        entries["a"] = [
+            {"word": "a", "lang_code": "en", "pos": "noun", "senses": []}
+        ]
+        self.assertEqual(self.run_extraction(entries), {"a"})
+        output = [
+            json.loads(line)
+            for line in self.out_path.read_text(encoding="utf-8").splitlines()
+        ]
+        self.assertEqual(
+            sorted(output, key=lambda data: data["word"]),
+            entries["a"] + entries["b"] + entries["c"],
+        )
+        delta = [
+            json.loads(line)
+            for line in self.delta_path.read_text(encoding="utf-8").splitlines()
+        ]
+        self.assertEqual(
+            delta,
+            [
+                {
+                    "change": "changed",
+                    "word": "a",
+                    "lang_code": "en",
+                    "pos": "noun",
+                    "entries": entries["a"],
+                }
+            ],
+        )
+
+    def test_changed_subpage(self):
+        wtp = self.wxr.wtp
+        wtp.add_page("dog", 0, body="{{see translation subpage}}")
+        wtp.add_page("dog/translations", 0, body="* French: chien")
+        wtp.add_page("cat", 0, body="cat")
+        wtp.add_page("doggy", 0, body="{{:dog}}")
+        entries = {
+            title: [{"word": title, "lang_code": "en", "pos": "noun"}]
+            for title in ("dog", "cat", "doggy")
+        }
+        entries["dog/translations"] = []
+        self.assertEqual(
+            self.run_extraction(entries),
+            {"dog", "dog/translations", "cat", "doggy"},
+        )
+        # The translations of "dog" are read from its subpage, and "doggy"
+        # transcludes "dog"
+        wtp.add_page("dog/translations", 0, body="* French: chien, clebs")
+        self.assertEqual(
+            self.run_extraction(entries), {"dog", "dog/translations", "doggy"}
+        )
+        wtp.add_page("doggy", 0, body="doggy")
+        self.assertEqual(self.run_extraction(entries), {"doggy"})
+
+    def test_source_change(self):
+        # A change in the wiktextract code extracts all pages again, even
+        # if the version number is the same
+        self.wxr.wtp.add_page("a", 0, body="a")
+        self.wxr.wtp.add_page("b", 0, body="b")
+        entries = {
+            title: [{"word": title, "lang_code": "en", "pos": "noun"}]
+            for title in "ab"
+        }
+        self.assertEqual(self.run_extraction(entries), {"a", "b"})
+        self.assertEqual(self.run_extraction(entries), set())
+        with patch(
+            "wiktextract.incremental.source_hash", return_value="changed"
+        ):
+            self.assertEqual(self.run_extraction(entries), {"a", "b"})
@@ -0,0 +1,53 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from wiktextract.compression import open_input
+from wiktextract.output_router import LanguageRouter
+from wiktextract.wiktionary import write_json_data
+
+
+class TestOutputRouter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.out_dir = Path(self.tmp_dir.name) / "out"
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def read(self, path: Path) -> list[str]:
+        with open_input(path) as f:
+            return [json.loads(line)["word"] for line in f]
+
+    def write_entries(self, router: LanguageRouter) -> None:
+        for word, lang_code in (
+            ("a", "en"),
+            ("b", "fr"),
+            ("c", "de"),
+            ("d", "en"),
+            ("e", "fr"),
+        ):
+            write_json_data(
+                {"word": word, "lang_code": lang_code}, router, False
+            )
+        router.close()
+
+    def test_router(self):
+        # Only two files open at once, so "en" is reopened for "d"
+        router = LanguageRouter(self.out_dir, max_open_files=2)
+        self.write_entries(router)
+        self.assertEqual(self.read(self.out_dir / "en.jsonl"), ["a", "d"])
+        self.assertEqual(self.read(self.out_dir / "fr.jsonl"), ["b", "e"])
+        self.assertEqual(self.read(self.out_dir / "de.jsonl"), ["c"])
+        self.assertEqual(
+            json.loads((self.out_dir / "counts.json").read_text()),
+            {"de": 1, "en": 2, "fr": 2},
+        )
+        self.assertEqual(list(self.out_dir.glob("*.tmp")), [])
+
+    def test_compressed(self):
+        router = LanguageRouter(self.out_dir, "gzip", max_open_files=1)
+        self.write_entries(router)
+        self.assertEqual(self.read(self.out_dir / "en.jsonl.gz"), ["a", "d"])
+        self.assertEqual(self.read(self.out_dir / "fr.jsonl.gz"), ["b", "e"])
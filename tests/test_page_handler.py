@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch
+
+from wikitextprocessor import Page, Wtp
+
+from wiktextract import wiktionary
+from wiktextract.config import WiktionaryConfig
+from wiktextract.thesaurus import close_thesaurus_db
+from wiktextract.wiktionary import serialized_page_handler
+from wiktextract.wxr_context import WiktextractContext
+
+
+class TestSerializedPageHandler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.wxr = WiktextractContext(Wtp(), WiktionaryConfig())
+        # The global is only set in worker processes by init_worker()
+        worker_wxr_patcher = patch.object(
+            wiktionary, "worker_wxr", self.wxr, create=True
+        )
+        worker_wxr_patcher.start()
+        self.addCleanup(worker_wxr_patcher.stop)
+
+    def tearDown(self) -> None:
+        self.wxr.wtp.close_db_conn()
+        close_thesaurus_db(
+            self.wxr.thesaurus_db_path, self.wxr.thesaurus_db_conn
+        )
+
+    def test_redirect(self):
+        entries, _, _ = serialized_page_handler(
+            Page(title="foo", namespace_id=0, redirect_to="bar")
+        )
+        self.assertEqual(
+            entries,
+            [
+                (
+                    {"title": "foo", "pos": "hard-redirect"},
+                    '{"title": "foo", "redirect": "bar", '
+                    '"pos": "hard-redirect"}',
+                )
+            ],
+        )
+
+    @patch(
+        "wiktextract.wiktionary.parse_page",
+        return_value=[{"word": "été", "lang": "French"}],
+    )
+    def test_check_json_data(self, _):
+        entries, ret, _ = serialized_page_handler(
+            Page(title="été", namespace_id=0, body=""), human_readable=True
+        )
+        self.assertEqual(
+            entries,
+            [
+                (
+                    {"word": "été"},
+                    '{\n  "lang": "French",\n  "word": "été"\n}',
+                )
+            ],
+        )
+        self.assertEqual(
+            [data["msg"] for data in ret["debugs"]],
+            ['été/French: missing "pos" field in data'],
+        )
+        # Only returned, not kept in the worker
+        self.assertEqual(self.wxr.config.debugs, [])
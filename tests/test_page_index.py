@@ -0,0 +1,82 @@
+import unittest
+
+from wikitextprocessor import Wtp
+
+from wiktextract.config import WiktionaryConfig
+from wiktextract.page_index import (
+    PageSelection,
+    build_page_index,
+    has_page_index,
+)
+from wiktextract.wxr_context import WiktextractContext
+
+
+class TestPageIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.wxr = WiktextractContext(Wtp(), WiktionaryConfig())
+        for title, body in [
+            ("dog", "==English==\n{{en-noun}}"),
+            ("chien", "==French==\n{{fr-noun|m}}"),
+            ("aimer", "==French==\n{{fr-conj-1|aim}}"),
+            ("parler", "==French==\n{{ fr-conj-1 |parl}}"),
+            ("conj", "==English==\nfr-conj-1 is a template"),
+        ]:
+            self.wxr.wtp.add_page(title, 0, body)
+        self.wxr.wtp.add_page("doggy", 0, redirect_to="dog")
+        self.wxr.wtp.add_page("Template:fr-conj-1", 10, "{{{1}}}er")
+        self.wxr.wtp.db_conn.commit()
+
+    def tearDown(self) -> None:
+        self.wxr.wtp.close_db_conn()
+
+    def selected_titles(self, selection: PageSelection) -> list[str]:
+        num_pages = selection.select(self.wxr, [0])
+        titles = [page.title for page in selection.pages(self.wxr)]
+        self.assertEqual(num_pages, len(titles))
+        return titles
+
+    def test_search_pattern(self):
+        self.assertEqual(
+            self.selected_titles(PageSelection("%==French==%")),
+            ["aimer", "chien", "parler"],
+        )
+        self.assertTrue(has_page_index(self.wxr.wtp.db_conn))
+
+    def test_templates(self):
+        self.assertEqual(
+            self.selected_titles(PageSelection(templates=["fr-conj-1"])),
+            ["aimer", "parler"],
+        )
+        self.assertEqual(
+            self.selected_titles(
+                PageSelection(templates=["Template:en-noun", "fr-noun"])
+            ),
+            ["chien", "dog"],
+        )
+
+    def test_titles(self):
+        self.assertEqual(
+            self.selected_titles(
+                PageSelection(titles=["doggy", "dog", "Template:fr-conj-1"])
+            ),
+            ["dog", "doggy"],
+        )
+        self.assertEqual(
+            self.selected_titles(
+                PageSelection("%English%", titles=["dog", "doggy", "aimer"])
+            ),
+            ["dog"],
+        )
+
+    def test_index_updated(self):
+        self.assertTrue(build_page_index(self.wxr.wtp.db_conn))
+        self.wxr.wtp.add_page("chien", 0, "==Dutch==\n{{nl-noun}}")
+        self.wxr.wtp.add_page("hond", 0, "==Dutch==\n{{nl-noun}}")
+        self.assertEqual(
+            self.selected_titles(PageSelection("%==Dutch==%")),
+            ["chien", "hond"],
+        )
+        self.assertEqual(
+            self.selected_titles(PageSelection("%==French==%")),
+            ["aimer", "parler"],
+        )
@@ -0,0 +1,34 @@
+import pickle
+import unittest
+
+from wiktextract.profiling import WorkerProfiler
+
+
+class TestProfiling(unittest.TestCase):
+    def test_sample_rate(self):
+        profiler = WorkerProfiler(0.5)
+        titles = [f"page{i}" for i in range(1000)]
+        selected = [t for t in titles if profiler.is_selected(t)]
+        self.assertTrue(400 < len(selected) < 600)
+        # the same pages are selected again
+        self.assertEqual(
+            selected, [t for t in titles if profiler.is_selected(t)]
+        )
+        self.assertFalse(WorkerProfiler(0.0).is_selected("page0"))
+
+    def test_titles(self):
+        profiler = WorkerProfiler(titles=["dog", "cat"])
+        self.assertTrue(profiler.is_selected("dog"))
+        self.assertFalse(profiler.is_selected("house"))
+
+    def test_pickle(self):
+        profiler = WorkerProfiler(0.25, ["dog"])
+        profiler.start()
+        profiler.start_worker()
+        copy = pickle.loads(pickle.dumps(profiler))
+        self.assertEqual(copy.sample_rate, 0.25)
+        self.assertEqual(copy.titles, frozenset(["dog"]))
+        self.assertEqual(copy.stats_dir, profiler.stats_dir)
+        self.assertIsNone(copy.profile)
+        self.assertIsNone(profiler.collect())
+        self.assertIsNone(profiler.stats_dir)
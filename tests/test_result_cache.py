@@ -0,0 +1,85 @@
+import pickle
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from wiktextract import result_cache
+from wiktextract.result_cache import ResultCache, cache_key, persistent_cache
+
+calls = []
+
+
+@persistent_cache("double", (__name__,))
+def double(x: int, twice: bool = False) -> list[int]:
+    calls.append(x)
+    return [x, x] if twice else [x]
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = TemporaryDirectory()
+        self.path = str(Path(self.tmp_dir.name) / "results.db")
+        calls.clear()
+
+    def tearDown(self) -> None:
+        cache = result_cache.worker_cache
+        if cache is not None and cache.conn is not None:
+            cache.conn.close()
+            cache.conn = None
+        result_cache.worker_cache = None
+        self.tmp_dir.cleanup()
+
+    def start_worker(self) -> ResultCache:
+        # The cache is pickled when it is passed to the worker processes
+        cache = pickle.loads(pickle.dumps(ResultCache(self.path)))
+        cache.start()
+        cache.start_worker()
+        return cache
+
+    def test_not_used(self):
+        self.assertEqual(double(1), [1])
+        self.assertEqual(double(1), [1])
+        self.assertEqual(calls, [1, 1])
+
+    def test_runs(self):
+        cache = self.start_worker()
+        self.assertEqual(double(2), [2])
+        self.assertEqual(double(2, twice=False), [2])
+        self.assertEqual(double(2, True), [2, 2])
+        self.assertEqual(calls, [2, 2])
+        cache.save()
+        self.assertEqual(
+            cache.finish(),
+            {"double": {"lookups": 3, "hits": 1, "hit_rate": 1 / 3}},
+        )
+        # Next run
+        cache = self.start_worker()
+        self.assertEqual(double(x=2, twice=True), [2, 2])
+        self.assertEqual(calls, [2, 2])
+        cache.save()
+        self.assertEqual(cache.finish()["double"]["hits"], 1)
+
+    def test_outdated_results(self):
+        cache = self.start_worker()
+        double(3)
+        cache.save()
+        with cache.conn:
+            cache.conn.execute(
+                "UPDATE results SET version = 'old', key = 'old'"
+            )
+        double(3)
+        cache.save()
+        cache.finish()
+        self.assertEqual(
+            cache.conn.execute("SELECT key FROM results").fetchall(),
+            [("(3, False)",)],
+        )
+
+    def test_cache_key(self):
+        self.assertEqual(
+            cache_key(("a", frozenset(["b", "c"]))),
+            cache_key(("a", frozenset(["c", "b"]))),
+        )
+        self.assertNotEqual(
+            cache_key(("a", frozenset(["b"]))), cache_key(("a", ("b",)))
+        )
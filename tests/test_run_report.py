@@ -0,0 +1,134 @@
+import unittest
+
+from wikitextprocessor import Wtp
+
+from wiktextract.config import WiktionaryConfig
+from wiktextract.run_report import (
+    HISTOGRAM_BOUNDS,
+    Histogram,
+    PageTimer,
+    RunReport,
+    SpanTimer,
+    TopN,
+    enable_spans,
+)
+from wiktextract.wxr_context import WiktextractContext
+
+
+class TestRunReport(unittest.TestCase):
+    maxDiff = None
+
+    def setUp(self) -> None:
+        self.wxr = WiktextractContext(Wtp(), WiktionaryConfig())
+
+    def tearDown(self) -> None:
+        self.wxr.wtp.close_db_conn()
+        enable_spans(False)
+
+    def test_page_timer_sections(self):
+        self.wxr.page_timer = PageTimer()
+        self.wxr.wtp.start_page("test")
+        self.wxr.page_timer.start_page("test")
+        self.wxr.start_section("English")
+        self.wxr.start_subsection("Noun")
+        self.wxr.start_subsection("Verb")
+        self.wxr.start_section("Finnish")
+        stats = self.wxr.page_timer.finish_page({"noun": 1})
+        self.assertEqual(stats["title"], "test")
+        self.assertEqual(
+            [(lang, pos) for lang, pos, _ in stats["sections"]],
+            [
+                ("English", None),
+                ("English", "Noun"),
+                ("English", "Verb"),
+                ("Finnish", None),
+            ],
+        )
+        self.assertEqual(self.wxr.wtp.section, "Finnish")
+        self.assertGreaterEqual(
+            stats["wall_time"], sum(t for _, _, t in stats["sections"])
+        )
+
+    def test_merge_statistics(self):
+        report = RunReport()
+        for title in ("a", "b"):
+            stats = {
+                "title": title,
+                "wall_time": 0.5 if title == "a" else 3.0,
+                "cpu_time": 0.4,
+                "sections": [
+                    ("English", None, 0.01),
+                    ("English", "Noun", 0.2),
+                    ("English", "Verb", 0.1),
+                ],
+                "section_counts": {"noun": 1, "verb": 1},
+                "spans": {"parse": (1, 0.25, 0.25)},
+            }
+            report.add_page(stats)
+            self.wxr.config.merge_statistics(stats)
+        data = report.to_json(self.wxr.config)
+        self.assertEqual(data["num_pages"], 2)
+        self.assertEqual(
+            [p["title"] for p in data["slowest_pages"]], ["b", "a"]
+        )
+        self.assertEqual(data["languages"]["English"]["count"], 2)
+        self.assertEqual(data["pos"]["Noun"]["count"], 2)
+        self.assertAlmostEqual(data["pos"]["Noun"]["time"], 0.4)
+        self.assertEqual(data["section_counts"], {"noun": 2, "verb": 2})
+        self.assertEqual(data["spans"]["parse"]["count"], 2)
+        self.assertAlmostEqual(
+            data["spans"]["parse"]["exclusive_share"], 0.5 / 3.5
+        )
+        self.assertEqual(self.wxr.config.num_pages, 2)
+        self.assertEqual(self.wxr.config.language_counts, {"English": 2})
+        self.assertEqual(self.wxr.config.pos_counts, {"Noun": 2, "Verb": 2})
+
+    def test_histogram(self):
+        hist = Histogram()
+        for value in (0.0005, 0.001, 0.003, 1000.0):
+            hist.add(value)
+        data = hist.to_json()
+        self.assertEqual(len(data["counts"]), len(HISTOGRAM_BOUNDS) + 1)
+        self.assertEqual(data["counts"][0], 2)
+        self.assertEqual(data["counts"][2], 1)
+        self.assertEqual(data["counts"][-1], 1)
+        self.assertEqual(data["max"], 1000.0)
+
+    def test_top_n(self):
+        top = TopN(2)
+        for i, key in enumerate((3.0, 1.0, 5.0, 2.0)):
+            top.add(key, {"i": i})
+        self.assertEqual(top.to_json(), [{"i": 2}, {"i": 0}])
+
+    def test_span_timer(self):
+        timer = SpanTimer()
+        with timer.span("clean_node"):
+            with timer.span("expand"):
+                with timer.span("clean_node"):
+                    pass
+            with timer.span("clean_value"):
+                pass
+        totals = timer.take()
+        self.assertEqual(totals["clean_node"][0], 2)
+        self.assertEqual(totals["expand"][0], 1)
+        self.assertEqual(totals["clean_value"][0], 1)
+        # inclusive time of the outer clean_node covers everything
+        self.assertGreaterEqual(
+            totals["clean_node"][1],
+            totals["expand"][1] + totals["clean_value"][1],
+        )
+        for count, inclusive, exclusive in totals.values():
+            self.assertLessEqual(exclusive, inclusive)
+        self.assertEqual(timer.take(), {})
+
+    def test_wxr_span(self):
+        with self.wxr.span("parse"):
+            pass
+        enable_spans(True)
+        self.wxr.page_timer = PageTimer(spans=True)
+        self.wxr.page_timer.start_page("test")
+        with self.wxr.span("parse"):
+            pass
+        stats = self.wxr.page_timer.finish_page({})
+        self.assertEqual(list(stats["spans"]), ["parse"])
+        self.assertEqual(stats["spans"]["parse"][0], 1)
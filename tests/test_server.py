@@ -0,0 +1,129 @@
+import json
+import threading
+import unittest
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from wikitextprocessor import Wtp
+
+from wiktextract.config import WiktionaryConfig
+from wiktextract.server import ExtractionService, RequestHandler, serve
+from wiktextract.thesaurus import close_thesaurus_db
+from wiktextract.wxr_context import WiktextractContext
+
+
+class FakeService:
+    def __init__(self) -> None:
+        self.reloaded = False
+
+    def extract(self, title: str, text: str | None) -> dict:
+        if title == "missing":
+            return {"title": title, "error": "page not found"}
+        return {"title": title, "entries": [{"word": title, "text": text}]}
+
+    def reload_overrides(self) -> None:
+        self.reloaded = True
+
+
+class TestServer(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+        self.server.service = FakeService()  # type: ignore[attr-defined]
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def request(
+        self, method: str, path: str, body: dict | None = None
+    ) -> tuple[int, dict]:
+        conn = HTTPConnection(*self.server.server_address)
+        conn.request(
+            method,
+            path,
+            body=json.dumps(body) if body is not None else None,
+        )
+        response = conn.getresponse()
+        result = (response.status, json.loads(response.read()))
+        conn.close()
+        return result
+
+    def test_extract_title(self):
+        self.assertEqual(
+            self.request("GET", "/extract?title=d%C3%A9j%C3%A0"),
+            (
+                200,
+                {
+                    "title": "déjà",
+                    "entries": [{"word": "déjà", "text": None}],
+                },
+            ),
+        )
+
+    def test_extract_text(self):
+        self.assertEqual(
+            self.request(
+                "POST", "/extract", {"title": "dog", "text": "==English=="}
+            ),
+            (
+                200,
+                {
+                    "title": "dog",
+                    "entries": [{"word": "dog", "text": "==English=="}],
+                },
+            ),
+        )
+
+    def test_errors(self):
+        self.assertEqual(self.request("GET", "/extract?title=missing")[0], 404)
+        self.assertEqual(
+            self.request("POST", "/extract", {"text": "x"})[0], 400
+        )
+        self.assertEqual(self.request("GET", "/other")[0], 404)
+
+    def test_reload(self):
+        self.assertEqual(
+            self.request("POST", "/reload", {}), (200, {"reloaded": True})
+        )
+        self.assertTrue(self.server.service.reloaded)  # type: ignore[attr-defined]
+
+
+class TestExtractionService(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = TemporaryDirectory()
+        self.wxr = WiktextractContext(
+            Wtp(db_path=Path(self.tmp_dir.name) / "en.db"),
+            WiktionaryConfig(),
+        )
+
+    def tearDown(self) -> None:
+        self.wxr.wtp.close_db_conn()
+        close_thesaurus_db(
+            self.wxr.thesaurus_db_path, self.wxr.thesaurus_db_conn
+        )
+        self.tmp_dir.cleanup()
+
+    def test_warm_pool(self):
+        service = ExtractionService(self.wxr, 2)
+        self.addCleanup(service.shutdown)
+        # Both workers were started and warmed up before any request
+        old_pids = service.worker_pids
+        self.assertEqual(len(set(old_pids)), 2)
+        result = service.extract("dog", "")
+        self.assertEqual(result["title"], "dog")
+        self.assertEqual(result["entries"], [])
+        service.reload_overrides()
+        self.assertEqual(len(set(service.worker_pids)), 2)
+        self.assertTrue(set(service.worker_pids).isdisjoint(old_pids))
+
+    def test_socket_path_is_not_a_socket(self):
+        path = Path(self.tmp_dir.name) / "out.jsonl"
+        path.write_text("{}\n")
+        with self.assertRaises(SystemExit):
+            serve(self.wxr, str(path), 1)
+        self.assertEqual(path.read_text(), "{}\n")
@@ -0,0 +1,119 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from wikitextprocessor import Page, Wtp
+
+from wiktextract.config import WiktionaryConfig
+from wiktextract.shards import (
+    ShardError,
+    ShardExtraction,
+    merge_shards,
+    shard_summary_path,
+)
+from wiktextract.wxr_context import WiktextractContext
+
+
+class TestShards(unittest.TestCase):
+    def setUp(self) -> None:
+        self.wxr = WiktextractContext(
+            Wtp(lang_code="fr"), WiktionaryConfig(dump_file_lang_code="fr")
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pages = [
+            Page(title=title, namespace_id=0, body="x" * size)
+            for title, size in (
+                ("a", 100),
+                ("b", 10),
+                ("c", 60),
+                ("d", 50),
+                ("e", 5),
+            )
+        ]
+        for page in self.pages:
+            self.wxr.wtp.add_page(page.title, 0, body=page.body)
+        self.wxr.wtp.add_page("Modèle:t", 10, body="x" * 1000)
+
+    def tearDown(self) -> None:
+        self.wxr.wtp.close_db_conn()
+        self.tmp_dir.cleanup()
+
+    def select(self, k: int, n: int) -> ShardExtraction:
+        shard = ShardExtraction(k, n, shard_summary_path(self.out_path(k)))
+        shard.select(self.wxr, [0])
+        return shard
+
+    def out_path(self, k: int) -> Path:
+        return Path(self.tmp_dir.name) / f"out{k}.jsonl"
+
+    def test_select(self):
+        shards = [self.select(k, 2) for k in (1, 2)]
+        self.assertEqual(shards[0].titles, {"a", "b", "e"})
+        self.assertEqual(shards[1].titles, {"c", "d"})
+        self.assertEqual(
+            [page.title for page in shards[0].pages(self.pages)],
+            ["a", "b", "e"],
+        )
+
+    def test_select_rowids(self):
+        rowids = [
+            rowid
+            for rowid, title in self.wxr.wtp.db_conn.execute(
+                "SELECT rowid, title FROM pages"
+            )
+            if title in ("a", "c", "d")
+        ]
+        shard = ShardExtraction(1, 2, shard_summary_path(self.out_path(1)))
+        shard.select(self.wxr, [0], rowids)
+        self.assertEqual(shard.titles, {"a"})
+
+    def test_merge(self):
+        for k, words in ((1, ("a", "b")), (2, ("c",))):
+            # Every shard reports the errors of the thesaurus extraction
+            self.wxr.config.warnings = [{"msg": "thesaurus"}]
+            self.wxr.config.errors = []
+            shard = self.select(k, 2)
+            self.wxr.config.errors.append({"msg": f"error in shard {k}"})
+            self.out_path(k).write_text(
+                "".join(
+                    json.dumps({"word": word, "lang_code": "fr", "pos": "noun"})
+                    + "\n"
+                    for word in words
+                ),
+                encoding="utf-8",
+            )
+            shard.write_summary(
+                self.wxr, {(word, "fr", "noun") for word in words}
+            )
+        self.wxr.config.warnings = []
+        self.wxr.config.errors = []
+        out_f = io.StringIO()
+        merge_shards(
+            self.wxr,
+            [str(self.out_path(2)), str(self.out_path(1))],
+            out_f,
+            False,
+        )
+        self.assertEqual(
+            [
+                json.loads(line)["word"]
+                for line in out_f.getvalue().splitlines()
+            ],
+            ["a", "b", "c"],
+        )
+        self.assertEqual(
+            self.wxr.config.errors,
+            [{"msg": "error in shard 1"}, {"msg": "error in shard 2"}],
+        )
+        self.assertEqual(self.wxr.config.warnings, [{"msg": "thesaurus"}])
+
+    def test_merge_missing_shard(self):
+        shard = self.select(1, 2)
+        self.out_path(1).write_text("", encoding="utf-8")
+        shard.write_summary(self.wxr, set())
+        with self.assertRaises(ShardError):
+            merge_shards(
+                self.wxr, [str(self.out_path(1))], io.StringIO(), False
+            )
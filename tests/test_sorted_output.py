@@ -0,0 +1,53 @@
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from wiktextract.sorted_output import SortedOutput
+
+
+class TestSortedOutput(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.entries = [
+            {"word": "b", "lang_code": "en", "pos": "noun", "n": 1},
+            {"word": "a", "lang_code": "fr", "pos": "noun", "n": 2},
+            {"word": "ab", "lang_code": "en", "pos": "verb", "n": 3},
+            {"word": "a", "lang_code": "en", "pos": "verb", "n": 4},
+            {"word": "b", "lang_code": "en", "pos": "noun", "n": 5},
+            {"word": "é", "lang_code": "en", "pos": "noun", "n": 6},
+            {"word": "a", "lang_code": "en", "pos": "noun", "n": 7},
+        ]
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+    def sort(self, out_f, max_run_bytes: int) -> SortedOutput:
+        sorted_output = SortedOutput(self.tmp_dir.name, max_run_bytes)
+        for data in self.entries:
+            sorted_output.add(data, json.dumps(data, ensure_ascii=False) + "\n")
+        sorted_output.finish(out_f)
+        return sorted_output
+
+    def test_sort(self):
+        # Two runs of three entries and one entry in memory
+        out_f = io.StringIO()
+        sorted_output = self.sort(out_f, 150)
+        self.assertEqual(len(sorted_output.runs), 2)
+        self.assertEqual(
+            [json.loads(line)["n"] for line in out_f.getvalue().splitlines()],
+            [7, 4, 3, 1, 5, 6, 2],
+        )
+        self.assertEqual(list(Path(self.tmp_dir.name).iterdir()), [])
+
+    def test_same_bytes(self):
+        # The output doesn't depend on the run size
+        out_path = Path(self.tmp_dir.name) / "out.jsonl"
+        with open(out_path, "w", encoding="utf-8") as out_f:
+            self.sort(out_f, 1)
+        out_f = io.StringIO()
+        self.sort(out_f, 1024 * 1024)
+        self.assertEqual(
+            out_path.read_bytes(), out_f.getvalue().encode("utf-8")
+        )
@@ -7,7 +7,7 @@ import unittest
 from wikitextprocessor import Wtp
 
 from wiktextract.config import WiktionaryConfig
-from wiktextract.datautils import split_slashes
+from wiktextract.datautils import copy_data, split_slashes
 from wiktextract.extractor.share import create_audio_url_dict
 from wiktextract.thesaurus import close_thesaurus_db
 from wiktextract.wxr_context import WiktextractContext
@@ -98,3 +98,16 @@ class UtilsTests(unittest.TestCase):
                 "mp3_url": "https://upload.wikimedia.org/wikipedia/commons/transcoded/0/0f/De-Fisch.OGG/De-Fisch.OGG.mp3",
             },
         )
+
+    def test_copy_data(self):
+        data = {
+            "word": "foo",
+            "sounds": [{"ipa": "/fuː/", "tags": ["UK"]}],
+            "senses": [{"glosses": ["bar"], "tags": ("a", "b")}],
+        }
+        new_data = copy_data(data)
+        self.assertEqual(new_data, data)
+        self.assertIsNot(new_data["sounds"], data["sounds"])
+        self.assertIsNot(new_data["sounds"][0], data["sounds"][0])
+        new_data["sounds"][0]["tags"].append("US")
+        self.assertEqual(data["sounds"][0]["tags"], ["UK"])
@@ -0,0 +1,28 @@
+import unittest
+from multiprocessing import get_context
+
+from wiktextract.worker_pool import RecyclingPool
+
+
+class TestWorkerPool(unittest.TestCase):
+    def test_recycle_after_pages(self):
+        with RecyclingPool(2, get_context("spawn"), max_pages=2) as pool:
+            self.assertEqual(
+                list(pool.map(abs, range(0, -20, -1), chunksize=2)),
+                list(range(20)),
+            )
+        # each worker is replaced after one chunk
+        self.assertEqual(pool.recycled, {"pages": 10, "rss": 0})
+        self.assertEqual(pool.num_pages, 20)
+
+    def test_recycle_over_rss(self):
+        with RecyclingPool(1, get_context("spawn"), max_rss_mb=1) as pool:
+            self.assertEqual(
+                list(pool.map(abs, [-1, -2, -3], chunksize=1)), [1, 2, 3]
+            )
+        self.assertEqual(pool.recycled, {"pages": 0, "rss": 3})
+
+    def test_exception(self):
+        with RecyclingPool(1, get_context("spawn")) as pool:
+            with self.assertRaises(RuntimeError):
+                list(pool.map(abs, ["a"]))